@@ -0,0 +1,377 @@
+"""
+Benchmarks for the module-1 / module-2 graph code
+
+Every case times one function on seeded graphs of increasing size and
+records, per size:
+    seconds          best time of one call
+    ops_per_sec      calls per second (1 / seconds)
+    items_per_sec    graph items (nodes + edges, or nodes for generators)
+                     processed per second
+    peak_rss         resident set high-water mark during one call, in bytes
+    peak_alloc       peak of traced Python / NumPy allocations during one call
+and per case the scaling exponent k fitted to seconds ~ size ** k.
+
+Results are saved as JSON, and --compare reports every size that got
+slower than in an earlier result file:
+
+    python benchmarks.py --output before.json
+    python benchmarks.py --compare before.json --output after.json
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NETWORK_DIR = os.path.join(HERE, 'module-2-project-and-application',
+                           '02_application-2-analysis-of-a-computer-network')
+DEGREES_DIR = os.path.join(HERE, 'module-1-project-and-application',
+                           '01_project-1-degree-distributions-for-graphs')
+
+sys.path.insert(0, NETWORK_DIR)
+import graph_io  # noqa: E402
+import graph_search  # noqa: E402
+from graph_generators import dpa_graph, er_graph, upa_graph  # noqa: E402
+from resilience import resilience_curve  # noqa: E402
+
+
+def _load_module(name, directory):
+    """
+    Import the main.py of an exercise directory under the name #name
+    """
+    spec = importlib.util.spec_from_file_location(name, os.path.join(directory, 'main.py'))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+network = _load_module('network_main', NETWORK_DIR)
+degrees = _load_module('degrees_main', DEGREES_DIR)
+
+
+class Case(object):
+    """
+    One benchmark: #setup(size, seed) builds the arguments of #run and
+    returns (args, items), items being the work measure for items_per_sec
+    """
+    def __init__(self, name, sizes, setup, run):
+        self.name = name
+        self.sizes = sizes
+        self.setup = setup
+        self.run = run
+
+
+def _quiet(func):
+    def run(*args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args)
+    return run
+
+
+def _doubling(start, count):
+    return [start * 2 ** power for power in range(count)]
+
+
+def _items(graph):
+    return len(graph) + graph.get_num_edges()
+
+
+def _upa_file(size, seed):
+    graph = upa_graph(size, 5, seed=seed)
+    handle, file_name = tempfile.mkstemp(suffix='.txt', prefix='bench_graph_')
+    labels = graph.labels.tolist()
+    offsets, neighbors = graph.adjacency_lists()
+    with os.fdopen(handle, 'w') as graph_file:
+        for idx, node in enumerate(labels):
+            graph_file.write('%d %s\n' % (node, ''.join('%d ' % labels[neighbor]
+                                                       for neighbor in neighbors[offsets[idx]:offsets[idx + 1]])))
+    return file_name, _items(graph)
+
+
+def _load_text_dict(file_name):
+    return network.make_graph(*network.load_graph_data(file_name))
+
+
+def _setup_file(size, seed):
+    file_name, items = _upa_file(size, seed)
+    return (file_name,), items
+
+
+def _setup_cached(size, seed):
+    file_name, items = _upa_file(size, seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph_io.load_graph_cached(file_name)
+    return (file_name,), items
+
+
+def _setup_size(size, seed):
+    return (size,), size
+
+
+def _setup_make_er(size, seed):
+    # make_er draws from the global random module
+    random.seed(seed)
+    return (size, 10.0 / size), size
+
+
+def _setup_er(size, seed):
+    return (size, 10.0 / size, False, seed), size
+
+
+def _setup_preferential(size, seed):
+    return (size, 5, seed), size
+
+
+def _setup_dpa_dict(size, seed):
+    graph = dpa_graph(size, 5, seed=seed)
+    return (graph.to_dict(),), _items(graph)
+
+
+def _setup_dpa_csr(size, seed):
+    graph = dpa_graph(size, 5, seed=seed)
+    return (graph,), _items(graph)
+
+
+def _setup_upa_dict(size, seed):
+    graph = upa_graph(size, 5, seed=seed)
+    return (graph.to_dict(),), _items(graph)
+
+
+def _setup_upa_csr(size, seed):
+    graph = upa_graph(size, 5, seed=seed)
+    graph.adjacency_lists()
+    return (graph,), _items(graph)
+
+
+def _setup_bfs_dict(size, seed):
+    graph = upa_graph(size, 5, seed=seed)
+    return (graph.to_dict(), 0), _items(graph)
+
+
+def _setup_bfs_csr(size, seed):
+    graph = upa_graph(size, 5, seed=seed)
+    graph.adjacency_lists()
+    return (graph, 0), _items(graph)
+
+
+def _setup_fragmented_dict(size, seed):
+    # mean degree 1: many small components, like an attacked graph
+    graph = er_graph(size, 1.0 / size, seed=seed)
+    return (graph.to_dict(),), _items(graph)
+
+
+def _setup_fragmented_csr(size, seed):
+    graph = er_graph(size, 1.0 / size, seed=seed)
+    graph.adjacency_lists()
+    return (graph,), _items(graph)
+
+
+def _setup_resilience_dict(size, seed):
+    graph = upa_graph(size, 5, seed=seed)
+    order = graph.labels[np.random.default_rng(seed).permutation(size)].tolist()
+    return (graph.to_dict(), order), _items(graph)
+
+
+def _setup_resilience_csr(size, seed):
+    graph = upa_graph(size, 5, seed=seed)
+    graph.adjacency_lists()
+    return (graph, np.random.default_rng(seed).permutation(size)), _items(graph)
+
+
+CASES = [
+    Case('load_graph_data', _doubling(5000, 5), _setup_file, _quiet(_load_text_dict)),
+    Case('load_graph_csr', _doubling(5000, 5), _setup_file, _quiet(graph_io.load_graph_csr)),
+    Case('load_graph_cached', _doubling(5000, 5), _setup_cached, graph_io.load_graph_cached),
+    Case('make_complete_graph', _doubling(100, 4), _setup_size, degrees.make_complete_graph),
+    Case('make_er', _doubling(250, 4), _setup_make_er, network.make_er),
+    Case('er_graph', _doubling(10000, 5), _setup_er, er_graph),
+    Case('upa_graph', _doubling(10000, 5), _setup_preferential, upa_graph),
+    Case('dpa_graph', _doubling(10000, 5), _setup_preferential, dpa_graph),
+    Case('compute_in_degrees', _doubling(10000, 5), _setup_dpa_dict, degrees.compute_in_degrees),
+    Case('in_degree_array', _doubling(10000, 5), _setup_dpa_csr, lambda graph: graph.in_degree_array()),
+    Case('bfs_visited', _doubling(10000, 5), _setup_bfs_dict, network.bfs_visited),
+    Case('bfs_visited_csr', _doubling(10000, 5), _setup_bfs_csr, network.bfs_visited),
+    Case('cc_visited', _doubling(10000, 5), _setup_fragmented_dict, network.cc_visited),
+    Case('cc_visited_csr', _doubling(10000, 5), _setup_fragmented_csr, network.cc_visited),
+    Case('targeted_order', _doubling(1000, 4), _setup_upa_dict, network.targeted_order),
+    Case('fast_targeted_order', _doubling(10000, 5), _setup_upa_dict, network.fast_targeted_order),
+    Case('compute_resilience', _doubling(10000, 5), _setup_resilience_dict, network.compute_resilience),
+    Case('resilience_curve', _doubling(10000, 5), _setup_resilience_csr, resilience_curve),
+]
+
+
+def _reset_peak_rss():
+    """
+    Reset the resident set high-water mark (Linux only)
+    Returns False when the kernel does not allow it
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss():
+    """
+    Returns the resident set high-water mark of the process, in bytes
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure(case, size, seed=0, repeat=3):
+    """
+    Returns the measurements of #case at #size as a dictionary
+    """
+    args, items = case.setup(size, seed)
+    try:
+        timer = timeit.Timer(lambda: case.run(*args))
+        number, dummy_time = timer.autorange()
+        seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+        rss_reset = _reset_peak_rss()
+        case.run(*args)
+        peak_rss = _peak_rss()
+
+        tracemalloc.start()
+        case.run(*args)
+        peak_alloc = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        if case.setup in (_setup_file, _setup_cached):
+            for name in (args[0], graph_io.cache_file_name(args[0])):
+                if os.path.exists(name):
+                    os.remove(name)
+
+    return {'size': size,
+            'items': items,
+            'seconds': seconds,
+            'ops_per_sec': 1.0 / seconds,
+            'items_per_sec': items / seconds,
+            'peak_rss': peak_rss if rss_reset else None,
+            'peak_alloc': peak_alloc}
+
+
+def scaling_exponent(results):
+    """
+    Least squares slope of log(seconds) against log(size)
+    Returns None with fewer than two sizes
+    """
+    if len(results) < 2:
+        return None
+    sizes = np.log([result['size'] for result in results])
+    seconds = np.log([result['seconds'] for result in results])
+    return float(np.polyfit(sizes, seconds, 1)[0])
+
+
+def run_benchmarks(names=None, seed=0, repeat=3, quick=False, out=sys.stdout):
+    """
+    Run the cases named #names (all cases by default)
+    Returns the results as a JSON-ready dictionary
+    """
+    report = {'python': platform.python_version(),
+              'numpy': np.__version__,
+              'platform': platform.platform(),
+              'cpu_count': os.cpu_count(),
+              'seed': seed,
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'cases': {}}
+    for case in CASES:
+        if names and case.name not in names:
+            continue
+        sizes = case.sizes[:2] if quick else case.sizes
+        results = []
+        for size in sizes:
+            result = measure(case, size, seed, repeat)
+            results.append(result)
+            print('%-20s %8d %10.4fs %12.0f items/s %8.1f MB alloc' %
+                  (case.name, size, result['seconds'], result['items_per_sec'],
+                   result['peak_alloc'] / 1e6), file=out)
+        exponent = scaling_exponent(results)
+        report['cases'][case.name] = {'results': results, 'scaling_exponent': exponent}
+        if exponent is not None:
+            print('%-20s scaling exponent %.2f' % (case.name, exponent), file=out)
+    return report
+
+
+def compare(old_report, new_report, tolerance=0.2, out=sys.stdout):
+    """
+    Print the time ratio new / old of every (case, size) found in both reports
+    Returns the list of (case, size, ratio) slower by more than #tolerance
+    """
+    regressions = []
+    for name, case in sorted(new_report['cases'].items()):
+        old_case = old_report['cases'].get(name)
+        if old_case is None:
+            continue
+        old_seconds = dict((result['size'], result['seconds']) for result in old_case['results'])
+        for result in case['results']:
+            if result['size'] not in old_seconds:
+                continue
+            ratio = result['seconds'] / old_seconds[result['size']]
+            flag = ''
+            if ratio > 1 + tolerance:
+                regressions.append((name, result['size'], ratio))
+                flag = '  REGRESSION'
+            print('%-20s %8d %6.2fx%s' % (name, result['size'], ratio, flag), file=out)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('cases', nargs='*', help='cases to run (default: all)')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='slowdown ratio above 1 reported as a regression (default 0.2)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true', help='only the two smallest sizes of each case')
+    parser.add_argument('--list', action='store_true', help='list the cases and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in CASES:
+            print(case.name, case.sizes)
+        return 0
+
+    unknown = set(args.cases) - set(case.name for case in CASES)
+    if unknown:
+        parser.error('unknown case(s): %s' % ', '.join(sorted(unknown)))
+
+    report = run_benchmarks(args.cases, args.seed, args.repeat, args.quick)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as old_file:
+            regressions = compare(json.load(old_file), report, args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Compressed sparse row (CSR) graph
+
+A read-only graph stored in three NumPy arrays instead of a dict of sets:
+    labels     node label of every node position
+    offsets    neighbors of position idx are neighbors[offsets[idx]:offsets[idx + 1]]
+    neighbors  neighbor positions, grouped by node
+
+Exposes the same read API as Graph (__getitem__, __contains__, get_nodes,
+in_degrees, out_degrees, ...) at 4-8 bytes per edge.
+"""
+from itertools import chain
+from numbers import Integral
+import numpy as np
+
+
+def _as_labels(values):
+    """
+    Returns #values as an int64 array of node labels
+    Raises KeyError for a value that is not an integer
+    """
+    array = np.asarray(values)
+    labels = array.astype(np.int64)
+    if array.dtype.kind not in 'biu':
+        inexact = labels != array
+        if inexact.any():
+            raise KeyError(array[np.argmax(inexact)].item())
+    return labels
+
+
+def _positions(labels, values, sorter=None):
+    """
+    Map the node labels #values to their positions in #labels
+    Raises KeyError for a label that is not a node of the graph
+    """
+    values = _as_labels(values)
+    if sorter is None:
+        sorter = np.argsort(labels, kind='stable')
+    if len(labels) == 0:
+        if len(values):
+            raise KeyError(int(values[0]))
+        return values
+    idx = np.searchsorted(labels, values, sorter=sorter)
+    idx[idx == len(labels)] = 0
+    positions = sorter[idx]
+    missing = labels[positions] != values
+    if missing.any():
+        raise KeyError(int(values[np.argmax(missing)]))
+    return positions
+
+
+def _is_identity(labels):
+    """
+    True when node labels are exactly 0..n-1 in order
+    """
+    return bool(np.array_equal(labels, np.arange(len(labels))))
+
+
+def build_csr(labels, sources, targets, directed=False):
+    """
+    Build the (offsets, neighbors) arrays of a graph whose nodes are #labels
+    and whose edges go from sources[i] to targets[i] (both given as labels)
+
+    Undirected graphs store every edge in both directions.
+    Duplicate edges are dropped, neighbors of each node come out sorted.
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    num_nodes = len(labels)
+    if _is_identity(labels):
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if len(sources) and (min(sources.min(), targets.min()) < 0 or
+                             max(sources.max(), targets.max()) >= num_nodes):
+            raise KeyError('edge endpoint is not a node of the graph')
+    else:
+        sorter = np.argsort(labels, kind='stable')
+        sources = _positions(labels, sources, sorter)
+        targets = _positions(labels, targets, sorter)
+
+    if not directed:
+        sources, targets = (np.concatenate((sources, targets)),
+                            np.concatenate((targets, sources)))
+
+    keys = np.sort(sources * num_nodes + targets)
+    if len(keys):
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    sources = keys // num_nodes if num_nodes else keys
+    neighbors = keys - sources * num_nodes
+
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=offsets[1:])
+    index_type = np.int32 if num_nodes < 2 ** 31 else np.int64
+    return offsets, neighbors.astype(index_type)
+
+
+def adjacency_in_degrees(adjacency):
+    """
+    Returns the (labels, in-degrees) int64 arrays of the dict #adjacency
+    mapping every node to its set of neighbors, counted with one bincount
+    over the neighbors without building (sorting) the CSR arrays
+    Raises KeyError for a neighbor that is not a node of the graph
+    """
+    labels = np.fromiter(adjacency, dtype=np.int64, count=len(adjacency))
+    num_edges = sum(map(len, adjacency.values()))
+    targets = np.fromiter(chain.from_iterable(adjacency.values()), dtype=np.int64, count=num_edges)
+    if _is_identity(labels):
+        if num_edges and (targets.min() < 0 or targets.max() >= len(labels)):
+            raise KeyError('edge endpoint is not a node of the graph')
+    else:
+        targets = _positions(labels, targets)
+    return labels, np.bincount(targets, minlength=len(labels))
+
+
+def degree_distribution(degrees, normalized=False):
+    """
+    Returns the distribution of the integer array #degrees as a dictionary
+    mapping every degree that occurs to the number of nodes with that degree,
+    or to the fraction of nodes when #normalized is True
+    """
+    degrees = np.asarray(degrees, dtype=np.int64)
+    counts = np.bincount(degrees) if len(degrees) else np.zeros(0, dtype=np.int64)
+    values = np.flatnonzero(counts)
+    if normalized:
+        return dict(zip(values.tolist(), (counts[values] / float(len(degrees))).tolist()))
+    return dict(zip(values.tolist(), counts[values].tolist()))
+
+
+class CSRGraph(object):
+    """
+    Read-only graph in compressed sparse row form
+
+    Node labels can be any int64 values; internally every node is addressed
+    by its position 0..n-1, which is what offsets and neighbors hold.
+    """
+    def __init__(self, nodes=(), edges=(), directed=False):
+        labels = np.fromiter(nodes, dtype=np.int64)
+        edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        offsets, neighbors = build_csr(labels, edges[:, 0], edges[:, 1], directed)
+        self._set_arrays(labels, offsets, neighbors, directed)
+
+    @classmethod
+    def from_arrays(cls, labels, sources, targets, directed=False):
+        """
+        Build a graph from a label array and two parallel arrays of
+        edge endpoints (as labels), without any per-edge Python object
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        offsets, neighbors = build_csr(labels, sources, targets, directed)
+        return cls.from_csr(labels, offsets, neighbors, directed)
+
+    @classmethod
+    def from_csr(cls, labels, offsets, neighbors, directed=False):
+        """
+        Wrap already built CSR arrays (neighbors given as positions)
+        The arrays are used as they are, not copied
+        """
+        graph = cls.__new__(cls)
+        graph._set_arrays(np.asarray(labels), np.asarray(offsets), np.asarray(neighbors), directed)
+        return graph
+
+    @classmethod
+    def from_dict(cls, adjacency, directed=True):
+        """
+        Build a graph from a dict mapping every node to its set of neighbors
+        The adjacency is kept as it is when #directed is True
+        """
+        labels = np.fromiter(adjacency, dtype=np.int64, count=len(adjacency))
+        counts = np.fromiter(map(len, adjacency.values()), dtype=np.int64, count=len(adjacency))
+        targets = np.fromiter(chain.from_iterable(adjacency.values()), dtype=np.int64, count=int(counts.sum()))
+        return cls.from_arrays(labels, np.repeat(labels, counts), targets, directed)
+
+    def _set_arrays(self, labels, offsets, neighbors, directed):
+        self._labels = labels
+        self._offsets = offsets
+        self._neighbors = neighbors
+        self._directed = directed
+        self._identity = _is_identity(labels)
+        self._sorter = None
+        self._lists = None
+
+    @property
+    def labels(self):
+        return self._labels
+
+    @property
+    def offsets(self):
+        return self._offsets
+
+    @property
+    def neighbors(self):
+        return self._neighbors
+
+    @property
+    def directed(self):
+        return self._directed
+
+    @property
+    def nbytes(self):
+        """
+        Memory taken by the graph arrays, in bytes
+        """
+        return self._labels.nbytes + self._offsets.nbytes + self._neighbors.nbytes
+
+    def position(self, node):
+        """
+        Returns the position (0..n-1) of the node labelled #node
+        """
+        if self._identity and isinstance(node, Integral) and 0 <= node < len(self._labels):
+            return int(node)
+        return int(self.positions([node])[0])
+
+    def positions(self, nodes):
+        """
+        Returns the positions of the nodes labelled #nodes as an array
+        Raises KeyError for a label that is not a node of the graph
+        """
+        if self._identity:
+            positions = _as_labels(nodes)
+            outside = (positions < 0) | (positions >= len(self._labels))
+            if outside.any():
+                raise KeyError(int(positions[np.argmax(outside)]))
+            return positions
+        if self._sorter is None:
+            self._sorter = np.argsort(self._labels, kind='stable')
+        return _positions(self._labels, nodes, self._sorter)
+
+    def adjacency_lists(self):
+        """
+        Returns (offsets, neighbors) as Python lists, built once per graph
+        Pure Python loops index lists much faster than NumPy arrays
+        """
+        if self._lists is None:
+            self._lists = (self._offsets.tolist(), self._neighbors.tolist())
+        return self._lists
+
+    def neighbor_positions(self, idx):
+        """
+        Returns the positions of the neighbors of the node at position #idx
+        """
+        return self._neighbors[self._offsets[idx]:self._offsets[idx + 1]]
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __iter__(self):
+        return iter(self._labels.tolist())
+
+    def __contains__(self, value):
+        try:
+            self.position(value)
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def __getitem__(self, node):
+        neighbors = self.neighbor_positions(self.position(node))
+        if self._identity:
+            return neighbors
+        return self._labels[neighbors]
+
+    def get_nodes(self):
+        return self._labels
+
+    def get_num_edges(self):
+        """
+        Returns the number of edges; an undirected edge is stored in both
+        directions but counted once, as Graph.get_num_edges counts it
+        """
+        if self._directed:
+            return len(self._neighbors)
+        sources = np.repeat(np.arange(len(self._labels)), np.diff(self._offsets))
+        self_loops = int(np.count_nonzero(self._neighbors == sources))
+        return (len(self._neighbors) + self_loops) // 2
+
+    def in_degree_array(self):
+        """
+        Returns the in-degree of every node position as an array
+        """
+        return np.bincount(self._neighbors, minlength=len(self._labels))
+
+    def out_degree_array(self):
+        """
+        Returns the out-degree of every node position as an array
+        """
+        return np.diff(self._offsets)
+
+    def in_degrees(self):
+        """
+        Returns a dictionary of in-degrees of the nodes
+        of the input digraph
+        """
+        return dict(zip(self._labels.tolist(), self.in_degree_array().tolist()))
+
+    def out_degrees(self):
+        """Returns a dictionary of out-degrees of the nodes
+        of the input digraph"""
+        return dict(zip(self._labels.tolist(), self.out_degree_array().tolist()))
+
+    def in_degree_distribution(self, normalized=False):
+        """Returns the in-degree distribution of a digraph"""
+        return degree_distribution(self.in_degree_array(), normalized)
+
+    def out_degree_distribution(self, normalized=False):
+        """Returns the out-degree distribution of a digraph"""
+        return degree_distribution(self.out_degree_array(), normalized)
+
+    def to_dict(self):
+        """
+        Returns the graph as a dict mapping every node to its set of neighbors
+        """
+        labels = self._labels.tolist()
+        neighbors = (self._labels[self._neighbors] if not self._identity else self._neighbors).tolist()
+        offsets = self._offsets.tolist()
+        return dict((labels[idx], set(neighbors[offsets[idx]:offsets[idx + 1]]))
+                    for idx in range(len(labels)))
@@ -0,0 +1,243 @@
+"""
+Streaming in-degree distribution
+
+InDegreeAccumulator consumes (source, target) edges one batch at a time and
+can return the (normalized) in-degree distribution at any point, without
+ever holding the graph.
+
+While node ids are small non-negative integers the counts are exact and
+live in one int32 array indexed by node id (plus one seen flag per id).
+As soon as an id falls outside [0, max_dense) the accumulator switches to
+distinct sampling (Gibbons): a node is kept when the hash of its id falls
+below a threshold, and the threshold halves whenever more than
+sample_size nodes are kept. Since hash thresholds are nested, a kept node
+was kept from its first appearance, so its in-degree is exact; the kept
+nodes are a uniform sample of all the nodes, which makes the sampled
+distribution an unbiased estimate of the full one. Memory is bounded by
+max_dense (dense mode) or sample_size (sampled mode), whatever the number
+of edges.
+"""
+from itertools import islice
+
+import numpy as np
+
+BATCH_SIZE = 1 << 16  # edges per batch when consuming an edge iterator
+MAX_DENSE = 1 << 24  # largest exact count array, in node ids
+SAMPLE_SIZE = 1 << 18  # nodes kept by distinct sampling
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _hash(ids, seed=0):
+    """
+    splitmix64 of the int64 array #ids, as uint64
+    """
+    with np.errstate(over='ignore'):
+        z = ids.astype(np.uint64) + np.uint64((0x9E3779B97F4A7C15 * (seed + 1)) & _MASK_64)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def edges_from_file(file_name):
+    """
+    Yields the (node, neighbor) edges of an adjacency-list text file
+    one line at a time
+    """
+    with open(file_name) as graph_file:
+        for line in graph_file:
+            tokens = line.split()
+            if tokens:
+                node = int(tokens[0])
+                if len(tokens) == 1:
+                    yield node, None
+                for neighbor in tokens[1:]:
+                    yield node, int(neighbor)
+
+
+class InDegreeAccumulator(object):
+    """
+    Bounded memory in-degree counter over a stream of edges
+
+    Edges whose target is None only announce their source as a node.
+    """
+    def __init__(self, max_dense=MAX_DENSE, sample_size=SAMPLE_SIZE, seed=0):
+        self._max_dense = max_dense
+        self._sample_size = sample_size
+        self._seed = seed
+        self._num_edges = 0
+        # dense mode
+        self._counts = np.zeros(0, dtype=np.int32)
+        self._seen = np.zeros(0, dtype=np.bool_)
+        # sampled mode, ids kept sorted
+        self._level = None
+        self._ids = None
+        self._sample_counts = None
+
+    @property
+    def exact(self):
+        """
+        True while the counts are exact (dense mode)
+        """
+        return self._level is None
+
+    @property
+    def num_edges(self):
+        return self._num_edges
+
+    @property
+    def nbytes(self):
+        if self.exact:
+            return self._counts.nbytes + self._seen.nbytes
+        return self._ids.nbytes + self._sample_counts.nbytes
+
+    def update(self, edges, batch_size=BATCH_SIZE):
+        """
+        Consume the iterable of (source, target) pairs #edges
+        """
+        edges = iter(edges)
+        while True:
+            batch = list(islice(edges, batch_size))
+            if not batch:
+                return
+            sources = np.fromiter((edge[0] for edge in batch), dtype=np.int64, count=len(batch))
+            targets = [edge[1] for edge in batch]
+            if None in targets:
+                has_target = np.array([target is not None for target in targets])
+                self.add_nodes(sources[~has_target])
+                sources = sources[has_target]
+                targets = [target for target in targets if target is not None]
+            self.add_edges(sources, np.fromiter(targets, dtype=np.int64, count=len(targets)))
+
+    def add(self, source, target):
+        """
+        Add the single edge #source -> #target
+        """
+        self.add_edges(np.array([source], dtype=np.int64), np.array([target], dtype=np.int64))
+
+    def add_nodes(self, nodes):
+        """
+        Record the array #nodes as nodes of the graph, without any edge
+        """
+        self._add(np.asarray(nodes, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    def add_edges(self, sources, targets):
+        """
+        Add the edges sources[i] -> targets[i] given as two int64 arrays
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        self._num_edges += len(targets)
+        self._add(sources, targets)
+
+    def _add(self, sources, targets):
+        if self.exact:
+            ids = np.concatenate((sources, targets))
+            if len(ids) == 0:
+                return
+            if ids.min() >= 0 and ids.max() < self._max_dense:
+                self._add_dense(sources, targets, int(ids.max()))
+                return
+            self._to_sampled()
+        self._add_sampled(sources, targets)
+
+    def _add_dense(self, sources, targets, top):
+        if top >= len(self._counts):
+            size = min(self._max_dense, max(2 * len(self._counts), top + 1, 1024))
+            self._counts = np.concatenate((self._counts, np.zeros(size - len(self._counts), dtype=np.int32)))
+            self._seen = np.concatenate((self._seen, np.zeros(size - len(self._seen), dtype=np.bool_)))
+        np.add.at(self._counts, targets, 1)
+        self._seen[sources] = True
+        self._seen[targets] = True
+
+    def _kept(self, ids):
+        """
+        Mask of the #ids kept at the current sampling level
+        """
+        if self._level == 0:
+            return np.ones(len(ids), dtype=np.bool_)
+        return (_hash(ids, self._seed) >> np.uint64(64 - self._level)) == 0
+
+    def _to_sampled(self):
+        self._level = 0
+        self._ids = np.flatnonzero(self._seen).astype(np.int64)
+        self._sample_counts = self._counts[self._ids].astype(np.int64)
+        self._counts = self._seen = None
+        self._shrink()
+
+    def _shrink(self):
+        while len(self._ids) > self._sample_size:
+            self._level += 1
+            kept = self._kept(self._ids)
+            self._ids = self._ids[kept]
+            self._sample_counts = self._sample_counts[kept]
+
+    def _add_sampled(self, sources, targets):
+        ids = np.concatenate((sources, targets))
+        is_target = np.concatenate((np.zeros(len(sources), dtype=np.int64),
+                                    np.ones(len(targets), dtype=np.int64)))
+        kept = self._kept(ids)
+        ids = ids[kept]
+        if len(ids) == 0:
+            return
+        ids, inverse = np.unique(ids, return_inverse=True)
+        increments = np.bincount(inverse, weights=is_target[kept], minlength=len(ids)).astype(np.int64)
+
+        where = np.searchsorted(self._ids, ids)
+        found = where < len(self._ids)
+        found[found] = self._ids[where[found]] == ids[found]
+        self._sample_counts[where[found]] += increments[found]
+        new = ~found
+        self._ids = np.insert(self._ids, where[new], ids[new])
+        self._sample_counts = np.insert(self._sample_counts, where[new], increments[new])
+        self._shrink()
+
+    def _degrees(self):
+        if self.exact:
+            return self._counts[self._seen]
+        return self._sample_counts
+
+    def num_nodes(self):
+        """
+        Number of distinct nodes seen so far (estimated in sampled mode)
+        """
+        if self.exact:
+            return int(self._seen.sum())
+        return len(self._ids) << self._level
+
+    def in_degree(self, node):
+        """
+        In-degree of #node, or None when it was sampled out
+        """
+        if self.exact:
+            return int(self._counts[node]) if 0 <= node < len(self._counts) else 0
+        idx = np.searchsorted(self._ids, node)
+        if idx < len(self._ids) and self._ids[idx] == node:
+            return int(self._sample_counts[idx])
+        return 0 if self._kept(np.array([node], dtype=np.int64))[0] else None
+
+    def distribution(self, normalized=False):
+        """
+        Returns the in-degree distribution seen so far: a dictionary mapping
+        every in-degree to the number of nodes with that in-degree (estimated
+        in sampled mode), or to the fraction of nodes when #normalized is True
+        """
+        degrees = self._degrees()
+        if len(degrees) == 0:
+            return {}
+        counts = np.bincount(degrees)
+        values = np.flatnonzero(counts)
+        if normalized:
+            return dict(zip(values.tolist(), (counts[values] / float(len(degrees))).tolist()))
+        scale = 1 if self.exact else 1 << self._level
+        return dict(zip(values.tolist(), (counts[values] * scale).tolist()))
+
+
+def streaming_in_degree_distribution(edges, normalized=True, **options):
+    """
+    Returns the in-degree distribution of the stream of (source, target)
+    pairs #edges, computed by an InDegreeAccumulator built with #options
+    """
+    accumulator = InDegreeAccumulator(**options)
+    accumulator.update(edges)
+    return accumulator.distribution(normalized)
@@ -1,7 +1,9 @@
 #!/usr/bin python3.5
 import random
-from collections import Counter
-from matplotlib import pyplot as plt
+from csr_graph import CSRGraph, adjacency_in_degrees, degree_distribution
+from graph_io import load_graph_cached
+from graph_generators import dpa_graph
+from power_law import fit_binned_power_law
 
 
 class Graph(object):
@@ -41,18 +43,20 @@ class Graph(object):
     def get_nodes(self):
         return self._graph.keys()
 
+    def to_csr(self):
+        """
+        Returns a read-only CSRGraph with the same adjacency,
+        which takes a few bytes per edge instead of a set entry
+        """
+        return CSRGraph.from_dict(self._graph)
+
     def in_degrees(self):
         """
         Returns a dictionary of in-degrees of the nodes
         of the input digraph
         """
-        degrees = dict.fromkeys(self._graph, 0)
-        edges = []
-        for value in self._graph.values():
-            edges += list(value)
-        for edge in edges:
-            degrees[edge] += 1
-        return degrees
+        labels, degrees = adjacency_in_degrees(self._graph)
+        return dict(zip(labels.tolist(), degrees.tolist()))
 
     def out_degrees(self):
         """Returns a dictionary of out-degrees of the nodes
@@ -63,16 +67,20 @@ class Graph(object):
         return degrees
 
     def in_degree_distribution(self, normalized=False):
-        """Returns the degree distribution of a digraph"""
-        num_nodes = float(len(self._graph))
-        degrees = self.in_degrees()
-        self._deg_dist = dict(Counter(degrees.values()))
-        if normalized:
-            for degree in iter(self._deg_dist):
-                self._deg_dist[degree] /= num_nodes
+        """Returns the degree distribution of a digraph
+        The in-degrees come from a single bincount over the
+        flattened neighbor sets, without building a CSR graph"""
+        self._deg_dist = degree_distribution(adjacency_in_degrees(self._graph)[1], normalized)
         return self._deg_dist
 
+    def out_degree_distribution(self, normalized=False):
+        """Returns the out-degree distribution of a digraph"""
+        return degree_distribution(list(map(len, self._graph.values())), normalized)
+
     def plot(self, log=True, file_name='', title='', xlabel='', ylabel='', color='#634017'):
+        # imported here: matplotlib is only paid for by the code that plots
+        from matplotlib import pyplot as plt
+
         if log:
             plt.loglog(self._graph.keys(), self._graph.values(), 'o', color=color)
         else:
@@ -130,21 +138,28 @@ def load_graph_data(file_name):
     return nodes, edges
 
 
-citation_graph_data = load_graph_data('alg_phys-cite.txt')
+def Q1():
+    """
+    Log-log plot of the normalized in-degree distribution of the citation graph
+    """
+    from matplotlib import pyplot as plt
+
+    # parsed once, later runs memory-map the binary cache written next to the text file
+    citation_graph = load_graph_cached('alg_phys-cite.txt', directed=True)
+    normalized_degree_dist = citation_graph.in_degree_distribution(normalized=True)
 
-# Q1
-citation_graph = Graph(*citation_graph_data, directed=True)
-normalized_degree_dist = citation_graph.in_degree_distribution(normalized=True)
+    plt.loglog(normalized_degree_dist.keys(), normalized_degree_dist.values(), 'o', color='#634017')
+    plt.title("Log-log plot of the normalized\ndegree distribution of paper's citations", fontsize=18, color='#ff8800')
+    plt.xlabel("Number of Citations", fontsize=14, color='#ff8800')
+    plt.ylabel("Papers", fontsize=14, color='#ff8800')
 
-plt.loglog(normalized_degree_dist.keys(), normalized_degree_dist.values(), 'o', color='#634017')
-plt.title("Log-log plot of the normalized\ndegree distribution of paper's citations", fontsize=18, color='#ff8800')
-plt.xlabel("Number of Citations", fontsize=14, color='#ff8800')
-plt.ylabel("Papers", fontsize=14, color='#ff8800')
+    citation_fit = fit_binned_power_law(citation_graph.in_degree_distribution())
+    print("Citation graph: in-degree power law exponent %.2f for in-degree >= %d (log-binned, KS distance %.3f)" %
+          (citation_fit.alpha, citation_fit.xmin, citation_fit.ks))
 
-# plt.savefig('Q1.jpg', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
+    # plt.savefig('Q1.jpg', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
 
 
-# Q4
 class DPATrial:
     """
     Simple class to encapsulate optimized trials for DPA algorithm
@@ -193,18 +208,29 @@ class DPATrial:
         return new_node_neighbors
 
 
-graph = Graph()
-graph.make_complete(13, True)
-trials = DPATrial(13)
-for node in range(13, 27769):
-    new_nodes = trials.run_trial(13)
-    graph[node] = new_nodes
+def Q4():
+    """
+    Log-log plot of the normalized in-degree distribution of a DPA graph
+    of the size of the citation graph
+    """
+    from matplotlib import pyplot as plt
+
+    # Same model as DPATrial, generated in one batched call straight into a CSRGraph
+    graph = dpa_graph(27770, 13)
+
+    normalized_degree_dist = graph.in_degree_distribution(normalized=True)
+
+    plt.loglog(normalized_degree_dist.keys(), normalized_degree_dist.values(), 'o', color='#634017')
+    plt.title("Log-log plot of the normalized\nin-degree distribution of the DPA graph\nwith 27770 node and num of fixed edges", fontsize=18, color='#ff8800')
+    plt.xlabel("Number of Citations", fontsize=14, color='#ff8800')
+    plt.ylabel("Papers", fontsize=14, color='#ff8800')
 
+    dpa_fit = fit_binned_power_law(graph.in_degree_distribution())
+    print("DPA graph: in-degree power law exponent %.2f for in-degree >= %d (log-binned, KS distance %.3f)" %
+          (dpa_fit.alpha, dpa_fit.xmin, dpa_fit.ks))
+    # plt.savefig('Q4.png', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
 
-normalized_degree_dist = graph.in_degree_distribution(normalized=True)
 
-plt.loglog(normalized_degree_dist.keys(), normalized_degree_dist.values(), 'o', color='#634017')
-plt.title("Log-log plot of the normalized\nin-degree distribution of the DPA graph\nwith 27770 node and num of fixed edges", fontsize=18, color='#ff8800')
-plt.xlabel("Number of Citations", fontsize=14, color='#ff8800')
-plt.ylabel("Papers", fontsize=14, color='#ff8800')
-# plt.savefig('Q4.png', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
+if __name__ == '__main__':
+    Q1()
+    Q4()
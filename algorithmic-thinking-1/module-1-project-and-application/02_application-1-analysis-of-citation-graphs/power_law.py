@@ -0,0 +1,238 @@
+"""
+Power-law fit of a degree distribution
+
+Works on the degree histogram only (a dictionary degree -> count, as
+returned by in_degree_distribution), never on the nodes, so the cost
+depends on the number of distinct degrees and not on the size of the graph.
+
+fit_power_law follows Clauset, Shalizi and Newman (2009):
+    - for a candidate xmin, the exponent alpha is the discrete maximum
+      likelihood estimate over the degrees >= xmin, i.e. the maximum of
+          -alpha * sum(ln x) - n * ln zeta(alpha, xmin)
+    - xmin is the candidate whose fit has the smallest Kolmogorov-Smirnov
+      distance to the empirical tail distribution.
+The tail sizes and log sums of every candidate come from one suffix sum
+over the histogram, and the likelihoods and KS distances of all the
+candidates are evaluated together as NumPy matrices. When there are more
+distinct degrees than max_candidates, the candidates are taken on a
+logarithmic grid.
+
+fit_binned_power_law fits the same model to the histogram aggregated in
+logarithmic bins, with the binned likelihood of Virkar and Clauset (2014)
+and xmin searched over the bin edges: the sparse, noisy high-degree end
+of the histogram is pooled into a few well-filled bins.
+
+log_binned aggregates the histogram in the same logarithmic bins for plotting.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+MAX_CANDIDATES = 200  # xmin candidates tried, log-spaced beyond that
+MIN_TAIL = 50  # smallest number of nodes a fitted tail may have
+
+PowerLawFit = namedtuple('PowerLawFit', 'alpha xmin ks n_tail log_likelihood')
+
+
+def _histogram(distribution):
+    """
+    Returns the (degrees, counts) arrays of the positive degrees of the
+    dictionary #distribution, by increasing degree
+    A normalized #distribution is scaled back to node counts
+    """
+    degrees = np.fromiter(distribution.keys(), dtype=np.float64, count=len(distribution))
+    counts = np.fromiter(distribution.values(), dtype=np.float64, count=len(distribution))
+    order = np.argsort(degrees)
+    degrees = degrees[order]
+    counts = counts[order]
+    keep = (degrees > 0) & (counts > 0)
+    degrees = degrees[keep]
+    counts = counts[keep]
+    if len(counts) and not np.array_equal(counts, np.round(counts)):
+        # normalized histogram: back to node counts, the rarest degree counting one node
+        counts = np.round(counts / counts.min())
+    return degrees, counts
+
+
+def hurwitz_zeta(alpha, start, terms=10):
+    """
+    Hurwitz zeta function sum over k >= 0 of (start + k) ** -alpha, for alpha > 1
+
+    Sums the first #terms terms and the Euler-Maclaurin expansion of the rest.
+    #alpha and #start broadcast against each other.
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)
+    start = np.asarray(start, dtype=np.float64)
+    total = np.zeros(np.broadcast(alpha, start).shape)
+    for k in range(terms):
+        total += (start + k) ** -alpha
+    tail = start + terms
+    total += tail ** (1 - alpha) / (alpha - 1) + tail ** -alpha / 2
+    # Bernoulli terms B2 / 2!, B4 / 4!, B6 / 6!
+    factor = alpha * tail ** (-alpha - 1)
+    total += factor / 12
+    factor = factor * (alpha + 1) * (alpha + 2) / tail ** 2
+    total -= factor / 720
+    factor = factor * (alpha + 3) * (alpha + 4) / tail ** 2
+    total += factor / 30240
+    return total
+
+
+def _candidates(degrees, tail_sizes, max_candidates, min_tail):
+    """
+    Returns the indices (in #degrees) of the xmin candidates
+    """
+    indices = np.flatnonzero(tail_sizes >= min_tail)
+    if len(indices) == 0:
+        indices = np.array([0])
+    if len(indices) > max_candidates:
+        grid = np.geomspace(degrees[indices[0]], degrees[indices[-1]], max_candidates)
+        indices = np.unique(indices[np.minimum(np.searchsorted(degrees[indices], grid), len(indices) - 1)])
+    return indices
+
+
+def _refine(alpha, log_likelihood, width, steps=41):
+    """
+    Evaluate #log_likelihood (a function of the candidates x exponents
+    grid) on a grid of #steps exponents of half-width #width around the
+    #alpha of every candidate and return the best ones
+    """
+    offsets = np.linspace(-width, width, steps)
+    grid = np.maximum(alpha[:, None] + offsets[None, :], 1 + 1e-6)
+    likelihood = log_likelihood(grid)
+    best = np.argmax(likelihood, axis=1)
+    rows = np.arange(len(alpha))
+    return grid[rows, best], likelihood[rows, best]
+
+
+def fit_power_law(distribution, max_candidates=MAX_CANDIDATES, min_tail=MIN_TAIL):
+    """
+    Fit a discrete power law to the tail of the degree histogram #distribution
+
+    Returns a PowerLawFit: the exponent alpha, the lower bound xmin of the
+    tail, the KS distance of the fit, the (weighted) number of nodes in the
+    tail and the log likelihood of the fit. Degree 0 is ignored.
+    """
+    degrees, counts = _histogram(distribution)
+    if len(degrees) == 0:
+        raise ValueError('no positive degree to fit')
+
+    # suffix sums: nodes and sum of ln(degree) at or above every degree
+    tail_sizes = np.cumsum(counts[::-1])[::-1]
+    log_sums = np.cumsum((counts * np.log(degrees))[::-1])[::-1]
+
+    indices = _candidates(degrees, tail_sizes, max_candidates, min_tail)
+    xmin = degrees[indices]
+    num = tail_sizes[indices]
+    sums = log_sums[indices]
+
+    def log_likelihood(grid):
+        return -grid * sums[:, None] - num[:, None] * np.log(hurwitz_zeta(grid, xmin[:, None]))
+
+    # continuous approximation as a starting point, then finer and finer grids
+    alpha = 1 + num / np.maximum(sums - num * np.log(xmin - 0.5), 1e-12)
+    width = 0.5
+    for dummy_round in range(4):
+        alpha, likelihood = _refine(alpha, log_likelihood, width)
+        width /= 20
+
+    # KS distance over the observed degrees of every tail
+    zeta = hurwitz_zeta(alpha[:, None], degrees[None, :])
+    model = zeta / hurwitz_zeta(alpha, xmin)[:, None]
+    empirical = tail_sizes[None, :] / num[:, None]
+    in_tail = degrees[None, :] >= xmin[:, None]
+    ks = np.where(in_tail, np.abs(empirical - model), 0).max(axis=1)
+
+    best = int(np.argmin(ks))
+    return PowerLawFit(float(alpha[best]), int(xmin[best]), float(ks[best]),
+                       float(num[best]), float(likelihood[best]))
+
+
+def _log_bins(degrees, counts, bins_per_decade):
+    """
+    Returns (edges, totals): the integer edges of logarithmic bins covering
+    the positive #degrees (bin j holds the degrees edges[j] <= d < edges[j + 1])
+    and the number of nodes in every bin
+    """
+    num_bins = max(1, int(np.ceil(np.log10(degrees[-1] + 1) * bins_per_decade)))
+    edges = np.unique(np.floor(np.logspace(0, np.log10(degrees[-1] + 1), num_bins + 1)))
+    edges[-1] = degrees[-1] + 1
+    return edges, np.histogram(degrees, bins=edges, weights=counts)[0]
+
+
+def log_binned(distribution, bins_per_decade=10, normalized=True):
+    """
+    Aggregate the degree histogram #distribution in logarithmic bins
+
+    Returns (centers, density) arrays: the geometric center of every
+    non-empty bin and the number of nodes per unit of degree in the bin
+    (divided by the total number of nodes when #normalized). Degree 0 is
+    left out, as it has no place on a log-log plot.
+    """
+    degrees, counts = _histogram(distribution)
+    if len(degrees) == 0:
+        return np.zeros(0), np.zeros(0)
+    edges, totals = _log_bins(degrees, counts, bins_per_decade)
+    widths = np.diff(edges)
+    keep = totals > 0
+    density = totals[keep] / widths[keep]
+    if normalized:
+        density /= counts.sum()
+    return np.sqrt(edges[:-1] * (edges[1:] - 1))[keep], density
+
+
+def fit_binned_power_law(distribution, bins_per_decade=10, min_tail=MIN_TAIL):
+    """
+    Fit a discrete power law to the log-binned degree histogram #distribution
+
+    Only the number of nodes in every bin of log_binned is used. For xmin
+    a bin edge, the tail bin [lower, upper) has the probability
+        (zeta(alpha, lower) - zeta(alpha, upper)) / zeta(alpha, xmin)
+    (the last bin is open ended), alpha maximizes the likelihood of the
+    bin counts and xmin is the edge whose fit has the smallest KS distance
+    over the bin edges. Degree 0 is ignored.
+
+    Returns a PowerLawFit, as fit_power_law does.
+    """
+    degrees, counts = _histogram(distribution)
+    if len(degrees) == 0:
+        raise ValueError('no positive degree to fit')
+    edges, totals = _log_bins(degrees, counts, bins_per_decade)
+    lower = edges[:-1]
+    tail_sizes = np.cumsum(totals[::-1])[::-1]
+    occupied = np.cumsum((totals > 0)[::-1])[::-1]
+
+    # a tail needs enough nodes, and two occupied bins to have a slope
+    indices = np.flatnonzero((tail_sizes >= min_tail) & (occupied >= 2))
+    if len(indices) == 0:
+        indices = np.array([0])
+    xmin = lower[indices]
+    num = tail_sizes[indices]
+    in_tail = np.arange(len(lower))[None, :] >= indices[:, None]
+    weights = np.where(in_tail, totals[None, :], 0)
+
+    def log_likelihood(grid):
+        zeta = hurwitz_zeta(grid[:, :, None], lower[None, None, :])
+        mass = zeta - np.concatenate((zeta[:, :, 1:], np.zeros(zeta.shape[:2] + (1,))), axis=2)
+        log_mass = np.log(np.where(weights[:, None, :] > 0, mass, 1))
+        return ((weights[:, None, :] * log_mass).sum(axis=2) -
+                num[:, None] * np.log(hurwitz_zeta(grid, xmin[:, None])))
+
+    # continuous approximation on the bin centers, then finer and finer grids
+    centers = np.sqrt(lower * (edges[1:] - 1))
+    sums = (weights * np.log(centers)[None, :]).sum(axis=1)
+    alpha = 1 + num / np.maximum(sums - num * np.log(xmin - 0.5), 1e-12)
+    width = 2.0
+    for dummy_round in range(5):
+        alpha, likelihood = _refine(alpha, log_likelihood, width)
+        width /= 20
+
+    # KS distance over the lower edges of the tail bins
+    zeta = hurwitz_zeta(alpha[:, None], lower[None, :])
+    model = zeta / hurwitz_zeta(alpha, xmin)[:, None]
+    empirical = tail_sizes[None, :] / num[:, None]
+    ks = np.where(in_tail, np.abs(empirical - model), 0).max(axis=1)
+
+    best = int(np.argmin(ks))
+    return PowerLawFit(float(alpha[best]), int(xmin[best]), float(ks[best]),
+                       float(num[best]), float(likelihood[best]))
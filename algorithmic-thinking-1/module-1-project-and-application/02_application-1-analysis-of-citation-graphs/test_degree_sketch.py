@@ -0,0 +1,76 @@
+"""
+Tests of the streaming in-degree accumulator against plain counting
+
+    python -m pytest -q test_degree_sketch.py
+"""
+import random
+
+import pytest
+
+from degree_sketch import InDegreeAccumulator, edges_from_file, streaming_in_degree_distribution
+
+
+def random_edges(num_nodes, num_edges, rng, low=0):
+    return [(rng.randrange(low, low + num_nodes), rng.randrange(low, low + num_nodes))
+            for dummy_idx in range(num_edges)]
+
+
+def brute_in_degrees(edges, nodes=()):
+    in_degrees = dict((node, 0) for node in nodes)
+    for source, target in edges:
+        in_degrees.setdefault(source, 0)
+        if target is not None:
+            in_degrees[target] = in_degrees.get(target, 0) + 1
+    return in_degrees
+
+
+def brute_distribution(in_degrees, normalized=False):
+    distribution = {}
+    for degree in in_degrees.values():
+        distribution[degree] = distribution.get(degree, 0) + 1
+    if normalized:
+        return dict((degree, count / float(len(in_degrees))) for degree, count in distribution.items())
+    return distribution
+
+
+@pytest.mark.parametrize('max_dense', [1 << 24, 50])
+def test_exact_counts_match_brute_force(max_dense):
+    rng = random.Random(26)
+    edges = random_edges(300, 2000, rng) + [(1000, None), (7, None)]
+    rng.shuffle(edges)
+    accumulator = InDegreeAccumulator(max_dense=max_dense, sample_size=10000)
+    accumulator.update(edges, batch_size=97)
+    in_degrees = brute_in_degrees(edges)
+    # the sample holds every node: the counts stay exact after the switch
+    assert accumulator.exact == (max_dense > 1000)
+    assert accumulator.num_edges == 2000
+    assert accumulator.num_nodes() == len(in_degrees)
+    assert accumulator.distribution() == brute_distribution(in_degrees)
+    assert accumulator.distribution(normalized=True) == pytest.approx(brute_distribution(in_degrees, True))
+    assert all(accumulator.in_degree(node) == degree for node, degree in in_degrees.items())
+
+
+def test_switch_to_sampling_keeps_exact_degrees():
+    rng = random.Random(27)
+    edges = random_edges(20000, 100000, rng, low=-10000)
+    accumulator = InDegreeAccumulator(max_dense=1000, sample_size=2000, seed=3)
+    accumulator.update(edges, batch_size=5000)
+    in_degrees = brute_in_degrees(edges)
+    assert not accumulator.exact
+    assert accumulator.nbytes <= 2 * 8 * 2000
+    kept = [node for node in in_degrees if accumulator.in_degree(node) is not None]
+    assert 500 <= len(kept) <= 2000
+    assert all(accumulator.in_degree(node) == in_degrees[node] for node in kept)
+    assert accumulator.num_nodes() == pytest.approx(len(in_degrees), rel=0.15)
+    estimate = accumulator.distribution(normalized=True)
+    expected = brute_distribution(in_degrees, normalized=True)
+    mean = sum(degree * fraction for degree, fraction in estimate.items())
+    assert mean == pytest.approx(sum(degree * fraction for degree, fraction in expected.items()), rel=0.1)
+
+
+def test_edges_from_file(tmp_path):
+    path = tmp_path / 'graph.txt'
+    path.write_text('0 1 2 \n1 2\n\n2\n3 0 \n')
+    edges = list(edges_from_file(str(path)))
+    assert edges == [(0, 1), (0, 2), (1, 2), (2, None), (3, 0)]
+    assert streaming_in_degree_distribution(iter(edges), normalized=False) == {0: 1, 1: 2, 2: 1}
@@ -0,0 +1,58 @@
+"""
+Tests of the power-law fits on samples of known exponent
+
+    python -m pytest -q test_power_law.py
+"""
+import numpy as np
+import pytest
+
+from power_law import fit_binned_power_law, fit_power_law, hurwitz_zeta
+
+
+def sample_distribution(alpha, size, seed, xmin=1, noise=0):
+    """
+    Degree histogram of #size discrete power-law degrees >= #xmin,
+    plus #noise uniform degrees below #xmin
+    """
+    rng = np.random.default_rng(seed)
+    degrees = np.zeros(0, dtype=np.int64)
+    while len(degrees) < size:
+        batch = rng.zipf(alpha, size)
+        degrees = np.concatenate((degrees, batch[batch >= xmin]))
+    degrees = np.concatenate((degrees[:size], rng.integers(1, xmin, noise) if noise else []))
+    values, counts = np.unique(degrees.astype(np.int64), return_counts=True)
+    return dict(zip(values.tolist(), counts.tolist()))
+
+
+@pytest.mark.parametrize('alpha', [1.5, 2.0, 3.2])
+@pytest.mark.parametrize('start', [1.0, 7.0, 250.0])
+def test_hurwitz_zeta_matches_direct_sum(alpha, start):
+    terms = start + np.arange(2000000)
+    end = start + 2000000
+    direct = (terms ** -alpha).sum() + end ** (1 - alpha) / (alpha - 1) + end ** -alpha / 2
+    assert hurwitz_zeta(alpha, start) == pytest.approx(direct, rel=1e-9)
+
+
+@pytest.mark.parametrize('fit', [fit_power_law, fit_binned_power_law])
+@pytest.mark.parametrize('alpha', [2.0, 2.5, 3.0])
+def test_fit_recovers_exponent(fit, alpha):
+    result = fit(sample_distribution(alpha, 100000, seed=int(alpha * 10)))
+    assert result.alpha == pytest.approx(alpha, abs=0.03)
+    assert result.xmin <= 3
+
+
+@pytest.mark.parametrize('fit', [fit_power_law, fit_binned_power_law])
+def test_fit_finds_tail_above_noise(fit):
+    distribution = sample_distribution(2.5, 5000, seed=1, xmin=20, noise=50000)
+    result = fit(distribution)
+    assert result.alpha == pytest.approx(2.5, abs=0.1)
+    assert 10 <= result.xmin <= 40
+    assert result.n_tail == sum(count for degree, count in distribution.items() if degree >= result.xmin)
+
+
+def test_binned_fit_ignores_normalization():
+    distribution = sample_distribution(2.5, 20000, seed=2)
+    total = float(sum(distribution.values()))
+    normalized = dict((degree, count / total) for degree, count in distribution.items())
+    assert fit_binned_power_law(normalized) == pytest.approx(fit_binned_power_law(distribution))
+
@@ -8,19 +8,20 @@
    as a sequence of nodes are deleted from the graph.
 """
 from collections import deque, Counter
-from random import choice
 
 
 class Queue(object):
     """
     Queue wrapper implementation of deque
     """
-    def __init__(self, arg=list()):
+    def __init__(self, arg=()):
         self._queue = deque(arg)
 
-    def __iter__(self):  # TODO: find a way to do it without using sorted
-        for value in sorted(self._queue, reverse=False):
-            yield value
+    def __iter__(self):
+        """
+        Iterate from the front (next value to dequeue) to the back
+        """
+        return reversed(self._queue)
 
     def __len__(self):
         return len(self._queue)
@@ -54,6 +55,25 @@ class Queue(object):
         self._queue.clear()
 
 
+def _bfs_component(ugraph, start_node, visited):
+    """
+    Breadth-first search from #start_node, adding every visited node to the set #visited
+    Returns the list of the visited nodes, which doubles as the queue
+    (a head index instead of deque method calls)
+    """
+    visited.add(start_node)
+    queue = [start_node]
+    head = 0
+    while head < len(queue):
+        node = queue[head]
+        head += 1
+        for neighbor in ugraph[node]:
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append(neighbor)
+    return queue
+
+
 def bfs_visited(ugraph, start_node):
     """
     Breadth-first search implementation
@@ -61,17 +81,8 @@ def bfs_visited(ugraph, start_node):
     Returns the set consisting of all nodes that are visited
     by a breadth-first search that starts at start_node.
     """
-    queue = Queue()
     visited = set()
-    visited.add(start_node)
-    queue.enqueue(start_node)
-    while not queue.is_empty():
-        node = queue.dequeue()
-        for neighbor in ugraph[node]:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.enqueue(neighbor)
-
+    _bfs_component(ugraph, start_node, visited)
     return visited
 
 
@@ -83,25 +94,18 @@ def cc_visited(ugraph):
     the nodes in a connected component, and there is exactly
     one set in the list for each connected component in ugraph and nothing else.
     """
-    remaining_nodes = set(ugraph.keys())
-    connected_components = list()
-    while len(remaining_nodes) != 0:
-        node = choice(list(remaining_nodes))
-        visited = bfs_visited(ugraph, node)
-        connected_components.append(visited)
-        remaining_nodes.difference_update(visited)
-
-    return connected_components
+    visited = set()
+    return [set(_bfs_component(ugraph, node, visited))
+            for node in list(ugraph.keys()) if node not in visited]
 
 
 def largest_cc_size(ugraph):
     """Takes the undirected graph #ugraph.
     Returns the size (an integer) of the largest connected component in ugraph.
     """
-    connected_components = cc_visited(ugraph)
-    if len(connected_components) == 0:
-        return 0
-    return len(sorted(connected_components, key=len, reverse=True)[0])
+    visited = set()
+    return max([len(_bfs_component(ugraph, node, visited))
+                for node in list(ugraph.keys()) if node not in visited], default=0)
 
 
 def compute_resilience(ugraph, attack_order):
@@ -0,0 +1,202 @@
+"""
+Attack order strategies
+
+Every strategy is a function strategy(graph, rng) of an undirected
+CSRGraph and a NumPy random generator, returning the attack order as an
+array of node positions. That is the order argument of
+resilience.run_resilience_trials, and attack_order turns it into node
+labels for compute_resilience. Strategies are looked up by name in
+ATTACK_ORDERS; register_attack_order adds new ones.
+
+    random           uniformly random order
+    adaptive_degree  node of maximal current degree, degrees updated after
+                     every removal (targeted_order), bucket queue, O(n + m)
+    degree           nodes by decreasing initial degree, one sort
+    betweenness      nodes by decreasing betweenness, estimated from a
+                     sample of BFS sources (Brandes), O(samples * m)
+    core             nodes by decreasing core number (k-core peeling,
+                     Batagelj and Zaversnik), O(n + m)
+"""
+import numpy as np
+
+from graph_class import BucketQueue
+from graph_views import as_csr
+from resilience import random_attack
+
+BETWEENNESS_SAMPLES = 64  # BFS sources of the betweenness estimate
+
+
+def adaptive_degree_order(graph, rng=None):
+    """
+    Repeatedly remove a node of maximal current degree
+
+    Nodes sit in a graph_class.BucketQueue keyed by their current degree;
+    removing a node moves each of its remaining neighbors one bucket down.
+    Ties go to the node that entered its bucket last.
+    """
+    offsets, neighbors = graph.adjacency_lists()
+    buckets = BucketQueue(np.diff(graph.offsets).tolist())
+    removed = bytearray(len(graph))
+    order = []
+    while buckets:
+        idx = buckets.pop_max()
+        removed[idx] = 1
+        order.append(idx)
+        for neighbor in neighbors[offsets[idx]:offsets[idx + 1]]:
+            if not removed[neighbor]:
+                buckets.decrement(neighbor)
+    return np.array(order, dtype=np.int64)
+
+
+def degree_order(graph, rng=None):
+    """
+    Nodes by decreasing initial degree (ties by position)
+    """
+    return np.argsort(-np.diff(graph.offsets), kind='stable')
+
+
+def _dependencies(offsets, neighbors, source):
+    """
+    Brandes dependencies of every node on the shortest paths from #source,
+    computed one BFS level at a time over the CSR arrays
+
+    Every level only touches the edges leaving its frontier: slot maps a
+    visited node to its index in its own level, so sigma and delta are
+    accumulated on frontier indices and a source costs O(n + m) whatever
+    the diameter.
+    """
+    num_nodes = len(offsets) - 1
+    slot = np.full(num_nodes, -1, dtype=np.int64)
+    sigma = np.zeros(num_nodes)
+    slot[source] = 0
+    sigma[source] = 1
+    frontier = np.array([source], dtype=np.int64)
+    levels = []
+    while len(frontier):
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            break
+        tail_idx = np.repeat(np.arange(len(frontier)), counts)
+        heads = neighbors[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)]
+        # edges to unvisited nodes are exactly the shortest path edges
+        on_path = slot[heads] == -1
+        tail_idx = tail_idx[on_path]
+        heads = heads[on_path]
+        # the last copy of every head claims its slot: no sort needed
+        claims = np.arange(len(heads))
+        slot[heads] = claims
+        next_frontier = heads[slot[heads] == claims]
+        slot[next_frontier] = np.arange(len(next_frontier))
+        head_idx = slot[heads]
+        tail_sigma = sigma[frontier][tail_idx]
+        next_sigma = np.bincount(head_idx, weights=tail_sigma, minlength=len(next_frontier))
+        sigma[next_frontier] = next_sigma
+        levels.append((frontier, tail_idx, next_frontier, head_idx, tail_sigma / next_sigma[head_idx]))
+        frontier = next_frontier
+
+    delta = np.zeros(num_nodes)
+    for frontier, tail_idx, next_frontier, head_idx, ratio in reversed(levels):
+        weights = ratio * (1 + delta[next_frontier][head_idx])
+        delta[frontier] += np.bincount(tail_idx, weights=weights, minlength=len(frontier))
+    delta[source] = 0
+    return delta
+
+
+def betweenness(graph, rng=None, samples=BETWEENNESS_SAMPLES):
+    """
+    Returns the betweenness of every node position, estimated from
+    #samples BFS sources drawn without replacement (exact when
+    #samples >= n), scaled to the whole graph
+    """
+    rng = np.random.default_rng(rng)
+    num_nodes = len(graph)
+    offsets = np.asarray(graph.offsets, dtype=np.int64)
+    neighbors = np.asarray(graph.neighbors, dtype=np.int64)
+    sources = rng.permutation(num_nodes)[:samples]
+    scores = np.zeros(num_nodes)
+    for source in sources.tolist():
+        scores += _dependencies(offsets, neighbors, source)
+    if len(sources):
+        scores *= num_nodes / float(len(sources))
+    return scores / 2  # every path is counted from both of its ends
+
+
+def betweenness_order(graph, rng=None, samples=BETWEENNESS_SAMPLES):
+    """
+    Nodes by decreasing estimated betweenness, ties by decreasing degree
+    """
+    scores = betweenness(graph, rng, samples)
+    return np.lexsort((-np.diff(graph.offsets), -scores))
+
+
+def core_numbers(graph):
+    """
+    Returns the core number of every node position
+    (Batagelj and Zaversnik bucket peeling, O(n + m))
+    """
+    offsets, neighbors = graph.adjacency_lists()
+    degrees = np.diff(graph.offsets)
+    num_nodes = len(degrees)
+    # nodes sorted by degree, with the start of every degree block
+    order = np.argsort(degrees, kind='stable')
+    starts = np.zeros(int(degrees.max(initial=0)) + 2, dtype=np.int64)
+    np.cumsum(np.bincount(degrees, minlength=len(starts) - 1), out=starts[1:])
+    position = np.empty(num_nodes, dtype=np.int64)
+    position[order] = np.arange(num_nodes)
+
+    order = order.tolist()
+    position = position.tolist()
+    starts = starts.tolist()
+    core = degrees.tolist()
+    for current in range(num_nodes):
+        idx = order[current]
+        for neighbor in neighbors[offsets[idx]:offsets[idx + 1]]:
+            degree = core[neighbor]
+            if degree > core[idx]:
+                # swap neighbor with the first node of its degree block,
+                # then move the block boundary past it
+                first = starts[degree]
+                first_node = order[first]
+                if first_node != neighbor:
+                    neighbor_position = position[neighbor]
+                    order[first], order[neighbor_position] = neighbor, first_node
+                    position[neighbor], position[first_node] = first, neighbor_position
+                starts[degree] += 1
+                core[neighbor] = degree - 1
+    return np.array(core, dtype=np.int64)
+
+
+def core_order(graph, rng=None):
+    """
+    Nodes by decreasing core number, ties by decreasing degree
+    """
+    return np.lexsort((-np.diff(graph.offsets), -core_numbers(graph)))
+
+
+ATTACK_ORDERS = {
+    'random': random_attack,
+    'adaptive_degree': adaptive_degree_order,
+    'degree': degree_order,
+    'betweenness': betweenness_order,
+    'core': core_order,
+}
+
+
+def register_attack_order(name, strategy):
+    """
+    Make #strategy(graph, rng) available under #name
+    """
+    ATTACK_ORDERS[name] = strategy
+
+
+def attack_order(graph, strategy='adaptive_degree', seed=None, **options):
+    """
+    Returns the attack order of #graph (CSRGraph, Graph or dict of sets)
+    under the strategy named #strategy, as a list of node labels that can
+    be passed to compute_resilience; #options go to the strategy
+    """
+    graph = as_csr(graph)
+    order = ATTACK_ORDERS[strategy](graph, np.random.default_rng(seed), **options)
+    return graph.labels[order].tolist()
@@ -1,8 +1,12 @@
 #!/usr/bin python3.5
 import random
 from itertools import chain
-from collections import deque, Counter
-from matplotlib import pyplot as plt
+from collections import deque
+from csr_graph import CSRGraph, adjacency_in_degrees, degree_distribution
+from graph_io import load_graph_cached
+import graph_search
+from graph_views import RemovalView, as_csr
+from graph_generators import upa_graph, er_edge_chunks
 from copy import deepcopy
 
 
@@ -10,12 +14,14 @@ class Queue(object):
     """
     Queue wrapper implementation of deque
     """
-    def __init__(self, arg=list()):
+    def __init__(self, arg=()):
         self._queue = deque(arg)
 
-    def __iter__(self):  # TODO: find a way to do it without using sorted
-        for value in sorted(self._queue, reverse=False):
-            yield value
+    def __iter__(self):
+        """
+        Iterate from the front (next value to dequeue) to the back
+        """
+        return reversed(self._queue)
 
     def __len__(self):
         return len(self._queue)
@@ -49,6 +55,147 @@ class Queue(object):
         self._queue.clear()
 
 
+class DisjointSet(object):
+    """
+    Disjoint-set forest (union by size, path halving)
+    Keeps track of the size of every component and of the largest one
+    """
+    def __init__(self):
+        self._parent = dict()
+        self._size = dict()
+        self.largest = 0
+
+    def __contains__(self, node):
+        return node in self._parent
+
+    def __len__(self):
+        return len(self._parent)
+
+    def add(self, node):
+        """
+        Add #node as a singleton component
+        """
+        self._parent[node] = node
+        self._size[node] = 1
+        if self.largest == 0:
+            self.largest = 1
+
+    def find(self, node):
+        """
+        Returns the representative of the component containing #node
+        """
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, node_1, node_2):
+        """
+        Merge the components containing #node_1 and #node_2
+        """
+        root_1 = self.find(node_1)
+        root_2 = self.find(node_2)
+        if root_1 == root_2:
+            return
+        if self._size[root_1] < self._size[root_2]:
+            root_1, root_2 = root_2, root_1
+        self._parent[root_2] = root_1
+        self._size[root_1] += self._size.pop(root_2)
+        if self._size[root_1] > self.largest:
+            self.largest = self._size[root_1]
+
+    def union_neighbors(self, node, neighbors):
+        """
+        Merge the component containing #node with the component of every
+        node of #neighbors already in the forest; the others are skipped
+        Same as a union per neighbor, in one call (find is inlined)
+        """
+        parent = self._parent
+        size = self._size
+        root = node
+        while parent[root] != root:
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        for neighbor in neighbors:
+            if neighbor not in parent:
+                continue
+            other = neighbor
+            while parent[other] != other:
+                parent[other] = parent[parent[other]]
+                other = parent[other]
+            if other == root:
+                continue
+            if size[root] < size[other]:
+                root, other = other, root
+            parent[other] = root
+            size[root] += size.pop(other)
+            if size[root] > self.largest:
+                self.largest = size[root]
+
+
+class BucketQueue(object):
+    """
+    Max priority queue over the integers 0..n-1 keyed by small integer degrees
+    Every bucket is a doubly linked list stored in flat lists, so push, remove
+    and decrement are O(1) and popping the maximum is amortized O(1) as long
+    as keys only go down
+    """
+    def __init__(self, degrees):
+        num_items = len(degrees)
+        self._degrees = list(degrees)
+        self._head = [-1] * (max(self._degrees, default=0) + 1)
+        self._next = [-1] * num_items
+        self._prev = [-1] * num_items
+        self._max = len(self._head) - 1
+        self._len = 0
+        # push backwards so each bucket starts out in increasing item order
+        for item in range(num_items - 1, -1, -1):
+            self._push(item)
+
+    def __len__(self):
+        return self._len
+
+    def _push(self, item):
+        bucket = self._degrees[item]
+        first = self._head[bucket]
+        self._prev[item] = -1
+        self._next[item] = first
+        if first != -1:
+            self._prev[first] = item
+        self._head[bucket] = item
+        self._len += 1
+
+    def _unlink(self, item):
+        prev_item = self._prev[item]
+        next_item = self._next[item]
+        if prev_item == -1:
+            self._head[self._degrees[item]] = next_item
+        else:
+            self._next[prev_item] = next_item
+        if next_item != -1:
+            self._prev[next_item] = prev_item
+        self._len -= 1
+
+    def decrement(self, item):
+        """
+        Move #item one bucket down
+        """
+        self._unlink(item)
+        self._degrees[item] -= 1
+        self._push(item)
+
+    def pop_max(self):
+        """
+        Remove and return the item with the largest key
+        """
+        while self._head[self._max] == -1:
+            self._max -= 1
+        item = self._head[self._max]
+        self._unlink(item)
+        return item
+
+
 class Graph(object):
     """docstring for Graph"""
     def __init__(self, nodes=[], edges=[], directed=False):
@@ -57,6 +204,22 @@ class Graph(object):
         if len(nodes):
             self._make_graph(nodes, edges, directed)
 
+    def add_edges(self, sources, targets, directed=False):
+        """
+        Add the edges sources[i] -> targets[i], stored the same
+        way _make_graph does (smaller node first when undirected)
+        """
+        graph = self._graph
+        if directed:
+            for source, target in zip(sources, targets):
+                graph[source].add(target)
+        else:
+            for source, target in zip(sources, targets):
+                if source < target:
+                    graph[source].add(target)
+                else:
+                    graph[target].add(source)
+
     def make_complete(self, num_nodes, directed=False):
         nodes = list(range(num_nodes))
         edges = [(node_1, node_2) for node_1 in nodes for node_2 in nodes if node_1 != node_2]
@@ -98,24 +261,33 @@ class Graph(object):
     def get_nodes(self):
         return self._graph.keys()
 
+    def to_csr(self):
+        """
+        Returns a read-only CSRGraph with the same adjacency,
+        which takes a few bytes per edge instead of a set entry
+        """
+        return CSRGraph.from_dict(self._graph)
+
     def get_num_edges(self):
         return sum([len(x) for x in self._graph.values()])
 
     def copy(self):
         return deepcopy(self._graph)
 
+    def view(self):
+        """
+        Returns a RemovalView of the graph: nodes can be deleted
+        from the view without copying or touching the graph
+        """
+        return RemovalView(self)
+
     def in_degrees(self):
         """
         Returns a dictionary of in-degrees of the nodes
         of the input digraph
         """
-        degrees = dict.fromkeys(self._graph, 0)
-        edges = []
-        for value in self._graph.values():
-            edges += list(value)
-        for edge in edges:
-            degrees[edge] += 1
-        return degrees
+        labels, degrees = adjacency_in_degrees(self._graph)
+        return dict(zip(labels.tolist(), degrees.tolist()))
 
     def out_degrees(self):
         """Returns a dictionary of out-degrees of the nodes
@@ -126,16 +298,20 @@ class Graph(object):
         return degrees
 
     def in_degree_distribution(self, normalized=False):
-        """Returns the degree distribution of a digraph"""
-        num_nodes = float(len(self))
-        degrees = self.in_degrees()
-        self._deg_dist = dict(Counter(degrees.values()))
-        if normalized:
-            for degree in iter(self._deg_dist):
-                self._deg_dist[degree] /= num_nodes
+        """Returns the degree distribution of a digraph
+        The in-degrees come from a single bincount over the
+        flattened neighbor sets, without building a CSR graph"""
+        self._deg_dist = degree_distribution(adjacency_in_degrees(self._graph)[1], normalized)
         return self._deg_dist
 
+    def out_degree_distribution(self, normalized=False):
+        """Returns the out-degree distribution of a digraph"""
+        return degree_distribution(list(map(len, self._graph.values())), normalized)
+
     def plot(self, log=True, file_name='', title='', xlabel='', ylabel='', color='#634017'):
+        # imported here: matplotlib is only paid for by the code that plots
+        from matplotlib import pyplot as plt
+
         if log:
             plt.loglog(self._graph.keys(), self._graph.values(), 'o', color=color)
         else:
@@ -150,8 +326,21 @@ class Graph(object):
 
 class ER(Graph):
 
-    def __init__(self, num_nodes, probability, directed=False):
+    def __init__(self, num_nodes, probability, directed=False, fast=False, seed=None):
+        """
+        With #fast the edges are streamed from er_edge_chunks (geometric
+        skipping, O(n + m)) instead of testing all n^2 ordered pairs.
+        Note that the fast generator draws every unordered pair once with
+        #probability, the n^2 loop draws both orders and keeps the edge if
+        either succeeds (probability 1 - (1 - p)^2)
+        """
         nodes = range(num_nodes)
+        if fast:
+            super().__init__(nodes, [], directed)
+            for sources, targets in er_edge_chunks(num_nodes, probability, directed, seed):
+                self.add_edges(sources.tolist(), targets.tolist(), directed)
+            return
+
         edges = list(chain.from_iterable([(i, j), (j, i)]
                      for i in nodes
                      for j in nodes
@@ -243,19 +432,11 @@ def bfs_visited(ugraph, start_node):
     Takes the undirected graph #ugraph and the node #start_node
     Returns the set consisting of all nodes that are visited
     by a breadth-first search that starts at start_node.
-    """
-    queue = Queue()
-    visited = set()
-    visited.add(start_node)
-    queue.enqueue(start_node)
-    while not queue.is_empty():
-        node = queue.dequeue()
-        for neighbor in ugraph[node]:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.enqueue(neighbor)
 
-    return visited
+    A Graph stores an undirected edge on its smaller endpoint only, so
+    the search runs on the symmetric adjacency of as_csr.
+    """
+    return graph_search.bfs_visited(as_csr(ugraph), start_node)
 
 
 def cc_visited(ugraph):
@@ -265,26 +446,17 @@ def cc_visited(ugraph):
     Returns a list of sets, where each set consists of all
     the nodes in a connected component, and there is exactly
     one set in the list for each connected component in ugraph and nothing else.
+    The list is a graph_search.Components over as_csr(ugraph), whose sets
+    are only built when they are accessed.
     """
-    remaining_nodes = set(ugraph.get_nodes())
-    connected_components = list()
-    while remaining_nodes:
-        node = random.choice(list(remaining_nodes))
-        visited = bfs_visited(ugraph, node)
-        connected_components.append(visited)
-        remaining_nodes.difference_update(visited)
-
-    return connected_components
+    return graph_search.cc_visited(as_csr(ugraph))
 
 
 def largest_cc_size(ugraph):
     """Takes the undirected graph #ugraph.
     Returns the size (an integer) of the largest connected component in ugraph.
     """
-    connected_components = cc_visited(ugraph)
-    if len(connected_components) == 0:
-        return 0
-    return len(sorted(connected_components, key=len, reverse=True)[0])
+    return graph_search.largest_cc_size(as_csr(ugraph))
 
 
 def compute_resilience(ugraph, attack_order):
@@ -296,14 +468,41 @@ def compute_resilience(ugraph, attack_order):
     in the graph after the removal of the first k nodes in attack_order.
     The first entry (indexed by zero) is the size of the largest connected component
     in the original graph.
+
+    The attack is replayed backwards: starting from the nodes that survive the
+    whole attack, the attacked nodes are added back one by one and merged with
+    their neighbors in a DisjointSet, so the curve costs O((n + m) * alpha(n))
+    instead of one full connected components sweep per removed node.
+
+    A Graph stores an undirected edge on its smaller endpoint only, so the
+    replay walks the symmetric adjacency of as_csr, on node positions.
     """
-    ugraph = ugraph.copy()
-    cc_lst = list()
-    for node in attack_order:
-        cc_lst.append(largest_cc_size(ugraph))
-        del ugraph[node]
+    graph = as_csr(ugraph)
+    return position_resilience(graph, graph.positions(list(attack_order)).tolist())
+
 
-    cc_lst.append(largest_cc_size(ugraph))
+def position_resilience(graph, attack_positions):
+    """
+    compute_resilience of the undirected CSRGraph #graph under an attack
+    given as the list of node positions #attack_positions
+    """
+    offsets, neighbors = graph.adjacency_lists()
+    attacked = set(attack_positions)
+    survivors = [idx for idx in range(len(graph)) if idx not in attacked]
+    components = DisjointSet()
+    for idx in survivors:
+        components.add(idx)
+
+    for idx in survivors:
+        components.union_neighbors(idx, neighbors[offsets[idx]:offsets[idx + 1]])
+
+    cc_lst = [components.largest]
+    for idx in reversed(attack_positions):
+        components.add(idx)
+        components.union_neighbors(idx, neighbors[offsets[idx]:offsets[idx + 1]])
+        cc_lst.append(components.largest)
+
+    cc_lst.reverse()
     return cc_lst
 
 
@@ -314,32 +513,31 @@ def random_order(graph):
 
 
 def fast_targeted_order(graph):
-    graph = graph.copy()
-    graph_length = len(graph)
-    degree_sets = {}
-    for k in range(graph_length):
-        degree_sets[k] = set([])
+    """
+    Compute a targeted attack order consisting
+    of nodes of maximal degree in O(n + m)
 
-    degrees = graph.in_degrees()
-    for i in range(graph_length):
-        d = degrees[i]
-        degree_sets[d].add(i)
+    Nodes live in a BucketQueue keyed by their current degree; removing a
+    node moves each of its remaining neighbors one bucket down in O(1).
+    The graph itself is never modified: removals go to a RemovalView.
+    Nodes of equal degree may be attacked in a different order than in
+    targeted_order.
+
+    Returns:
+    A list of nodes
+    """
+    view = RemovalView(graph)
+    buckets = BucketQueue(view.degrees().tolist())
 
     order = []
-    i = 0
-    for k in range(graph_length - 1, -1, -1):
-        while degree_sets[k]:
-            degrees = graph.in_degrees()
-            node = degree_sets[k].pop()
-            for neighbor in graph[node]:
-                degrees = graph.in_degrees()
-                d = degrees[node]
-                degree_sets[d].remove(neighbor)
-                degree_sets[d - 1].add(neighbor)
-            order[i] = node
-            i += 1
-            del graph[node]
-    return order
+    while buckets:
+        idx = buckets.pop_max()
+        view.remove_position(idx)
+        order.append(idx)
+        for neighbor_idx in view.neighbor_positions(idx):
+            buckets.decrement(neighbor_idx)
+
+    return view.base.labels[order].tolist()
 
 
 def targeted_order(graph):
@@ -347,47 +545,41 @@ def targeted_order(graph):
     Compute a targeted attack order consisting
     of nodes of maximal degree
 
+    Removals go to a RemovalView over the graph instead of a deep copy,
+    so the graph is left untouched and each step is one scan of the
+    current degrees.
+
     Returns:
     A list of nodes
     """
-    # copy the graph
-    new_graph = graph.copy()
+    view = RemovalView(graph)
     order = []
-    while len(new_graph) > 0:
-        max_degree = -1
-        for node in new_graph:
-            if len(new_graph[node]) > max_degree:
-                max_degree = len(new_graph[node])
-                max_degree_node = node
-
-        neighbors = new_graph[max_degree_node]
-        new_graph.pop(max_degree_node)
-        for neighbor in neighbors:
-            new_graph[neighbor].remove(max_degree_node)
+    while len(view) > 0:
+        max_degree_idx = view.max_degree_position()
+        view.remove_position(max_degree_idx)
+        order.append(max_degree_idx)
+    return view.base.labels[order].tolist()
 
-        order.append(max_degree_node)
-    return order
 
+def demo_graphs():
+    """
+    Returns the (computer network, ER, UPA) graphs of the application,
+    built on request rather than when the module is imported
+    """
+    # Computer Network graph, parsed once and then read from its binary cache
+    comp_net_graph = load_graph_cached('alg_rf7.txt')
+    num_nodes = len(comp_net_graph)
 
-nodes, edges = load_graph_data('alg_rf7.txt')
-num_nodes = len(nodes)
-
-# Computer Network graph
-comp_net_graph = Graph(nodes, edges)
-
-# Erdos and Renyi graph
-er_graph = ER(num_nodes, .002)
+    # Erdos and Renyi graph
+    er_graph = ER(num_nodes, .002)
 
-# Preferential Attachment graph
-pa_graph = Graph()
-pa_graph.make_complete(3)
-trials = UPATrial(3)
-for node in range(3, num_nodes):
-    new_nodes = trials.run_trial(3)
-    pa_graph[node] = new_nodes
+    # Preferential Attachment graph
+    pa_graph = upa_graph(num_nodes, 3)
+    return comp_net_graph, er_graph, pa_graph
 
 
 def main():
+    comp_net_graph, er_graph, pa_graph = demo_graphs()
 
     # comp_attack_order = random.sample(random_order(comp_net_graph), 240)
     # er_attack_order = random.sample(random_order(er_graph), 240)
@@ -0,0 +1,195 @@
+"""
+Shortest path distances, hop-plot, diameter and average path length
+
+Breadth-first searches here run 64 sources at once: every node holds one
+uint64 word whose bit i says whether source i reached it. One BFS level
+for all 64 sources is a gather of the frontier words over the neighbor
+array and an OR-reduction per node (np.bitwise_or.reduceat), so a batch
+of 64 searches costs about one NumPy pass over the edges per level.
+Batches of sources can also be spread over a process pool.
+
+    bfs_distances         distance array of one source
+    multi_source_distances distance arrays of many sources
+    distance_histogram    number of (source, node) pairs at every distance
+    path_statistics       hop-plot, diameter and average path length,
+                          exact (every source) or sampled
+"""
+from multiprocessing import Pool
+
+import numpy as np
+
+WORD_SIZE = 64  # sources per uint64 word
+
+# set bits of every byte value, for NumPy < 2.0 which has no np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+_WORKER_ARRAYS = None
+
+
+def _table_popcount(words):
+    """
+    Returns the number of set bits of the uint64 array #words,
+    looked up byte by byte in _BYTE_POPCOUNT
+    """
+    return int(_BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].sum(dtype=np.int64))
+
+
+def _bitwise_popcount(words):
+    """
+    Returns the number of set bits of the uint64 array #words
+    """
+    return int(np.bitwise_count(words).sum())
+
+
+_popcount = _bitwise_popcount if hasattr(np, 'bitwise_count') else _table_popcount
+
+
+def _pull_arrays(graph):
+    """
+    Returns the (offsets, neighbors) arrays listing the in-neighbors of
+    every node position: the graph itself when undirected, its transpose
+    when directed
+    """
+    offsets = np.asarray(graph.offsets, dtype=np.int64)
+    neighbors = np.asarray(graph.neighbors)
+    if not graph.directed:
+        return offsets, neighbors
+    sources = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    order = np.argsort(neighbors, kind='stable')
+    reverse_offsets = np.zeros(len(offsets), dtype=np.int64)
+    np.cumsum(np.bincount(neighbors, minlength=len(offsets) - 1), out=reverse_offsets[1:])
+    return reverse_offsets, sources[order].astype(neighbors.dtype)
+
+
+def _levels(offsets, neighbors, sources):
+    """
+    Bit-parallel BFS from at most 64 #sources
+
+    Yields, level by level starting at distance 1, the uint64 word per node
+    of the sources reaching it at that distance
+    """
+    num_nodes = len(offsets) - 1
+    visited = np.zeros(num_nodes, dtype=np.uint64)
+    np.bitwise_or.at(visited, sources, np.uint64(1) << np.arange(len(sources), dtype=np.uint64))
+    linked = np.flatnonzero(offsets[1:] > offsets[:-1])
+    if len(linked) == 0:
+        return
+    starts = offsets[linked]
+    frontier = visited.copy()
+    reached = np.zeros(num_nodes, dtype=np.uint64)
+    while True:
+        reached[linked] = np.bitwise_or.reduceat(frontier[neighbors], starts)
+        reached &= ~visited
+        if not reached.any():
+            return
+        visited |= reached
+        frontier, reached = reached, frontier
+        yield frontier
+
+
+def _batch_histogram(offsets, neighbors, sources):
+    """
+    Returns [pairs at distance 0, pairs at distance 1, ...] for #sources
+    """
+    counts = [len(sources)]
+    for level in _levels(offsets, neighbors, sources):
+        counts.append(_popcount(level))
+    return counts
+
+
+def _init_worker(offsets, neighbors):
+    global _WORKER_ARRAYS
+    _WORKER_ARRAYS = (offsets, neighbors)
+
+
+def _worker_histogram(sources):
+    return _batch_histogram(_WORKER_ARRAYS[0], _WORKER_ARRAYS[1], sources)
+
+
+def _batches(sources):
+    return [sources[start:start + WORD_SIZE] for start in range(0, len(sources), WORD_SIZE)]
+
+
+def bfs_distances(graph, source):
+    """
+    Returns the distances from position #source to every node
+    position of the CSRGraph #graph (-1 when unreachable)
+    """
+    return multi_source_distances(graph, [source])[0]
+
+
+def multi_source_distances(graph, sources):
+    """
+    Returns the len(#sources) x n int32 matrix of distances from every
+    position of #sources (-1 when unreachable)
+    """
+    offsets, neighbors = _pull_arrays(graph)
+    sources = np.asarray(sources, dtype=np.int64)
+    distances = np.full((len(sources), len(graph)), -1, dtype=np.int32)
+    for start in range(0, len(sources), WORD_SIZE):
+        batch = sources[start:start + WORD_SIZE]
+        rows = np.arange(start, start + len(batch))
+        distances[rows, batch] = 0
+        for depth, level in enumerate(_levels(offsets, neighbors, batch), 1):
+            nodes = np.flatnonzero(level)
+            bits = np.unpackbits(level[nodes].view(np.uint8).reshape(-1, 8), axis=1,
+                                 bitorder='little')[:, :len(batch)]
+            node_idx, source_idx = np.nonzero(bits)
+            distances[start + source_idx, nodes[node_idx]] = depth
+    return distances
+
+
+def distance_histogram(graph, sources=None, workers=1):
+    """
+    Returns an int64 array whose entry d is the number of ordered
+    (source, node) pairs at distance d, over the positions #sources
+    (every node by default), with #workers processes
+    """
+    offsets, neighbors = _pull_arrays(graph)
+    if sources is None:
+        sources = np.arange(len(graph))
+    batches = _batches(np.unique(np.asarray(sources, dtype=np.int64)))
+    if workers > 1 and len(batches) > 1:
+        with Pool(workers, initializer=_init_worker, initargs=(offsets, neighbors)) as pool:
+            results = pool.map(_worker_histogram, batches, chunksize=1)
+    else:
+        results = [_batch_histogram(offsets, neighbors, batch) for batch in batches]
+
+    histogram = np.zeros(max([len(counts) for counts in results], default=1), dtype=np.int64)
+    for counts in results:
+        histogram[:len(counts)] += counts
+    return histogram
+
+
+def path_statistics(graph, samples=None, seed=None, workers=1):
+    """
+    Distance statistics of the CSRGraph #graph over the pairs of distinct
+    connected nodes, from every source (exact) or from #samples sources
+    drawn without replacement
+
+    Returns a dictionary with
+        'hop_plot'     hop_plot[h] = (estimated) number of ordered pairs of
+                       nodes at distance 1..h, for h = 0..max distance
+        'diameter'     largest distance found (a lower bound when sampled)
+        'average_path_length'  mean distance of connected pairs
+        'exact'        True when every node was a source
+        'num_sources'  number of BFS sources
+    """
+    num_nodes = len(graph)
+    exact = samples is None or samples >= num_nodes
+    if exact:
+        sources = np.arange(num_nodes)
+    else:
+        sources = np.random.default_rng(seed).choice(num_nodes, size=samples, replace=False)
+
+    histogram = distance_histogram(graph, sources, workers).astype(np.float64)
+    histogram[0] = 0
+    if not exact and len(sources):
+        histogram *= num_nodes / float(len(sources))
+    pairs = histogram.sum()
+    distances = np.arange(len(histogram))
+    return {'hop_plot': np.cumsum(histogram),
+            'diameter': len(histogram) - 1,
+            'average_path_length': float((distances * histogram).sum() / pairs) if pairs else 0.0,
+            'exact': exact,
+            'num_sources': len(sources)}
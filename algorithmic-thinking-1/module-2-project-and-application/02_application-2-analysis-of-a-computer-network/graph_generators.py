@@ -0,0 +1,185 @@
+"""
+Batched random graph generators
+
+DPA and UPA graphs follow exactly the model of DPATrial / UPATrial:
+the graph starts as a complete graph on num_edges nodes and every new
+node picks num_edges neighbors with replacement from a list of node numbers
+in which each node appears in proportion to its (in-)degree + 1.
+
+Instead of growing a Python list and calling random.choice once per edge,
+the node number list is preallocated for the whole run, the uniform draws
+come from a seeded NumPy generator in large blocks, and the edges are
+written into flat int64 arrays ready for CSRGraph.
+
+Erdos-Renyi graphs are generated with geometric skipping (Batagelj and
+Brandes): the gaps between consecutive edges in the list of all node pairs
+are geometric, so only the m edges are ever drawn, in O(n + m) expected time.
+"""
+from array import array
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+BLOCK_SIZE = 1 << 16  # new nodes per block of uniform draws
+ER_CHUNK_SIZE = 1 << 20  # edges per chunk of the ER generator
+
+
+def _complete_edges(num_nodes):
+    """
+    Returns the (sources, targets) arrays of the complete digraph on num_nodes nodes
+    """
+    sources, targets = np.divmod(np.arange(num_nodes * num_nodes, dtype=np.int64), num_nodes)
+    keep = sources != targets
+    return sources[keep], targets[keep]
+
+
+def _preferential_attachment(num_nodes, num_edges, undirected, seed=None):
+    """
+    Shared DPA / UPA generator
+
+    Returns the (sources, targets) arrays of the edges going from every new
+    node to the neighbors it picked, after the edges of the initial complete graph
+    """
+    rng = np.random.default_rng(seed)
+    init_sources, init_targets = _complete_edges(num_edges)
+    num_new = max(num_nodes - num_edges, 0)
+
+    # node numbers: num_edges copies of each initial node, then per new node
+    # one copy of itself (1 + #neighbors copies for UPA) and one per neighbor.
+    # A preallocated list is the fastest structure to index one draw at a time
+    copies_per_node = 1 + (2 if undirected else 1) * num_edges
+    node_numbers = [0] * (num_edges * num_edges + num_new * copies_per_node)
+    node_numbers[:num_edges * num_edges] = [node for node in range(num_edges) for dummy_idx in range(num_edges)]
+    length = num_edges * num_edges
+
+    counts = array('q')
+    targets = array('q')
+
+    for block_start in range(num_edges, num_nodes, BLOCK_SIZE):
+        block_stop = min(num_nodes, block_start + BLOCK_SIZE)
+        draws = rng.random((block_stop - block_start, num_edges)).tolist()
+        for node, row in zip(range(block_start, block_stop), draws):
+            neighbors = {node_numbers[int(draw * length)] for draw in row}
+            num_neighbors = len(neighbors)
+            counts.append(num_neighbors)
+            targets.extend(neighbors)
+
+            if undirected:
+                node_numbers[length:length + 1 + num_neighbors] = [node] * (1 + num_neighbors)
+                length += 1 + num_neighbors
+            else:
+                node_numbers[length] = node
+                length += 1
+            node_numbers[length:length + num_neighbors] = neighbors
+            length += num_neighbors
+
+    sources = np.repeat(np.arange(num_edges, max(num_nodes, num_edges), dtype=np.int64),
+                        np.frombuffer(counts, dtype=np.int64))
+    return (np.concatenate((init_sources, sources)),
+            np.concatenate((init_targets, np.frombuffer(targets, dtype=np.int64))))
+
+
+def dpa_edges(num_nodes, num_edges, seed=None):
+    """
+    Returns the (sources, targets) edge arrays of a DPA digraph
+    with #num_nodes nodes where every new node cites up to #num_edges nodes
+    """
+    return _preferential_attachment(num_nodes, num_edges, False, seed)
+
+
+def upa_edges(num_nodes, num_edges, seed=None):
+    """
+    Returns the (sources, targets) edge arrays of a UPA graph with #num_nodes
+    nodes where every new node connects to up to #num_edges nodes
+    Every undirected edge is listed once
+    """
+    return _preferential_attachment(num_nodes, num_edges, True, seed)
+
+
+def dpa_graph(num_nodes, num_edges, seed=None):
+    """
+    Returns a DPA digraph as a CSRGraph
+    """
+    sources, targets = dpa_edges(num_nodes, num_edges, seed)
+    return CSRGraph.from_arrays(np.arange(num_nodes), sources, targets, directed=True)
+
+
+def upa_graph(num_nodes, num_edges, seed=None):
+    """
+    Returns an undirected UPA graph as a CSRGraph
+    """
+    sources, targets = upa_edges(num_nodes, num_edges, seed)
+    return CSRGraph.from_arrays(np.arange(num_nodes), sources, targets, directed=False)
+
+
+def _decode_pairs(positions, num_nodes, directed):
+    """
+    Map positions in the list of all node pairs back to (sources, targets)
+
+    Undirected pairs (v, w) with w < v are listed as v * (v - 1) / 2 + w,
+    directed pairs (i, j) with i != j as i * (num_nodes - 1) + j (j skipping i)
+    """
+    if directed:
+        sources, targets = np.divmod(positions, num_nodes - 1)
+        targets += targets >= sources
+        return sources, targets
+
+    sources = np.floor((1 + np.sqrt(1 + 8 * positions.astype(np.float64))) / 2).astype(np.int64)
+    # fix the rounding of the square root for very large positions
+    sources -= sources * (sources - 1) // 2 > positions
+    sources += (sources + 1) * sources // 2 <= positions
+    targets = positions - sources * (sources - 1) // 2
+    return sources, targets
+
+
+def er_edge_chunks(num_nodes, probability, directed=False, seed=None, chunk_size=ER_CHUNK_SIZE):
+    """
+    Yields the edges of an Erdos-Renyi graph G(num_nodes, probability)
+    as (sources, targets) arrays of at most #chunk_size edges
+
+    Every pair of nodes (ordered pair when #directed) is an edge with
+    #probability, independently. Undirected edges are listed once, with
+    the larger node as source.
+    """
+    num_pairs = num_nodes * (num_nodes - 1)
+    if not directed:
+        num_pairs //= 2
+    if probability <= 0 or num_pairs <= 0:
+        return
+
+    if probability >= 1:
+        for start in range(0, num_pairs, chunk_size):
+            yield _decode_pairs(np.arange(start, min(num_pairs, start + chunk_size), dtype=np.int64),
+                                num_nodes, directed)
+        return
+
+    rng = np.random.default_rng(seed)
+    position = -1
+    while True:
+        positions = position + np.cumsum(rng.geometric(probability, size=chunk_size))
+        complete = positions[-1] < num_pairs
+        if not complete:
+            positions = positions[:np.searchsorted(positions, num_pairs)]
+        if len(positions):
+            yield _decode_pairs(positions, num_nodes, directed)
+        if not complete:
+            return
+        position = positions[-1]
+
+
+def er_graph(num_nodes, probability, directed=False, seed=None, chunk_size=ER_CHUNK_SIZE):
+    """
+    Returns an Erdos-Renyi graph as a CSRGraph, built from the edge chunks
+    of er_edge_chunks without any per-edge Python object
+    """
+    sources = []
+    targets = []
+    for chunk_sources, chunk_targets in er_edge_chunks(num_nodes, probability, directed, seed, chunk_size):
+        sources.append(chunk_sources)
+        targets.append(chunk_targets)
+    empty = [np.zeros(0, dtype=np.int64)]
+    return CSRGraph.from_arrays(np.arange(num_nodes),
+                                np.concatenate(sources or empty),
+                                np.concatenate(targets or empty),
+                                directed)
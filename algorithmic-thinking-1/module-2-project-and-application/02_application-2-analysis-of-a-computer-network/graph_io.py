@@ -0,0 +1,220 @@
+"""
+Streaming loader for graph files in adjacency-list text format
+
+Every line of the file is a node followed by its neighbors:
+    node neighbor_1 neighbor_2 ... neighbor_k
+
+The file is memory-mapped and parsed chunk by chunk straight into compact
+int64 arrays (node labels, neighbor counts and the flat neighbor list),
+which are then turned into a CSRGraph. No (node, neighbor) tuple is ever
+created, so peak memory stays a small multiple of the final graph.
+
+load_graph_cached also keeps a binary copy of the CSR arrays next to the
+text file and memory-maps it on later loads.
+"""
+import mmap
+import os
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+CHUNK_SIZE = 1 << 22  # 4 MiB
+
+# Binary cache layout: a fixed size header followed by the
+# labels (int64), offsets (int64) and neighbors (int32 or int64) arrays
+CACHE_MAGIC = b'CSRGRAPH'
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct('<8sIIqqqqq')  # magic, version, directed, source size,
+                                            # source mtime, num nodes, num edges, neighbor item size
+
+
+def _line_aligned(buffer, position):
+    """
+    Returns the offset of the first line starting at or after #position
+    """
+    if position <= 0:
+        return 0
+    newline = buffer.find(b'\n', position - 1)
+    return len(buffer) if newline == -1 else newline + 1
+
+
+def _parse_range(buffer, start, stop, chunk_size=CHUNK_SIZE):
+    """
+    Parse the lines of #buffer between the line-aligned offsets #start and #stop
+
+    Returns three int64 arrays: node labels, neighbor counts and
+    the neighbors of all the nodes one after the other
+    """
+    labels = array('q')
+    counts = array('q')
+    neighbors = array('q')
+    while start < stop:
+        end = min(stop, start + chunk_size)
+        if end < stop:
+            end = _line_aligned(buffer, end)
+        for line in buffer[start:end].split(b'\n'):
+            tokens = line.split()
+            if not tokens:
+                continue
+            labels.append(int(tokens[0]))
+            counts.append(len(tokens) - 1)
+            neighbors.extend(map(int, tokens[1:]))
+        start = end
+    return labels, counts, neighbors
+
+
+def _parse_file_range(file_name, start, stop, chunk_size=CHUNK_SIZE):
+    """
+    Worker entry point: map #file_name and parse one line-aligned byte range
+    """
+    with open(file_name, 'rb') as graph_file, \
+            mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return _parse_range(buffer, start, stop, chunk_size)
+
+
+def load_adjacency_arrays(file_name, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Parse an adjacency-list file into (labels, counts, neighbors) int64 arrays
+
+    With #workers > 1 the file is split at line boundaries into one byte
+    range per worker and the ranges are parsed in separate processes.
+    """
+    if os.path.getsize(file_name) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    with open(file_name, 'rb') as graph_file, \
+            mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        size = len(buffer)
+        if workers <= 1:
+            parts = [_parse_range(buffer, 0, size, chunk_size)]
+        else:
+            bounds = [_line_aligned(buffer, size * worker // workers)
+                      for worker in range(workers)] + [size]
+            ranges = [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_parse_file_range,
+                                      [file_name] * len(ranges),
+                                      [start for start, stop in ranges],
+                                      [stop for start, stop in ranges],
+                                      [chunk_size] * len(ranges)))
+
+    return tuple(np.concatenate([np.frombuffer(part[field], dtype=np.int64) for part in parts])
+                 for field in range(3))
+
+
+def load_graph_csr(file_name, directed=False, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Function that loads a graph given a text
+    representation of the graph
+
+    Returns a CSRGraph
+    """
+    labels, counts, neighbors = load_adjacency_arrays(file_name, workers, chunk_size)
+    print("Loaded graph with", len(labels), "nodes")
+    return CSRGraph.from_arrays(labels, np.repeat(labels, counts), neighbors, directed)
+
+
+def cache_file_name(file_name, directed=False):
+    """
+    Returns the name of the binary cache kept for the text graph #file_name
+    """
+    return '%s.%s.csr' % (file_name, 'directed' if directed else 'undirected')
+
+
+def write_graph_cache(graph, cache_name, source_stat):
+    """
+    Write the arrays of the CSRGraph #graph to #cache_name, tagged with the
+    size and modification time of the text file they were parsed from
+    """
+    neighbors = graph.neighbors
+    header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, int(graph.directed),
+                               source_stat.st_size, source_stat.st_mtime_ns,
+                               len(graph), len(neighbors), neighbors.dtype.itemsize)
+    temp_name = '%s.%d.tmp' % (cache_name, os.getpid())
+    try:
+        with open(temp_name, 'wb') as cache_file:
+            cache_file.write(header)
+            np.ascontiguousarray(graph.labels, dtype=np.int64).tofile(cache_file)
+            np.ascontiguousarray(graph.offsets, dtype=np.int64).tofile(cache_file)
+            np.ascontiguousarray(neighbors).tofile(cache_file)
+        os.replace(temp_name, cache_name)
+    finally:
+        # a write that failed half way leaves no partial file behind
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+
+
+def _map_array(cache_name, dtype, offset, count):
+    """
+    Read-only memory map of #count items of #dtype at byte #offset
+    """
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(cache_name, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+
+def read_graph_cache(cache_name, source_stat=None):
+    """
+    Memory-map the binary cache #cache_name as a CSRGraph
+
+    Returns None when the file is not a complete cache of this version, or
+    when #source_stat is given and the text file changed since the cache
+    was written: the caller then parses the text file again
+    """
+    try:
+        with open(cache_name, 'rb') as cache_file:
+            header = cache_file.read(CACHE_HEADER.size)
+            cache_size = os.fstat(cache_file.fileno()).st_size
+    except OSError:
+        return None
+    if len(header) != CACHE_HEADER.size:
+        return None
+    (magic, version, directed, source_size, source_mtime,
+     num_nodes, num_edges, itemsize) = CACHE_HEADER.unpack(header)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION or itemsize not in (4, 8):
+        return None
+    if min(num_nodes, num_edges) < 0 or cache_size != (CACHE_HEADER.size + 8 * num_nodes +
+                                                       8 * (num_nodes + 1) + itemsize * num_edges):
+        return None  # truncated, or not written by write_graph_cache
+    if source_stat is not None and (source_size != source_stat.st_size or
+                                    source_mtime != source_stat.st_mtime_ns):
+        return None
+
+    offset = CACHE_HEADER.size
+    try:
+        labels = _map_array(cache_name, np.int64, offset, num_nodes)
+        offset += labels.nbytes
+        offsets = _map_array(cache_name, np.int64, offset, num_nodes + 1)
+        offset += offsets.nbytes
+        neighbors = _map_array(cache_name, np.int32 if itemsize == 4 else np.int64, offset, num_edges)
+    except (OSError, ValueError):
+        return None  # the file changed under us: a cache miss
+    return CSRGraph.from_csr(labels, offsets, neighbors, bool(directed))
+
+
+def load_graph_cached(file_name, directed=False, workers=1, cache_name=None):
+    """
+    Load the text graph #file_name as a CSRGraph, parsing it only once
+
+    The first load writes a binary cache next to the text file,
+    later loads memory-map it as long as the text file keeps
+    the same size and modification time.
+    """
+    if cache_name is None:
+        cache_name = cache_file_name(file_name, directed)
+    source_stat = os.stat(file_name)
+    graph = read_graph_cache(cache_name, source_stat)
+    if graph is not None:
+        return graph
+
+    graph = load_graph_csr(file_name, directed, workers)
+    try:
+        write_graph_cache(graph, cache_name, source_stat)
+    except OSError:
+        pass  # read-only checkout: keep working without a cache
+    return graph
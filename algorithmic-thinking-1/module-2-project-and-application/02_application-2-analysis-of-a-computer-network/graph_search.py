@@ -0,0 +1,263 @@
+"""
+Allocation-light breadth-first search over CSRGraph
+
+All searches share one kernel working on node positions: the queue is a
+preallocated list of n slots used with head / tail indices (every node is
+enqueued at most once, so it never wraps), visited is a bytearray with one
+byte per node. A component sweep reuses the same queue and visited buffers
+for every component: after the sweep the queue holds every node, grouped
+by component.
+
+Small searches run as a plain Python loop. Once a whole level of the
+queue grows past FRONTIER_SWITCH nodes the rest of the search expands
+one level at a time with NumPy, over the same visited bytes, so the
+queue stays in breadth-first order.
+
+connected_components labels every node with its component in one
+union-find pass over the edge arrays instead of one search per component,
+and hands the components back as a lazy Components sequence.
+"""
+import numpy as np
+
+FRONTIER_SWITCH = 512
+
+
+def _expand(offsets, neighbors, frontier, visited):
+    """
+    Returns the not yet visited neighbors of the positions in #frontier
+    (each one once) and marks them visited
+    """
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return frontier[:0]
+    base = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    candidates = neighbors[base + np.arange(total)]
+    candidates = candidates[visited[candidates] == 0]
+    if len(candidates) == 0:
+        return candidates
+    candidates.sort()
+    candidates = candidates[np.concatenate(([True], candidates[1:] != candidates[:-1]))]
+    visited[candidates] = 1
+    return candidates
+
+
+def _bfs(graph, start, visited, queue, tail):
+    """
+    Visit the component of position #start, appending it to #queue at #tail
+
+    Returns the new tail: queue[old tail:new tail] is the component
+    """
+    offsets, neighbors = graph.adjacency_lists()
+    head = tail
+    visited[start] = 1
+    queue[tail] = start
+    tail += 1
+    level_end = tail
+    while head < tail:
+        if head == level_end:
+            # switch between levels only, so that every frontier is a whole level
+            if tail - head > FRONTIER_SWITCH:
+                break
+            level_end = tail
+        node = queue[head]
+        head += 1
+        for neighbor in neighbors[offsets[node]:offsets[node + 1]]:
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                queue[tail] = neighbor
+                tail += 1
+
+    if head < tail:
+        visited_view = np.frombuffer(visited, dtype=np.uint8)
+        frontier = np.array(queue[head:tail], dtype=np.int64)
+        while len(frontier):
+            frontier = _expand(graph.offsets, graph.neighbors, frontier, visited_view)
+            queue[tail:tail + len(frontier)] = frontier.tolist()
+            tail += len(frontier)
+        del visited_view
+    return tail
+
+
+def bfs_positions(graph, start):
+    """
+    Returns the positions visited by a breadth-first search
+    from position #start
+    """
+    queue = [0] * len(graph)
+    tail = _bfs(graph, start, bytearray(len(graph)), queue, 0)
+    return queue[:tail]
+
+
+def component_sweep(graph):
+    """
+    Returns (queue, bounds): queue lists every node position grouped by
+    connected component, component k is queue[bounds[k]:bounds[k + 1]]
+    """
+    num_nodes = len(graph)
+    visited = bytearray(num_nodes)
+    queue = [0] * num_nodes
+    bounds = [0]
+    tail = 0
+    start = visited.find(0)
+    while start != -1:
+        tail = _bfs(graph, start, visited, queue, tail)
+        bounds.append(tail)
+        start = visited.find(0, start + 1)
+    return queue, bounds
+
+
+def _compress(parent):
+    """
+    Pointer jumping until every entry of #parent points at its root
+    """
+    grand_parent = parent[parent]
+    while not np.array_equal(grand_parent, parent):
+        parent = grand_parent
+        grand_parent = parent[parent]
+    return parent
+
+
+def component_labels(graph):
+    """
+    Union-find over the edges of the CSRGraph #graph (edge directions ignored)
+
+    Returns (component, sizes): component[idx] is the component id of the
+    node at position idx, sizes[k] is the number of nodes in component k.
+    Components are numbered in order of their first node position.
+    """
+    num_nodes = len(graph)
+    parent = np.arange(num_nodes)
+    degrees = np.diff(graph.offsets)
+    sources = np.repeat(parent, degrees)
+    targets = graph.neighbors.astype(np.int64)
+    keep = sources < targets
+    if graph.directed:
+        keep |= sources > targets
+    sources = sources[keep]
+    targets = targets[keep]
+
+    # first round straight off the CSR rows: every node under its smallest neighbor
+    linked = np.flatnonzero(degrees)
+    if len(linked):
+        parent[linked] = np.minimum(linked, np.minimum.reduceat(graph.neighbors, graph.offsets[linked]))
+    parent = _compress(parent)
+
+    # every round links the larger root of each edge under the smaller one,
+    # then compresses all paths; edges inside one tree are dropped for good
+    while len(sources):
+        root_1 = parent[sources]
+        root_2 = parent[targets]
+        pending = root_1 != root_2
+        sources = sources[pending]
+        targets = targets[pending]
+        root_1 = root_1[pending]
+        root_2 = root_2[pending]
+        np.minimum.at(parent, np.maximum(root_1, root_2), np.minimum(root_1, root_2))
+        parent = _compress(parent)
+
+    roots = parent == np.arange(num_nodes)
+    component = (np.cumsum(roots) - 1)[parent]
+    return component, np.bincount(component, minlength=int(roots.sum()))
+
+
+class Components(object):
+    """
+    Connected components of a CSRGraph, as returned by connected_components
+
+    Sizes are available right away. Behaves like the list of sets returned
+    by cc_visited, but a component's set of node labels is only built when
+    it is asked for.
+    """
+    def __init__(self, graph):
+        self._graph = graph
+        self._component, self._sizes = component_labels(graph)
+        self._order = None
+        self._bounds = None
+
+    @property
+    def component(self):
+        return self._component
+
+    @property
+    def sizes(self):
+        return self._sizes
+
+    def largest_size(self):
+        """
+        Returns the size of the largest component (0 for an empty graph)
+        """
+        return int(self._sizes.max()) if len(self._sizes) else 0
+
+    def size_histogram(self):
+        """
+        Returns a dictionary mapping every component size
+        to the number of components of that size
+        """
+        counts = np.bincount(self._sizes) if len(self._sizes) else self._sizes
+        sizes = np.flatnonzero(counts)
+        return dict(zip(sizes.tolist(), counts[sizes].tolist()))
+
+    def positions(self, idx):
+        """
+        Returns the node positions of component #idx, in increasing order
+        """
+        if self._order is None:
+            self._order = np.argsort(self._component, kind='stable')
+            self._bounds = np.concatenate(([0], np.cumsum(self._sizes)))
+        return self._order[self._bounds[idx]:self._bounds[idx + 1]]
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def __getitem__(self, idx):
+        if not -len(self) <= idx < len(self):
+            raise IndexError('component index out of range')
+        return set(self._graph.labels[self.positions(idx % len(self))].tolist())
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def to_list(self):
+        """
+        Returns the components as a list of sets of node labels
+        """
+        return list(self)
+
+
+def connected_components(graph):
+    """
+    Returns the Components of the CSRGraph #graph
+    """
+    return Components(graph)
+
+
+def bfs_visited(ugraph, start_node):
+    """
+    Breadth-first search implementation
+    Takes the undirected graph #ugraph and the node #start_node
+    Returns the set consisting of all nodes that are visited
+    by a breadth-first search that starts at start_node.
+    """
+    labels = ugraph.labels.tolist()
+    return set(labels[idx] for idx in bfs_positions(ugraph, ugraph.position(start_node)))
+
+
+def cc_visited(ugraph):
+    """
+    Compute connected components
+    Takes the undirected graph #ugraph
+    Returns the Components of ugraph: a sequence with exactly one set
+    of nodes per connected component, each set built on first access
+    """
+    return connected_components(ugraph)
+
+
+def largest_cc_size(ugraph):
+    """Takes the undirected graph #ugraph.
+    Returns the size (an integer) of the largest connected component in ugraph.
+    """
+    queue, bounds = component_sweep(ugraph)
+    return max([stop - start for start, stop in zip(bounds, bounds[1:])], default=0)
@@ -0,0 +1,140 @@
+"""
+Removal-mask views over an immutable graph
+
+Attack simulations delete nodes one by one. Instead of deep-copying the
+adjacency and deleting from the copy, a RemovalView leaves the base
+CSRGraph untouched: a removal flips one byte of a mask and decrements the
+current degree of the removed node's neighbors, so it costs O(degree) and
+the degree of any node is known in O(1). Any number of views (one per
+attack strategy, or per trial) share the same base arrays; a view costs
+n bytes of mask plus n int64 degrees.
+"""
+import numpy as np
+
+from csr_graph import CSRGraph
+
+
+def as_csr(graph):
+    """
+    Returns #graph as an undirected CSRGraph
+    An undirected CSRGraph is used as it is, a dict of sets or a Graph is
+    converted once. A directed CSRGraph raises ValueError: its rows only
+    hold out-neighbors, so component sizes computed on it would be wrong
+    """
+    if isinstance(graph, CSRGraph):
+        if graph.directed:
+            raise ValueError('expected an undirected graph')
+        return graph
+    if not isinstance(graph, dict):
+        graph = dict((node, graph[node]) for node in graph.get_nodes())
+    return CSRGraph.from_dict(graph, directed=False)
+
+
+class RemovalView(object):
+    """
+    Undirected graph seen through a node removal mask
+
+    Reads like the dict of sets it replaces (len, in, iteration, view[node],
+    del view[node]); the *_position methods work on node positions of the
+    base graph and avoid any label lookup.
+    """
+    def __init__(self, graph):
+        base = as_csr(graph)
+        self._base = base
+        self._removed = bytearray(len(base))
+        self._degrees = base.out_degree_array().astype(np.int64)
+        self._num_removed = 0
+
+    def copy(self):
+        """
+        Returns an independent view of the same base graph, with the same
+        nodes removed, in O(n) whatever the number of edges
+        """
+        view = RemovalView.__new__(RemovalView)
+        view._base = self._base
+        view._removed = bytearray(self._removed)
+        view._degrees = self._degrees.copy()
+        view._num_removed = self._num_removed
+        return view
+
+    @property
+    def base(self):
+        return self._base
+
+    def __len__(self):
+        return len(self._base) - self._num_removed
+
+    def __contains__(self, node):
+        return node in self._base and not self._removed[self._base.position(node)]
+
+    def __iter__(self):
+        return iter(self._base.labels[self.positions()].tolist())
+
+    def __getitem__(self, node):
+        labels = self._base.labels.tolist()
+        return set(labels[idx] for idx in self.neighbor_positions(self._live_position(node)))
+
+    def __delitem__(self, node):
+        self.remove_position(self._live_position(node))
+
+    def _live_position(self, node):
+        idx = self._base.position(node)
+        if self._removed[idx]:
+            raise KeyError(node)
+        return idx
+
+    def get_nodes(self):
+        return list(self)
+
+    def degree(self, node):
+        """
+        Returns the number of remaining neighbors of #node
+        """
+        return int(self._degrees[self._live_position(node)])
+
+    def is_removed(self, idx):
+        return bool(self._removed[idx])
+
+    def positions(self):
+        """
+        Returns the positions of the remaining nodes, in base graph order
+        """
+        return np.flatnonzero(np.frombuffer(self._removed, dtype=np.uint8) == 0)
+
+    def degrees(self):
+        """
+        Returns the current degree of every node position
+        (meaningless for removed positions)
+        """
+        return self._degrees
+
+    def neighbor_positions(self, idx):
+        """
+        Returns the positions of the remaining neighbors of position #idx
+        """
+        offsets, neighbors = self._base.adjacency_lists()
+        removed = self._removed
+        return [neighbor for neighbor in neighbors[offsets[idx]:offsets[idx + 1]]
+                if not removed[neighbor]]
+
+    def remove_position(self, idx):
+        """
+        Remove the node at position #idx and its edges
+        """
+        if self._removed[idx]:
+            raise KeyError(idx)
+        self._removed[idx] = 1
+        self._num_removed += 1
+        # every neighbor loses one edge; removed neighbors are decremented
+        # too, which keeps the update free of any mask lookup
+        self._degrees[self._base.neighbor_positions(idx)] -= 1
+        self._degrees[idx] = -len(self._degrees) - 1
+
+    def max_degree_position(self):
+        """
+        Returns the first remaining position (in base graph order)
+        of maximal current degree
+        """
+        if not len(self):
+            raise KeyError('max_degree_position of an empty view')
+        return int(np.argmax(self._degrees))
@@ -2,21 +2,32 @@
 import random
 import time
 from itertools import chain
-import matplotlib.pyplot as plt
+from functools import partial
+import numpy as np
 from collections import deque
-from copy import deepcopy
+from graph_io import load_graph_cached
+from graph_class import (bfs_visited, cc_visited, largest_cc_size, compute_resilience,
+                         fast_targeted_order, targeted_order)
+from graph_generators import upa_graph, er_graph
+from resilience import resilience_experiment, resilience_curve
+from attack_orders import ATTACK_ORDERS
+from graph_distances import path_statistics
+
+ER_PROBABILITY = .002  # make_er tests every ordered pair of nodes with this probability
 
 
 class Queue(object):
     """
     Queue wrapper implementation of deque
     """
-    def __init__(self, arg=list()):
+    def __init__(self, arg=()):
         self._queue = deque(arg)
 
-    def __iter__(self):  # TODO: find a way to do it without using sorted
-        for value in sorted(self._queue, reverse=False):
-            yield value
+    def __iter__(self):
+        """
+        Iterate from the front (next value to dequeue) to the back
+        """
+        return reversed(self._queue)
 
     def __len__(self):
         return len(self._queue)
@@ -141,18 +152,25 @@ def make_er(num_nodes, probability):
     return make_graph(nodes, edges)
 
 
-def make_upa(num_edges, num_nodes):
-    graph = make_complete_graph(num_edges)
-    trials = UPATrial(num_edges)
+def er_edge_probability(probability=ER_PROBABILITY):
+    """Returns the probability that make_er(num_nodes, #probability) joins
+    two given nodes: it tests both orders of the pair, so 1 - (1 - p)^2
+    This is the probability to give er_graph for the same graphs"""
+    return 1 - (1 - probability) ** 2
 
-    for node in range(num_edges, num_nodes):
-        new_nodes = trials.run_trial(num_edges)
-        graph[node] = new_nodes
 
-        for neighbor in new_nodes:
-            graph[neighbor].add(node)
+def make_fast_er(num_nodes, probability, seed=None):
+    """Returns an undirected G(n, p) graph as a dictionary, generated with
+    geometric skipping in O(n + m) expected time
+    Every unordered pair is an edge with #probability, while make_er tests both
+    orders of each pair (edge probability 1 - (1 - p)^2)"""
+    return er_graph(num_nodes, probability, seed=seed).to_dict()
 
-    return graph
+
+def make_upa(num_edges, num_nodes, seed=None):
+    """Returns an undirected UPA graph as a dictionary
+    Same model as UPATrial, generated in one batched call"""
+    return upa_graph(num_nodes, num_edges, seed).to_dict()
 
 
 def load_graph_data(file_name):
@@ -185,148 +203,24 @@ def load_graph_data(file_name):
     return nodes, edges
 
 
-def bfs_visited(ugraph, start_node):
-    """
-    Breadth-first search implementation
-    Takes the undirected graph #ugraph and the node #start_node
-    Returns the set consisting of all nodes that are visited
-    by a breadth-first search that starts at start_node.
-    """
-    queue = Queue()
-    visited = set()
-    visited.add(start_node)
-    queue.enqueue(start_node)
-    while not queue.is_empty():
-        node = queue.dequeue()
-        for neighbor in ugraph[node]:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.enqueue(neighbor)
-
-    return visited
-
-
-def cc_visited(ugraph):
-    """
-    Compute connected components
-    Takes the undirected graph #ugraph
-    Returns a list of sets, where each set consists of all
-    the nodes in a connected component, and there is exactly
-    one set in the list for each connected component in ugraph and nothing else.
-    """
-    remaining_nodes = set(ugraph.keys())
-    connected_components = list()
-    while remaining_nodes:
-        node = random.choice(list(remaining_nodes))
-        visited = bfs_visited(ugraph, node)
-        connected_components.append(visited)
-        remaining_nodes.difference_update(visited)
-
-    return connected_components
-
-
-def largest_cc_size(ugraph):
-    """Takes the undirected graph #ugraph.
-    Returns the size (an integer) of the largest connected component in ugraph.
-    """
-    connected_components = cc_visited(ugraph)
-    if not connected_components:
-        return 0
-    return len(sorted(connected_components, key=len, reverse=True)[0])
-
-
-def compute_resilience(ugraph, attack_order):
-    """Takes the undirected graph #ugraph, a list of nodes #attack_order
-    For each node in the list, the function removes the given node and its edges
-    from the graph and then computes the size of the largest connected component
-    for the resulting graph.
-    Returns a list whose k+1th entry is the size of the largest connected component
-    in the graph after the removal of the first k nodes in attack_order.
-    The first entry (indexed by zero) is the size of the largest connected component
-    in the original graph.
-    """
-    ugraph = deepcopy(ugraph)
-    cc_lst = list()
-    for node in attack_order:
-        cc_lst.append(largest_cc_size(ugraph))
-        remove_node(ugraph, node)
-
-    cc_lst.append(largest_cc_size(ugraph))
-    return cc_lst
-
-
 def random_order(graph):
     nodes = list(graph.keys())
     random.shuffle(nodes)
     return nodes
 
 
-def fast_targeted_order(graph):
-    graph = deepcopy(graph)
-    graph_length = len(graph)
-    degree_sets = [set([]) for degree in range(graph_length)]
-
-    for i in graph.keys():
-        d = len(graph[i])
-        degree_sets[d].add(i)
-
-    order = []
-    for k in range(len(graph) - 1, -1, -1):
-
-        while degree_sets[k]:
-            node = degree_sets[k].pop()
-
-            for neighbor in graph[node]:
-                d = len(graph[neighbor])
-                degree_sets[d].remove(neighbor)
-                degree_sets[d - 1].add(neighbor)
-
-            order.append(node)
-            remove_node(graph, node)
-
-    return order
-
-
-def targeted_order(graph):
-    """
-    Compute a targeted attack order consisting
-    of nodes of maximal degree
-
-    Returns:
-    A list of nodes
-    """
-    # copy the graph
-    new_graph = deepcopy(graph)
-    order = []
-    while len(new_graph) > 0:
-        max_degree = -1
-        for node in new_graph:
-            if len(new_graph[node]) > max_degree:
-                max_degree = len(new_graph[node])
-                max_degree_node = node
-
-        neighbors = new_graph[max_degree_node]
-        new_graph.pop(max_degree_node)
-        for neighbor in neighbors:
-            new_graph[neighbor].remove(max_degree_node)
-
-        order.append(max_degree_node)
-    return order
-
-
 ##################################################
 # Application 2 questions
 def Q1():
+    import matplotlib.pyplot as plt  # only loaded by the code that plots
 
     # Generating graphs
-    nodes, edges = load_graph_data('alg_rf7.txt')
-    num_nodes = len(nodes)
-
-    # Computer Network graph
-    comp_net_graph = make_graph(nodes, edges)
+    # Computer Network graph, parsed once and then read from its binary cache
+    comp_net_graph = load_graph_cached('alg_rf7.txt').to_dict()
+    num_nodes = len(comp_net_graph)
 
     # Erdos and Renyi graph
-    er_graph = make_er(num_nodes, .002)
+    er_graph = make_er(num_nodes, ER_PROBABILITY)
 
     # Preferential Attachment graph
     pa_graph = make_upa(3, num_nodes)
@@ -364,11 +258,50 @@ def Q1():
     # print(len(pa_graph), sum([len(x) for x in pa_graph.values()]) // 2, largest_cc_size(pa_graph))
 
 
+def Q1_trials(num_trials=100, workers=None):
+    """
+    Q1 averaged over #num_trials random attack orders, with a fresh
+    ER / UPA sample per trial, run on a process pool (see resilience.py)
+    Plots the mean curve of every graph and its 5-95 percentile band
+    """
+    import matplotlib.pyplot as plt
+    comp_net_graph = load_graph_cached('alg_rf7.txt')
+    num_nodes = len(comp_net_graph)
+
+    experiments = [('Computer Network', 'blue', dict(graph=comp_net_graph)),
+                   ('ER random graph, P = %g' % ER_PROBABILITY, 'green',
+                    dict(generator=partial(er_graph, num_nodes, er_edge_probability()))),
+                   ('UPA graph, M = 3', 'red', dict(generator=partial(upa_graph, num_nodes, 3)))]
+
+    plt.figure(figsize=(7, 7), dpi=300)
+    for label, color, source in experiments:
+        result = resilience_experiment(num_trials, workers=workers, **source)
+        plt.plot(result['mean'], color=color, label=label)
+        plt.fill_between(range(len(result['mean'])),
+                         result['percentiles'][5],
+                         result['percentiles'][95],
+                         color=color,
+                         alpha=.2)
+
+    plt.title('Resilience of different graphs\nmean of %d random attacks' % num_trials,
+              fontsize=18,
+              color='#ff8800')
+    plt.xlabel('Number of nodes removed',
+               fontsize=14,
+               color='#ff8800')
+    plt.ylabel('Size of the largest connected component',
+               fontsize=14,
+               color='#ff8800')
+    plt.legend(loc='best')
+    plt.savefig('Q1_trials', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
+
+
 def Q3():
     """
     fast_targeted_order: fast
     targeted_order: slow
     """
+    import matplotlib.pyplot as plt
     graph_lengths = range(10, 1000, 10)
     graphs = [make_upa(5, x) for x in graph_lengths]
 
@@ -395,17 +328,50 @@ def Q3():
     # plt.savefig('Q3', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
 
 
+def Q3_scaling(max_slow_length=8000):
+    """
+    Same comparison as Q3 on UPA graphs whose size doubles up to 256000 nodes
+    targeted_order is quadratic, so it is only timed up to #max_slow_length
+    """
+    import matplotlib.pyplot as plt
+    graph_lengths = [1000 * 2 ** power for power in range(9)]
+
+    fast_times = []
+    slow_times = []
+    for graph_length in graph_lengths:
+        graph = make_upa(5, graph_length)
+        fast_times.append(timeit(fast_targeted_order, graph))
+        if graph_length <= max_slow_length:
+            slow_times.append(timeit(targeted_order, graph))
+        print(graph_length, fast_times[-1], slow_times[-1] if graph_length <= max_slow_length else '-')
+
+    # Plotting
+    plt.loglog(graph_lengths, fast_times, 'o-', color='b', label='fast_targeted_order')
+    plt.loglog(graph_lengths[:len(slow_times)], slow_times, 'o-', color='g', label='targeted_order')
+
+    plt.title('Regular and fast targeted order on growing UPA graphs',
+              fontsize=18,
+              color='#ff8800')
+    plt.xlabel('Size of graph, with M = 5',
+               fontsize=14,
+               color='#ff8800')
+    plt.ylabel('Time in seconds',
+               fontsize=14,
+               color='#ff8800')
+    plt.legend(loc='best')
+    plt.savefig('Q3_scaling', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
+
+
 def Q4():
+    import matplotlib.pyplot as plt
 
     # Generating graphs
-    nodes, edges = load_graph_data('alg_rf7.txt')
-    num_nodes = len(nodes)
-
-    # Computer Network graph
-    comp_net_graph = make_graph(nodes, edges)
+    # Computer Network graph, parsed once and then read from its binary cache
+    comp_net_graph = load_graph_cached('alg_rf7.txt').to_dict()
+    num_nodes = len(comp_net_graph)
 
     # Erdos and Renyi graph
-    er_graph = make_er(num_nodes, .002)
+    er_graph = make_er(num_nodes, ER_PROBABILITY)
 
     # Preferential Attachment graph
     pa_graph = make_upa(3, num_nodes)
@@ -439,4 +405,53 @@ def Q4():
     plt.savefig('Q4', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
 
 
-# print(timeit(Q1))
+def Q4_strategies():
+    """
+    Resilience of the computer network under every attack order of
+    attack_orders.ATTACK_ORDERS
+    """
+    import matplotlib.pyplot as plt
+    comp_net_graph = load_graph_cached('alg_rf7.txt')
+
+    for name in sorted(ATTACK_ORDERS):
+        order = ATTACK_ORDERS[name](comp_net_graph, np.random.default_rng(0))
+        plt.plot(resilience_curve(comp_net_graph, order), label=name)
+
+    plt.title('Resilience of the Computer Network\nunder different attack orders',
+              fontsize=18,
+              color='#ff8800')
+    plt.xlabel('Number of nodes removed',
+               fontsize=14,
+               color='#ff8800')
+    plt.ylabel('Size of the largest connected component',
+               fontsize=14,
+               color='#ff8800')
+    plt.legend(loc='best')
+    plt.savefig('Q4_strategies', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
+
+
+def Q5_distances(samples=None):
+    """
+    Diameter, average path length and hop-plot of the computer network
+    and of ER / UPA graphs of the same size (see graph_distances.py),
+    from every node, or from #samples random nodes on large graphs
+    """
+    import matplotlib.pyplot as plt
+
+    comp_net_graph = load_graph_cached('alg_rf7.txt')
+    num_nodes = len(comp_net_graph)
+    graphs = [('Computer Network', comp_net_graph),
+              ('ER random graph, P = %g' % ER_PROBABILITY, er_graph(num_nodes, er_edge_probability(), seed=0)),
+              ('UPA graph, M = 3', upa_graph(num_nodes, 3, seed=0))]
+
+    for label, graph in graphs:
+        stats = path_statistics(graph, samples, seed=0)
+        print('%s: diameter %d, average path length %.3f' %
+              (label, stats['diameter'], stats['average_path_length']))
+        plt.semilogy(stats['hop_plot'], 'o-', label=label)
+
+    plt.title('Hop-plot of different graphs', fontsize=18, color='#ff8800')
+    plt.xlabel('Number of hops', fontsize=14, color='#ff8800')
+    plt.ylabel('Pairs of nodes within that many hops', fontsize=14, color='#ff8800')
+    plt.legend(loc='best')
+    plt.savefig('Q5_distances', dpi=300, format='png', transparent=False, orientation='landscape', bbox_inches='tight', pad_inches=0.3)
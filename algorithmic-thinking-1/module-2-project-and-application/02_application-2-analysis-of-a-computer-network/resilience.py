@@ -0,0 +1,143 @@
+"""
+Resilience experiments over many attack orders and graph samples
+
+Each trial computes one resilience curve (size of the largest connected
+component after every removal) for one (graph, attack order) pair:
+    - a shared base graph (e.g. the computer network) attacked with a
+      fresh random order per trial, or
+    - a fresh graph sample per trial, built in the worker from a seeded
+      generator such as functools.partial(er_graph, 1239, .002)
+
+Trials run on a process pool. The base graph is copied once into shared
+memory and every worker maps the same CSR arrays instead of receiving a
+pickled copy per task. Curves are streamed back as they finish and folded
+into a mean and percentile bands.
+"""
+from functools import partial
+from multiprocessing import Pool, shared_memory
+import os
+
+import numpy as np
+
+from csr_graph import CSRGraph
+from graph_class import position_resilience
+
+_WORKER_GRAPH = None
+_WORKER_MEMORY = []
+
+
+def resilience_curve(graph, attack_order):
+    """
+    Resilience curve of the CSRGraph #graph under #attack_order,
+    given as node positions
+
+    Returns a list whose k+1th entry is the size of the largest connected
+    component after the removal of the first k nodes of attack_order
+    (graph_class.position_resilience, same output as compute_resilience)
+    """
+    return position_resilience(graph, [int(idx) for idx in attack_order])
+
+
+def random_attack(graph, rng):
+    """
+    Random attack order: every node position, shuffled
+    """
+    return rng.permutation(len(graph))
+
+
+def _share_array(array):
+    memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+    shared[...] = array
+    return memory, (memory.name, array.shape, array.dtype.str)
+
+
+def _attach_array(spec):
+    name, shape, dtype = spec
+    memory = shared_memory.SharedMemory(name=name)
+    _WORKER_MEMORY.append(memory)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf)
+
+
+def _init_worker(graph_spec):
+    global _WORKER_GRAPH
+    if graph_spec is not None:
+        labels, offsets, neighbors, directed = graph_spec
+        _WORKER_GRAPH = CSRGraph.from_csr(_attach_array(labels), _attach_array(offsets),
+                                          _attach_array(neighbors), directed)
+
+
+def _run_trial(trial, generator, order):
+    rng = np.random.default_rng(trial)
+    graph = generator(seed=trial) if generator is not None else _WORKER_GRAPH
+    return resilience_curve(graph, order(graph, rng))
+
+
+def run_resilience_trials(num_trials, graph=None, generator=None, order=random_attack,
+                          workers=None, seed=0):
+    """
+    Yields the resilience curves of #num_trials independent trials,
+    in completion order
+
+    Every trial attacks either the shared CSRGraph #graph, or a fresh graph
+    built by #generator(seed=...), with the order returned by
+    #order(graph, rng). Trial i is seeded with seed + i, so a run is
+    reproducible whatever the number of #workers.
+    #generator and #order must be picklable (module level functions or
+    functools.partial of them).
+    """
+    if (graph is None) == (generator is None):
+        raise ValueError('give exactly one of graph and generator')
+    if num_trials < 1:
+        raise ValueError('num_trials must be at least 1, got %r' % (num_trials,))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    memory = []
+    graph_spec = None
+    if graph is not None:
+        specs = []
+        for array in (graph.labels, graph.offsets, graph.neighbors):
+            block, spec = _share_array(np.ascontiguousarray(array))
+            memory.append(block)
+            specs.append(spec)
+        graph_spec = tuple(specs) + (graph.directed,)
+
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(graph_spec,)) as pool:
+            for curve in pool.imap_unordered(partial(_run_trial, generator=generator, order=order),
+                                             range(seed, seed + num_trials)):
+                yield curve
+    finally:
+        for block in memory:
+            block.close()
+            block.unlink()
+
+
+def resilience_experiment(num_trials, graph=None, generator=None, order=random_attack,
+                          workers=None, seed=0, percentiles=(5, 50, 95)):
+    """
+    Run run_resilience_trials and aggregate the curves
+
+    Returns a dictionary with the per-removal 'mean' curve and one
+    curve per requested percentile under 'percentiles'
+
+    Raises ValueError when #num_trials is not positive, or when two trials
+    return curves of different lengths (attack orders of different lengths
+    cannot be averaged removal by removal)
+    """
+    if num_trials < 1:
+        raise ValueError('num_trials must be at least 1, got %r' % (num_trials,))
+    curves = None
+    for trial, curve in enumerate(run_resilience_trials(num_trials, graph, generator, order,
+                                                        workers, seed)):
+        if curves is None:
+            curves = np.empty((num_trials, len(curve)), dtype=np.int64)
+        elif len(curve) != curves.shape[1]:
+            raise ValueError('trial curves have different lengths (%d and %d): every attack '
+                             'order must remove the same number of nodes'
+                             % (curves.shape[1], len(curve)))
+        curves[trial] = curve
+
+    return {'mean': curves.mean(axis=0),
+            'percentiles': dict(zip(percentiles, np.percentile(curves, percentiles, axis=0)))}
@@ -0,0 +1,136 @@
+"""
+Tests of the attack order strategies against brute-force references
+
+    python -m pytest -q test_attack_orders.py
+"""
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+import attack_orders
+from csr_graph import CSRGraph
+
+
+def random_csr(rng):
+    nodes = rng.sample(range(1000), rng.randint(1, 40))
+    edges = [(rng.choice(nodes), rng.choice(nodes)) for dummy_idx in range(rng.randint(0, 90))]
+    return CSRGraph(nodes, [edge for edge in edges if edge[0] != edge[1]])
+
+
+def position_adjacency(graph):
+    offsets, neighbors = graph.adjacency_lists()
+    return dict((idx, set(neighbors[offsets[idx]:offsets[idx + 1]])) for idx in range(len(graph)))
+
+
+def shortest_paths(adjacency, source):
+    """
+    Returns the distance and number of shortest paths from #source to every node
+    """
+    distance = {source: 0}
+    sigma = {source: 1}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in adjacency[node]:
+            if neighbor not in distance:
+                distance[neighbor] = distance[node] + 1
+                sigma[neighbor] = 0
+                queue.append(neighbor)
+            if distance[neighbor] == distance[node] + 1:
+                sigma[neighbor] += sigma[node]
+    return distance, sigma
+
+
+def brute_betweenness(adjacency):
+    paths = dict((node, shortest_paths(adjacency, node)) for node in adjacency)
+    scores = dict((node, 0.0) for node in adjacency)
+    for source in adjacency:
+        distance, sigma = paths[source]
+        for target in distance:
+            if target <= source:
+                continue
+            for node in distance:
+                if node in (source, target) or target not in paths[node][0]:
+                    continue
+                if distance[node] + paths[node][0][target] == distance[target]:
+                    scores[node] += sigma[node] * paths[node][1][target] / float(sigma[target])
+    return [scores[node] for node in sorted(adjacency)]
+
+
+def brute_core_numbers(adjacency):
+    remaining = dict((node, set(neighbors)) for node, neighbors in adjacency.items())
+    core = {}
+    level = 0
+    while remaining:
+        node = min(remaining, key=lambda item: len(remaining[item]))
+        level = max(level, len(remaining[node]))
+        core[node] = level
+        for neighbor in remaining.pop(node):
+            remaining[neighbor].discard(node)
+    return [core[node] for node in sorted(adjacency)]
+
+
+@pytest.mark.parametrize('name', sorted(attack_orders.ATTACK_ORDERS))
+def test_every_strategy_returns_a_permutation(name):
+    rng = random.Random(21)
+    for trial in range(10):
+        graph = random_csr(rng)
+        order = attack_orders.ATTACK_ORDERS[name](graph, np.random.default_rng(trial))
+        assert sorted(np.asarray(order).tolist()) == list(range(len(graph)))
+
+
+def test_adaptive_degree_removes_a_max_degree_node():
+    rng = random.Random(22)
+    for trial in range(20):
+        graph = random_csr(rng)
+        remaining = position_adjacency(graph)
+        for idx in attack_orders.adaptive_degree_order(graph).tolist():
+            assert len(remaining[idx]) == max(map(len, remaining.values()))
+            for neighbor in remaining.pop(idx):
+                remaining[neighbor].discard(idx)
+
+
+def test_degree_order_is_by_decreasing_degree():
+    graph = random_csr(random.Random(23))
+    degrees = np.diff(graph.offsets)[attack_orders.degree_order(graph)]
+    assert np.all(np.diff(degrees) <= 0)
+
+
+def test_exact_betweenness_matches_brute_force():
+    rng = random.Random(24)
+    for trial in range(15):
+        graph = random_csr(rng)
+        scores = attack_orders.betweenness(graph, np.random.default_rng(trial), samples=len(graph))
+        assert scores.tolist() == pytest.approx(brute_betweenness(position_adjacency(graph)))
+
+
+def test_betweenness_of_a_long_path():
+    num_nodes = 120
+    nodes = list(range(num_nodes))
+    rng = random.Random(26)
+    rng.shuffle(nodes)
+    graph = CSRGraph(range(num_nodes), list(zip(nodes, nodes[1:])))
+    scores = attack_orders.betweenness(graph, samples=num_nodes)
+    expected = [0.0] * num_nodes
+    for idx, node in enumerate(nodes):
+        expected[node] = float(idx * (num_nodes - 1 - idx))
+    assert scores.tolist() == pytest.approx(expected)
+
+
+def test_core_numbers_match_brute_force():
+    rng = random.Random(25)
+    for trial in range(30):
+        graph = random_csr(rng)
+        assert attack_orders.core_numbers(graph).tolist() == brute_core_numbers(position_adjacency(graph))
+
+
+def test_registered_strategy_and_labels():
+    graph = CSRGraph([30, 10, 20], [(30, 10), (10, 20)])
+    attack_orders.register_attack_order('reversed', lambda graph, rng: np.arange(len(graph))[::-1])
+    try:
+        assert attack_orders.attack_order(graph, 'reversed') == [20, 10, 30]
+    finally:
+        del attack_orders.ATTACK_ORDERS['reversed']
+    assert attack_orders.attack_order(graph.to_dict())[0] == 10
@@ -0,0 +1,72 @@
+"""
+Tests of CSRGraph against dict of sets graphs
+
+    python -m pytest -q test_csr_graph.py
+"""
+import random
+
+import pytest
+
+from csr_graph import CSRGraph
+from graph_class import Graph, compute_resilience
+
+
+def random_edges(nodes, num_edges, rng, self_loops=False):
+    edges = [(rng.choice(nodes), rng.choice(nodes)) for dummy_idx in range(num_edges)]
+    return [edge for edge in edges if self_loops or edge[0] != edge[1]]
+
+
+@pytest.mark.parametrize('self_loops', [False, True])
+def test_undirected_edges_are_counted_once(self_loops):
+    rng = random.Random(6)
+    for trial in range(20):
+        nodes = rng.sample(range(500), rng.randint(1, 40))
+        edges = random_edges(nodes, rng.randint(0, 80), rng, self_loops)
+        graph = CSRGraph(nodes, edges)
+        assert graph.get_num_edges() == len(set(tuple(sorted(edge)) for edge in edges))
+        if not self_loops:
+            assert graph.get_num_edges() == Graph(nodes, edges).get_num_edges()
+
+
+def test_directed_edges_are_counted_once():
+    rng = random.Random(7)
+    nodes = list(range(50))
+    edges = random_edges(nodes, 200, rng, self_loops=True)
+    graph = CSRGraph(nodes, edges, directed=True)
+    assert graph.get_num_edges() == len(set(edges))
+    assert graph.get_num_edges() == Graph(nodes, edges, directed=True).get_num_edges()
+
+
+def test_round_trip_through_dict():
+    rng = random.Random(8)
+    nodes = rng.sample(range(1000), 60)
+    edges = random_edges(nodes, 150, rng)
+    adjacency = dict((node, set()) for node in nodes)
+    for node_1, node_2 in edges:
+        adjacency[node_1].add(node_2)
+        adjacency[node_2].add(node_1)
+    graph = CSRGraph(nodes, edges)
+    assert graph.to_dict() == adjacency
+    assert CSRGraph.from_dict(adjacency, directed=False).to_dict() == adjacency
+    for node in nodes:
+        assert set(graph[node].tolist()) == adjacency[node]
+    assert graph.out_degrees() == dict((node, len(adjacency[node])) for node in nodes)
+
+
+@pytest.mark.parametrize('nodes', [[0, 1, 2], [10, 20, 30]])
+@pytest.mark.parametrize('label', [-1, 3, 40, 1.5, 20.5])
+def test_unknown_labels_raise_key_error(nodes, label):
+    graph = CSRGraph(nodes, [(nodes[0], nodes[1])])
+    with pytest.raises(KeyError):
+        graph.position(label)
+    with pytest.raises(KeyError):
+        graph.positions([nodes[0], label])
+    assert label not in graph
+    assert graph.positions(nodes[::-1]).tolist() == [2, 1, 0]
+
+
+def test_resilience_of_unknown_label():
+    with pytest.raises(KeyError):
+        compute_resilience(Graph([0, 1, 2], [(0, 1)]), [-1])
+    with pytest.raises(KeyError):
+        compute_resilience(Graph([0, 1, 2], [(0, 1)]), [3])
@@ -0,0 +1,142 @@
+"""
+Tests of graph_class against brute-force references
+
+    python -m pytest -q test_graph_class.py
+"""
+import random
+
+import pytest
+
+import graph_class
+import main
+from graph_class import ER, Graph, compute_resilience, random_order
+from graph_views import as_csr
+
+
+def brute_force_resilience(nodes, edges, attack_order):
+    """
+    Largest component size after every removal, by a BFS sweep
+    over a symmetric dict of sets
+    """
+    graph = dict((node, set()) for node in nodes)
+    for node_1, node_2 in edges:
+        graph[node_1].add(node_2)
+        graph[node_2].add(node_1)
+
+    def largest():
+        visited = set()
+        best = 0
+        for start in graph:
+            if start in visited:
+                continue
+            visited.add(start)
+            queue = [start]
+            for node in queue:
+                for neighbor in graph[node]:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        queue.append(neighbor)
+            best = max(best, len(queue))
+        return best
+
+    curve = [largest()]
+    for node in attack_order:
+        for neighbor in graph.pop(node):
+            graph[neighbor].discard(node)
+        curve.append(largest())
+    return curve
+
+
+def random_graph(num_nodes, num_edges, rng):
+    nodes = list(range(num_nodes))
+    edges = [tuple(rng.sample(nodes, 2)) for dummy_idx in range(num_edges)]
+    return nodes, edges
+
+
+def test_resilience_of_single_edge():
+    assert compute_resilience(Graph([0, 1], [(0, 1)]), [1]) == [2, 1]
+    assert compute_resilience(Graph([0, 1], [(1, 0)]), [0]) == [2, 1]
+
+
+def test_resilience_matches_brute_force():
+    rng = random.Random(1)
+    for trial in range(30):
+        nodes, edges = random_graph(rng.randint(2, 40), rng.randint(0, 60), rng)
+        graph = Graph(nodes, edges)
+        attack_order = random_order(graph)[:rng.randint(0, len(nodes))]
+        expected = brute_force_resilience(nodes, edges, attack_order)
+        assert compute_resilience(graph, attack_order) == expected
+        assert compute_resilience(as_csr(graph), attack_order) == expected
+
+
+def test_resilience_with_labels_not_positions():
+    rng = random.Random(2)
+    nodes = rng.sample(range(1000), 30)
+    edges = [tuple(rng.sample(nodes, 2)) for dummy_idx in range(40)]
+    attack_order = rng.sample(nodes, 20)
+    assert (compute_resilience(Graph(nodes, edges), attack_order) ==
+            brute_force_resilience(nodes, edges, attack_order))
+
+
+def test_components_of_graph_match_resilience():
+    rng = random.Random(4)
+    for trial in range(30):
+        nodes, edges = random_graph(rng.randint(1, 40), rng.randint(0, 60), rng)
+        graph = Graph(nodes, edges)
+        assert graph_class.largest_cc_size(graph) == compute_resilience(graph, [])[0]
+        assert graph_class.largest_cc_size(graph) == brute_force_resilience(nodes, edges, [])[0]
+        components = graph_class.cc_visited(graph)
+        assert sorted(map(len, components)) == sorted(
+            len(graph_class.bfs_visited(graph, min(component))) for component in components)
+        assert set().union(*components) == set(nodes)
+    graph = ER(1239, .002, fast=True, seed=5)
+    assert graph_class.largest_cc_size(graph) == compute_resilience(graph, [])[0]
+
+
+def test_degrees_match_counts():
+    rng = random.Random(3)
+    nodes = rng.sample(range(1000), 80)
+    edges = [tuple(rng.sample(nodes, 2)) for dummy_idx in range(300)]
+    for directed in (False, True):
+        graph = Graph(nodes, edges, directed)
+        in_degrees = dict((node, 0) for node in nodes)
+        for node in nodes:
+            for neighbor in graph[node]:
+                in_degrees[neighbor] += 1
+        assert graph.in_degrees() == in_degrees
+        expected = {}
+        for degree in in_degrees.values():
+            expected[degree] = expected.get(degree, 0) + 1
+        assert graph.in_degree_distribution() == expected
+        assert graph.in_degree_distribution(normalized=True) == dict(
+            (degree, count / float(len(nodes))) for degree, count in expected.items())
+        out_expected = {}
+        for node in nodes:
+            out_expected[len(graph[node])] = out_expected.get(len(graph[node]), 0) + 1
+        assert graph.out_degree_distribution() == out_expected
+
+
+def test_degrees_of_graph_with_node_labels_0_to_n():
+    graph = Graph(list(range(4)), [(0, 1), (0, 2), (3, 2)], directed=True)
+    assert graph.in_degrees() == {0: 0, 1: 1, 2: 2, 3: 0}
+    assert graph.in_degree_distribution() == {0: 2, 1: 1, 2: 1}
+
+
+@pytest.mark.parametrize('module', [graph_class, main])
+@pytest.mark.parametrize('order', ['fast_targeted_order', 'targeted_order'])
+def test_targeted_order_removes_a_max_degree_node(module, order):
+    rng = random.Random(16)
+    for trial in range(20):
+        nodes, edges = random_graph(rng.randint(2, 40), rng.randint(0, 80), rng)
+        graph = Graph(nodes, edges)
+        remaining = dict((node, set()) for node in nodes)
+        for node_1, node_2 in edges:
+            remaining[node_1].add(node_2)
+            remaining[node_2].add(node_1)
+        attack_order = getattr(module, order)(graph)
+        assert sorted(attack_order) == sorted(nodes)
+        for node in attack_order:
+            assert len(remaining[node]) == max(map(len, remaining.values()))
+            for neighbor in remaining.pop(node):
+                remaining[neighbor].discard(node)
+        assert graph.get_num_edges() == len(set(tuple(sorted(edge)) for edge in edges))
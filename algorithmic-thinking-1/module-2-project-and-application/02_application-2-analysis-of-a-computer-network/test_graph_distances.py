@@ -0,0 +1,79 @@
+"""
+Tests of the bit-parallel BFS against one BFS per source
+
+    python -m pytest -q test_graph_distances.py
+"""
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+import graph_distances
+from csr_graph import CSRGraph
+
+
+def brute_distances(graph, source):
+    offsets, neighbors = graph.adjacency_lists()
+    distances = [-1] * len(graph)
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in neighbors[offsets[node]:offsets[node + 1]]:
+            if distances[neighbor] == -1:
+                distances[neighbor] = distances[node] + 1
+                queue.append(neighbor)
+    return distances
+
+
+def random_graph(num_nodes, num_edges, directed, seed):
+    rng = random.Random(seed)
+    edges = [(rng.randrange(num_nodes), rng.randrange(num_nodes)) for dummy_idx in range(num_edges)]
+    return CSRGraph(range(num_nodes), edges, directed)
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_distances_match_brute_force(directed):
+    graph = random_graph(150, 220, directed, seed=9)
+    sources = list(range(0, 150, 2))  # more than one 64 source word
+    distances = graph_distances.multi_source_distances(graph, sources)
+    for row, source in enumerate(sources):
+        assert distances[row].tolist() == brute_distances(graph, source)
+
+
+def test_popcount_fallback_matches():
+    rng = np.random.default_rng(10)
+    words = rng.integers(0, 2 ** 63, size=1000, dtype=np.uint64) << np.uint64(1)
+    words[:2] = [0, np.iinfo(np.uint64).max]
+    expected = sum(bin(int(word)).count('1') for word in words)
+    assert graph_distances._table_popcount(words) == expected
+    if hasattr(np, 'bitwise_count'):
+        assert graph_distances._bitwise_popcount(words) == expected
+
+
+@pytest.mark.parametrize('popcount', ['_table_popcount', '_bitwise_popcount'])
+def test_histogram_matches_brute_force(popcount, monkeypatch):
+    if not hasattr(graph_distances.np, 'bitwise_count') and popcount == '_bitwise_popcount':
+        pytest.skip('NumPy < 2.0 has no bitwise_count')
+    monkeypatch.setattr(graph_distances, '_popcount', getattr(graph_distances, popcount))
+    graph = random_graph(130, 200, False, seed=11)
+    expected = np.zeros(len(graph), dtype=np.int64)
+    for source in range(len(graph)):
+        for distance in brute_distances(graph, source):
+            if distance >= 0:
+                expected[distance] += 1
+    expected = np.trim_zeros(expected, 'b')
+    assert graph_distances.distance_histogram(graph).tolist() == expected.tolist()
+
+    statistics = graph_distances.path_statistics(graph)
+    distances = np.arange(len(expected))
+    assert statistics['diameter'] == len(expected) - 1
+    assert statistics['average_path_length'] == pytest.approx(
+        (distances[1:] * expected[1:]).sum() / expected[1:].sum())
+
+
+def test_histogram_with_workers():
+    graph = random_graph(200, 300, True, seed=12)
+    assert (graph_distances.distance_histogram(graph, workers=2).tolist() ==
+            graph_distances.distance_histogram(graph).tolist())
@@ -0,0 +1,97 @@
+"""
+Tests of the batched random graph generators
+
+    python -m pytest -q test_graph_generators.py
+"""
+import math
+
+import numpy as np
+import pytest
+
+import graph_generators
+from graph_generators import dpa_edges, dpa_graph, er_graph, upa_edges, upa_graph
+
+
+@pytest.mark.parametrize('edges', [dpa_edges, upa_edges])
+@pytest.mark.parametrize('num_nodes, num_edges', [(1, 1), (5, 5), (300, 1), (300, 4)])
+def test_preferential_attachment_structure(edges, num_nodes, num_edges):
+    sources, targets = edges(num_nodes, num_edges, seed=0)
+    initial = min(num_nodes, num_edges)
+    pairs = set(zip(sources.tolist(), targets.tolist()))
+    assert len(pairs) == len(sources)
+    assert set((i, j) for i in range(num_edges) for j in range(num_edges) if i != j) <= pairs
+    new = sources >= num_edges
+    # every new node picks between 1 and num_edges earlier nodes
+    assert np.all(targets[new] < sources[new])
+    counts = np.bincount(sources[new], minlength=num_nodes)[num_edges:]
+    assert np.all((counts >= 1) & (counts <= num_edges))
+    assert len(sources) == initial * (initial - 1) + counts.sum()
+
+
+@pytest.mark.parametrize('graph', [dpa_graph, upa_graph])
+def test_generators_are_seeded(graph):
+    first = graph(500, 3, seed=7)
+    assert np.array_equal(first.neighbors, graph(500, 3, seed=7).neighbors)
+    assert not np.array_equal(first.neighbors, graph(500, 3, seed=8).neighbors)
+    assert first.directed == (graph is dpa_graph)
+
+
+@pytest.mark.parametrize('edges', [dpa_edges, upa_edges])
+def test_block_size_does_not_change_the_graph(edges, monkeypatch):
+    expected = edges(700, 3, seed=9)
+    monkeypatch.setattr(graph_generators, 'BLOCK_SIZE', 64)
+    sources, targets = edges(700, 3, seed=9)
+    assert np.array_equal(sources, expected[0])
+    assert set(zip(sources.tolist(), targets.tolist())) == set(zip(*(array.tolist() for array in expected)))
+
+
+def test_preferential_attachment_favors_high_degree():
+    # the initial nodes take part in every draw from the start: with
+    # uniform attachment they would get about num_edges * H(n) citations each
+    in_degrees = dpa_graph(20000, 3, seed=10).in_degree_array()
+    assert in_degrees[:3].min() > 10 * 3 * np.log(20000)
+
+
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('num_nodes', [2, 3, 17])
+def test_decode_pairs_enumerates_every_pair(num_nodes, directed):
+    num_pairs = num_nodes * (num_nodes - 1) // (1 if directed else 2)
+    sources, targets = graph_generators._decode_pairs(np.arange(num_pairs), num_nodes, directed)
+    pairs = list(zip(sources.tolist(), targets.tolist()))
+    if directed:
+        expected = [(i, j) for i in range(num_nodes) for j in range(num_nodes) if i != j]
+    else:
+        expected = [(v, w) for v in range(num_nodes) for w in range(v)]
+    assert pairs == expected
+
+
+def test_decode_pairs_of_large_positions():
+    positions = np.random.default_rng(11).integers(0, 10 ** 17, size=10000)
+    positions[:3] = [0, 10 ** 17 - 1, 4999999950000000]
+    sources, targets = graph_generators._decode_pairs(positions, 0, False)
+    expected = [(math.isqrt(8 * position + 1) + 1) // 2 for position in positions.tolist()]
+    assert sources.tolist() == expected
+    assert np.all((targets >= 0) & (targets < sources))
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_er_graph_density(directed):
+    num_nodes, probability = 600, .02
+    graph = er_graph(num_nodes, probability, directed, seed=12)
+    pairs = num_nodes * (num_nodes - 1) // (1 if directed else 2)
+    deviation = 5 * math.sqrt(pairs * probability * (1 - probability))
+    assert abs(graph.get_num_edges() - pairs * probability) < deviation
+    sources = np.repeat(np.arange(num_nodes), np.diff(graph.offsets))
+    assert not np.any(sources == graph.neighbors)
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_er_graph_limits(directed):
+    assert er_graph(30, 0, directed, seed=0).get_num_edges() == 0
+    assert er_graph(30, 1, directed, chunk_size=7).get_num_edges() == 30 * 29 // (1 if directed else 2)
+    assert er_graph(1, .5, directed).get_num_edges() == 0
+
+
+def test_er_chunk_size_does_not_change_the_graph():
+    expected = er_graph(400, .05, seed=13)
+    assert np.array_equal(er_graph(400, .05, seed=13, chunk_size=100).neighbors, expected.neighbors)
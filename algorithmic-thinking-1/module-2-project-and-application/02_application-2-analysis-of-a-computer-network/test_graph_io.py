@@ -0,0 +1,94 @@
+"""
+Tests of the streaming loader and of the binary graph cache
+
+    python -m pytest -q test_graph_io.py
+"""
+import os
+import random
+
+import numpy as np
+import pytest
+
+import graph_io
+from csr_graph import CSRGraph
+
+
+def write_adjacency(path, adjacency):
+    with open(path, 'w') as graph_file:
+        for node, neighbors in adjacency.items():
+            graph_file.write(' '.join(str(item) for item in [node] + sorted(neighbors)) + ' \n')
+
+
+def random_adjacency(num_nodes, rng):
+    nodes = rng.sample(range(10 * num_nodes), num_nodes)
+    return dict((node, set(rng.sample(nodes, rng.randint(0, 5))) - set([node])) for node in nodes)
+
+
+def same_graph(graph, expected):
+    return (np.array_equal(graph.labels, expected.labels) and
+            np.array_equal(graph.offsets, expected.offsets) and
+            np.array_equal(graph.neighbors, expected.neighbors) and
+            graph.directed == expected.directed)
+
+
+@pytest.fixture
+def graph_file(tmp_path):
+    adjacency = random_adjacency(300, random.Random(5))
+    path = str(tmp_path / 'graph.txt')
+    write_adjacency(path, adjacency)
+    return path, adjacency
+
+
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('workers', [1, 3])
+def test_load_graph_csr_matches_dict(graph_file, directed, workers):
+    path, adjacency = graph_file
+    graph = graph_io.load_graph_csr(path, directed, workers, chunk_size=97)
+    assert same_graph(graph, CSRGraph.from_dict(adjacency, directed))
+
+
+def test_cache_round_trip(graph_file, capsys):
+    path, adjacency = graph_file
+    first = graph_io.load_graph_cached(path)
+    assert 'Loaded graph' in capsys.readouterr().out
+    assert os.path.exists(graph_io.cache_file_name(path))
+    second = graph_io.load_graph_cached(path)
+    assert 'Loaded graph' not in capsys.readouterr().out
+    assert same_graph(second, first)
+    assert same_graph(first, CSRGraph.from_dict(adjacency, directed=False))
+
+
+def test_truncated_cache_is_a_miss(graph_file):
+    path, adjacency = graph_file
+    expected = graph_io.load_graph_cached(path)
+    cache_name = graph_io.cache_file_name(path)
+    size = os.path.getsize(cache_name)
+    for cut in (size - 1, size // 2, graph_io.CACHE_HEADER.size):
+        with open(cache_name, 'r+b') as cache_file:
+            cache_file.truncate(cut)
+        assert graph_io.read_graph_cache(cache_name, os.stat(path)) is None
+        assert same_graph(graph_io.load_graph_cached(path), expected)
+        assert os.path.getsize(cache_name) == size
+
+
+def test_changed_source_is_a_miss(graph_file):
+    path, adjacency = graph_file
+    graph_io.load_graph_cached(path)
+    adjacency[max(adjacency) + 1] = set([min(adjacency)])
+    write_adjacency(path, adjacency)
+    os.utime(path, ns=(1, 1))
+    assert graph_io.read_graph_cache(graph_io.cache_file_name(path), os.stat(path)) is None
+    assert same_graph(graph_io.load_graph_cached(path), CSRGraph.from_dict(adjacency, directed=False))
+
+
+def test_failed_write_leaves_no_file(graph_file, monkeypatch):
+    path, adjacency = graph_file
+    cache_dir = os.path.dirname(path)
+
+    def failing_replace(source, target):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(graph_io.os, 'replace', failing_replace)
+    graph = graph_io.load_graph_cached(path)
+    assert same_graph(graph, CSRGraph.from_dict(adjacency, directed=False))
+    assert sorted(os.listdir(cache_dir)) == ['graph.txt']
@@ -0,0 +1,115 @@
+"""
+Tests of the CSR breadth-first search against a dict of sets BFS
+
+    python -m pytest -q test_graph_search.py
+"""
+import random
+
+import pytest
+
+import graph_search
+from csr_graph import CSRGraph
+
+
+def random_csr(rng, directed=False):
+    nodes = rng.sample(range(1000), rng.randint(1, 200))
+    edges = [(rng.choice(nodes), rng.choice(nodes)) for dummy_idx in range(rng.randint(0, 250))]
+    return CSRGraph(nodes, edges, directed)
+
+
+def brute_distances(adjacency, start):
+    distances = {start: 0}
+    queue = [start]
+    for node in queue:
+        for neighbor in adjacency[node]:
+            if neighbor not in distances:
+                distances[neighbor] = distances[node] + 1
+                queue.append(neighbor)
+    return distances
+
+
+def brute_components(adjacency):
+    symmetric = dict((node, set(neighbors)) for node, neighbors in adjacency.items())
+    for node, neighbors in adjacency.items():
+        for neighbor in neighbors:
+            symmetric[neighbor].add(node)
+    components = []
+    seen = set()
+    for node in adjacency:
+        if node not in seen:
+            components.append(set(brute_distances(symmetric, node)))
+            seen |= components[-1]
+    return components
+
+
+@pytest.mark.parametrize('switch', [graph_search.FRONTIER_SWITCH, 2, 0])
+@pytest.mark.parametrize('directed', [False, True])
+def test_bfs_matches_brute_force(switch, directed, monkeypatch):
+    monkeypatch.setattr(graph_search, 'FRONTIER_SWITCH', switch)
+    rng = random.Random(17)
+    for trial in range(20):
+        graph = random_csr(rng, directed)
+        adjacency = graph.to_dict()
+        start = rng.choice(list(graph))
+        distances = brute_distances(adjacency, start)
+        assert graph_search.bfs_visited(graph, start) == set(distances)
+        # positions come out in breadth-first order
+        labels = graph.labels[graph_search.bfs_positions(graph, graph.position(start))].tolist()
+        assert [distances[label] for label in labels] == sorted(distances.values())
+
+
+@pytest.mark.parametrize('switch', [graph_search.FRONTIER_SWITCH, 0])
+def test_component_sweep_matches_brute_force(switch, monkeypatch):
+    monkeypatch.setattr(graph_search, 'FRONTIER_SWITCH', switch)
+    rng = random.Random(18)
+    for trial in range(20):
+        graph = random_csr(rng)
+        expected = brute_components(graph.to_dict())
+        queue, bounds = graph_search.component_sweep(graph)
+        assert sorted(queue) == list(range(len(graph)))
+        components = [set(graph.labels[queue[start:stop]].tolist()) for start, stop in zip(bounds, bounds[1:])]
+        assert sorted(map(sorted, components)) == sorted(map(sorted, expected))
+        assert graph_search.largest_cc_size(graph) == max(map(len, expected))
+
+
+@pytest.mark.parametrize('directed', [False, True])
+def test_component_labels_match_brute_force(directed):
+    rng = random.Random(19)
+    for trial in range(30):
+        graph = random_csr(rng, directed)
+        expected = brute_components(graph.to_dict())
+        components = graph_search.connected_components(graph)
+        # numbered in order of their first node position, as the brute force finds them
+        assert components.to_list() == expected
+        assert components.sizes.tolist() == list(map(len, expected))
+        assert components.largest_size() == max(map(len, expected))
+        histogram = {}
+        for component in expected:
+            histogram[len(component)] = histogram.get(len(component), 0) + 1
+        assert components.size_histogram() == histogram
+        assert components[-1] == expected[-1]
+        labels = graph.labels.tolist()
+        for idx, component in enumerate(expected):
+            assert all(components.component[graph.position(node)] == idx for node in component)
+            assert set(labels[position] for position in components.positions(idx).tolist()) == component
+
+
+def test_components_of_long_paths():
+    # a path through the nodes in random order needs many union rounds
+    num_nodes = 5000
+    graph = CSRGraph(range(num_nodes), [(idx, idx + 1) for idx in range(num_nodes - 1)])
+    assert graph_search.connected_components(graph).sizes.tolist() == [num_nodes]
+    order = random.Random(20).sample(range(num_nodes), num_nodes)
+    graph = CSRGraph(range(2 * num_nodes), list(zip(order, order[1:])))
+    components = graph_search.connected_components(graph)
+    assert components.largest_size() == num_nodes
+    assert components.size_histogram() == {num_nodes: 1, 1: num_nodes}
+
+
+def test_components_of_empty_graph():
+    components = graph_search.connected_components(CSRGraph())
+    assert len(components) == 0
+    assert components.largest_size() == 0
+    assert components.to_list() == []
+    with pytest.raises(IndexError):
+        components[0]
@@ -0,0 +1,87 @@
+"""
+Tests of RemovalView against deleting from a copied dict of sets
+
+    python -m pytest -q test_graph_views.py
+"""
+import random
+
+import pytest
+
+from csr_graph import CSRGraph
+from graph_class import Graph, compute_resilience, fast_targeted_order, largest_cc_size
+from graph_views import RemovalView, as_csr
+
+
+def random_adjacency(rng):
+    nodes = rng.sample(range(1000), rng.randint(1, 40))
+    adjacency = dict((node, set()) for node in nodes)
+    for dummy_idx in range(rng.randint(0, 80)):
+        node_1, node_2 = rng.choice(nodes), rng.choice(nodes)
+        if node_1 != node_2:
+            adjacency[node_1].add(node_2)
+            adjacency[node_2].add(node_1)
+    return adjacency
+
+
+def same_as_dict(view, adjacency):
+    return (len(view) == len(adjacency) and
+            sorted(view) == sorted(adjacency) and
+            all(view[node] == adjacency[node] and view.degree(node) == len(adjacency[node])
+                for node in adjacency))
+
+
+def test_removals_match_dict():
+    rng = random.Random(13)
+    for trial in range(30):
+        adjacency = random_adjacency(rng)
+        view = RemovalView(adjacency)
+        expected = dict((node, set(neighbors)) for node, neighbors in adjacency.items())
+        for node in rng.sample(sorted(adjacency), rng.randint(0, len(adjacency))):
+            del view[node]
+            for neighbor in expected.pop(node):
+                expected[neighbor].discard(node)
+            assert node not in view
+            assert same_as_dict(view, expected)
+        if expected:
+            best = max(len(neighbors) for neighbors in expected.values())
+            assert view.degrees()[view.max_degree_position()] == best
+
+
+def test_copy_is_independent():
+    rng = random.Random(14)
+    adjacency = random_adjacency(rng)
+    view = RemovalView(adjacency)
+    first = sorted(adjacency)[0]
+    del view[first]
+    copy = view.copy()
+    for node in list(copy):
+        del copy[node]
+    assert len(copy) == 0
+    assert len(view) == len(adjacency) - 1
+    with pytest.raises(KeyError):
+        del view[first]
+    with pytest.raises(KeyError):
+        copy.max_degree_position()
+
+
+def test_base_graph_is_left_untouched():
+    rng = random.Random(15)
+    nodes = list(range(30))
+    edges = [tuple(rng.sample(nodes, 2)) for dummy_idx in range(60)]
+    graph = Graph(nodes, edges)
+    before = dict((node, set(graph[node])) for node in nodes)
+    view = RemovalView(graph)
+    for node in nodes[:20]:
+        del view[node]
+    assert dict((node, set(graph[node])) for node in nodes) == before
+    assert as_csr(graph).to_dict() == RemovalView(graph).base.to_dict()
+
+
+def test_directed_graph_is_rejected():
+    graph = CSRGraph([0, 1, 2], [(0, 1), (2, 1)], directed=True)
+    for function in (as_csr, RemovalView, largest_cc_size, fast_targeted_order):
+        with pytest.raises(ValueError):
+            function(graph)
+    with pytest.raises(ValueError):
+        compute_resilience(graph, [])
+    assert compute_resilience(Graph([0, 1, 2], [(0, 1), (2, 1)], directed=True), [1]) == [3, 1]
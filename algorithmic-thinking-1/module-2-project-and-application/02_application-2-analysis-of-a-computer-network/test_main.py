@@ -0,0 +1,26 @@
+"""
+Tests of the graph helpers of main.py
+
+    python -m pytest -q test_main.py
+"""
+import math
+import random
+
+from graph_generators import er_graph
+import main
+
+
+def test_er_edge_probability_matches_make_er():
+    num_nodes, probability = 400, .01
+    pairs = num_nodes * (num_nodes - 1) // 2
+    edge_probability = main.er_edge_probability(probability)
+    expected = pairs * edge_probability
+    deviation = 5 * math.sqrt(pairs * edge_probability * (1 - edge_probability))
+
+    random.seed(0)
+    slow = main.make_er(num_nodes, probability)
+    assert abs(sum(map(len, slow.values())) // 2 - expected) < deviation
+    fast = er_graph(num_nodes, edge_probability, seed=0)
+    assert abs(fast.get_num_edges() - expected) < deviation
+    # the plain per-pair probability is visibly too low
+    assert pairs * probability < expected - deviation
@@ -0,0 +1,62 @@
+"""
+Tests of the multi-trial resilience experiments
+
+    python -m pytest -q test_resilience.py
+"""
+import random
+from functools import partial
+
+import numpy as np
+import pytest
+
+from graph_class import Graph
+from graph_generators import er_graph
+from resilience import random_attack, resilience_curve, resilience_experiment
+from graph_views import as_csr
+from test_graph_class import brute_force_resilience, random_graph
+
+
+def half_attack(graph, rng):
+    return rng.permutation(len(graph))[:len(graph) // 2]
+
+
+def uneven_attack(graph, rng):
+    return rng.permutation(len(graph))[:int(rng.integers(1, len(graph)))]
+
+
+def test_curve_matches_brute_force():
+    rng = random.Random(4)
+    for trial in range(20):
+        nodes, edges = random_graph(rng.randint(2, 40), rng.randint(0, 60), rng)
+        graph = as_csr(Graph(nodes, edges))
+        positions = rng.sample(range(len(nodes)), rng.randint(0, len(nodes)))
+        attack_order = graph.labels[positions].tolist()
+        assert resilience_curve(graph, positions) == brute_force_resilience(nodes, edges, attack_order)
+
+
+def test_experiment_is_reproducible():
+    graph = er_graph(200, 0.02, seed=1)
+    first = resilience_experiment(4, graph=graph, workers=1, seed=3)
+    second = resilience_experiment(4, graph=graph, workers=2, seed=3)
+    assert np.array_equal(first['mean'], second['mean'])
+    curves = [resilience_curve(graph, random_attack(graph, np.random.default_rng(trial)))
+              for trial in range(3, 7)]
+    assert np.array_equal(first['mean'], np.mean(curves, axis=0))
+
+
+def test_experiment_on_generated_graphs():
+    result = resilience_experiment(3, generator=partial(er_graph, 100, 0.03), order=half_attack,
+                                   workers=1, percentiles=(50,))
+    assert len(result['mean']) == 51
+    assert set(result['percentiles']) == set([50])
+
+
+@pytest.mark.parametrize('num_trials', [0, -1])
+def test_experiment_needs_a_trial(num_trials):
+    with pytest.raises(ValueError, match='num_trials'):
+        resilience_experiment(num_trials, graph=er_graph(10, 0.5, seed=0), workers=1)
+
+
+def test_experiment_rejects_curves_of_different_lengths():
+    with pytest.raises(ValueError, match='different lengths'):
+        resilience_experiment(6, graph=er_graph(50, 0.1, seed=0), order=uneven_attack, workers=1)
@@ -8,11 +8,13 @@ to use the matplotlib version of this code
 """
 
 # Flavor of Python - desktop or CodeSkulptor
-from clustering import hierarchical_clustering as h_clustering
-from clustering import kmeans_clustering as k_clustering
+from fast_clustering import hierarchical_clustering as h_clustering
+from fast_clustering import hierarchical_merge_tree as h_merge_tree
+from fast_clustering import kmeans_clustering as k_clustering
 import alg_clusters_matplotlib
 import matplotlib.pyplot as plt
 import cluster as alg_cluster
+from distortion import DistortionEngine
 from matplotlib.ticker import FuncFormatter
 
 
@@ -51,8 +53,14 @@ def load_data_table(data_url):
 # Code to load data tables
 
 
-def compute_distortion(cluster_list, data_table):
-    return sum(cluster.cluster_error(data_table) for cluster in cluster_list)
+def compute_distortion(cluster_list, data_table, engine=None):
+    """
+    Sum of the cluster errors of #cluster_list; pass the DistortionEngine
+    of #data_table as #engine to avoid indexing the table again
+    """
+    if engine is None:
+        engine = DistortionEngine(data_table)
+    return engine.distortion(cluster_list)
 
 
 #####################################################################
@@ -118,16 +126,17 @@ def Q10():
                                             line[2],
                                             line[3],
                                             line[4]))
-    data_set_111_h = [h_clustering(copy_clusters(list_111), num_clusters)
-                      for num_clusters in range(6, 21)]
+    engine_111 = DistortionEngine(data_table_111)
+    # one hierarchical run down to 6 clusters gives every clustering of the sweep
+    tree_111 = h_merge_tree(list_111, 6)
 
-    distortion_111_h = [compute_distortion(cluster_list, data_table_111)
-                        for cluster_list in data_set_111_h]
+    distortion_111_h = [tree_111.distortion(num_clusters)
+                        for num_clusters in range(6, 21)]
 
     data_set_111_k = [k_clustering(copy_clusters(list_111), num_clusters, 5)
                       for num_clusters in range(6, 21)]
 
-    distortion_111_k = [compute_distortion(cluster_list, data_table_111)
+    distortion_111_k = [compute_distortion(cluster_list, data_table_111, engine_111)
                         for cluster_list in data_set_111_k]
 
     data_table_290 = load_data_table(DATA_290_URL)
@@ -139,16 +148,17 @@ def Q10():
                                             line[2],
                                             line[3],
                                             line[4]))
-    data_set_290_h = [h_clustering(copy_clusters(list_290), num_clusters)
-                      for num_clusters in range(6, 21)]
+    engine_290 = DistortionEngine(data_table_290)
+    # one hierarchical run down to 6 clusters gives every clustering of the sweep
+    tree_290 = h_merge_tree(list_290, 6)
 
-    distortion_290_h = [compute_distortion(cluster_list, data_table_290)
-                        for cluster_list in data_set_290_h]
+    distortion_290_h = [tree_290.distortion(num_clusters)
+                        for num_clusters in range(6, 21)]
 
     data_set_290_k = [k_clustering(copy_clusters(list_290), num_clusters, 5)
                       for num_clusters in range(6, 21)]
 
-    distortion_290_k = [compute_distortion(cluster_list, data_table_290)
+    distortion_290_k = [compute_distortion(cluster_list, data_table_290, engine_290)
                         for cluster_list in data_set_290_k]
 
     data_table_896 = load_data_table(DATA_896_URL)
@@ -161,16 +171,17 @@ def Q10():
                                             line[3],
                                             line[4]))
 
-    data_set_896_h = [h_clustering(copy_clusters(list_896), num_clusters)
-                      for num_clusters in range(6, 21)]
+    engine_896 = DistortionEngine(data_table_896)
+    # one hierarchical run down to 6 clusters gives every clustering of the sweep
+    tree_896 = h_merge_tree(list_896, 6)
 
-    distortion_896_h = [compute_distortion(cluster_list, data_table_896)
-                        for cluster_list in data_set_896_h]
+    distortion_896_h = [tree_896.distortion(num_clusters)
+                        for num_clusters in range(6, 21)]
 
     data_set_896_k = [k_clustering(copy_clusters(list_896), num_clusters, 5)
                       for num_clusters in range(6, 21)]
 
-    distortion_896_k = [compute_distortion(cluster_list, data_table_896)
+    distortion_896_k = [compute_distortion(cluster_list, data_table_896, engine_896)
                         for cluster_list in data_set_896_k]
 
     x_data = [num for num in range(6, 21)]
@@ -122,16 +122,18 @@ def closest_pair_strip(cluster_list, horiz_center, half_width):
 # Code for hierarchical clustering
 
 
-def hierarchical_clustering(cluster_list, num_clusters):
+def hierarchical_clustering(cluster_list, num_clusters, closest_pair=fast_closest_pair):
     """
     Compute a hierarchical clustering of a set of clusters
     Note: the function may mutate cluster_list
 
-    Input: List of clusters, integer number of clusters
+    Input: List of clusters, integer number of clusters, and optionally the
+    closest pair function to use (same signature as fast_closest_pair, e.g.
+    fast_clustering.fast_closest_pair)
     Output: List of clusters whose length is num_clusters
     """
     while len(cluster_list) > num_clusters:
-        output = fast_closest_pair(cluster_list)
+        output = closest_pair(cluster_list)
         cluster1_idx, cluster2_idx = output[1], output[2]
         cluster_list[cluster1_idx].merge_clusters(cluster_list[cluster2_idx])
         del cluster_list[cluster2_idx]
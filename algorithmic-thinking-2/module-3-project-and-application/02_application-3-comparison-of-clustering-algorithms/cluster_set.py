@@ -0,0 +1,197 @@
+"""
+Column-wise storage of a list of clusters
+
+A ClusterSet holds n clusters as arrays instead of n Cluster objects:
+
+    horiz, vert, risk   float64 arrays of the centers and averaged risks
+    population          int64 array of the total populations
+    codes               list of the FIPS codes of all the counties
+    members, offsets    cluster idx is made of the counties
+                        codes[members[offsets[idx]:offsets[idx + 1]]]
+
+so the membership of all the clusters is two int64 arrays instead of one
+Python set per cluster. Distances, merges and copies work on whole arrays;
+Cluster objects are only built by cluster() and to_clusters().
+"""
+import numpy as np
+
+from cluster import Cluster
+
+
+def _grouped(labels, sizes, num_groups):
+    """
+    Returns (order, offsets): the member positions sorted by the label of
+    their cluster, and the offsets of the #num_groups labels in that order
+    """
+    member_labels = np.repeat(labels, sizes)
+    order = np.argsort(member_labels, kind='stable')
+    offsets = np.zeros(num_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(member_labels, minlength=num_groups), out=offsets[1:])
+    return order, offsets
+
+
+class ClusterSet:
+    """
+    Clusters of counties stored as arrays
+    """
+
+    def __init__(self, codes, members, offsets, horiz, vert, population, risk):
+        self.codes = codes
+        self.members = np.asarray(members, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.horiz = np.asarray(horiz, dtype=np.float64)
+        self.vert = np.asarray(vert, dtype=np.float64)
+        self.population = np.asarray(population, dtype=np.int64)
+        self.risk = np.asarray(risk, dtype=np.float64)
+
+    @classmethod
+    def from_clusters(cls, cluster_list):
+        """
+        Returns the ClusterSet of the list of Cluster objects #cluster_list
+        """
+        codes = []
+        offsets = [0]
+        for cluster in cluster_list:
+            codes.extend(sorted(cluster.fips_codes()))
+            offsets.append(len(codes))
+        return cls(codes, np.arange(len(codes)), offsets,
+                   [cluster.horiz_center() for cluster in cluster_list],
+                   [cluster.vert_center() for cluster in cluster_list],
+                   [cluster.total_population() for cluster in cluster_list],
+                   [cluster.averaged_risk() for cluster in cluster_list])
+
+    @classmethod
+    def from_table(cls, data_table):
+        """
+        Returns the ClusterSet of one singleton cluster per line
+        [fips, horiz, vert, population, risk] of #data_table
+        """
+        num = len(data_table)
+        return cls([line[0] for line in data_table], np.arange(num), np.arange(num + 1),
+                   [line[1] for line in data_table], [line[2] for line in data_table],
+                   [line[3] for line in data_table], [line[4] for line in data_table])
+
+    def __len__(self):
+        return len(self.horiz)
+
+    def sizes(self):
+        """
+        Returns the number of counties of every cluster
+        """
+        return np.diff(self.offsets)
+
+    def fips_codes(self, idx):
+        """
+        Returns the set of FIPS codes of cluster #idx
+        """
+        return set(self.codes[member] for member in
+                   self.members[self.offsets[idx]:self.offsets[idx + 1]].tolist())
+
+    def cluster(self, idx):
+        """
+        Returns cluster #idx as a Cluster
+        """
+        return Cluster(self.fips_codes(idx), float(self.horiz[idx]), float(self.vert[idx]),
+                       int(self.population[idx]), float(self.risk[idx]))
+
+    def to_clusters(self):
+        """
+        Returns the clusters as a list of Cluster objects
+        """
+        return [self.cluster(idx) for idx in range(len(self))]
+
+    def copy(self):
+        """
+        Returns a copy of the set; the FIPS code list is shared, as it
+        is never modified
+        """
+        return ClusterSet(self.codes, self.members.copy(), self.offsets.copy(), self.horiz.copy(),
+                          self.vert.copy(), self.population.copy(), self.risk.copy())
+
+    def take(self, indices):
+        """
+        Returns the ClusterSet of the clusters #indices, in that order
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        sizes = self.sizes()[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        # positions in self.members of the members of every taken cluster
+        positions = np.repeat(self.offsets[indices] - offsets[:-1], sizes) + np.arange(offsets[-1])
+        return ClusterSet(self.codes, self.members[positions], offsets, self.horiz[indices],
+                          self.vert[indices], self.population[indices], self.risk[indices])
+
+    def distance(self, idx, others=None):
+        """
+        Returns the distances from cluster #idx to the clusters #others
+        (all of them by default)
+        """
+        if others is None:
+            others = slice(None)
+        return np.sqrt((self.vert[idx] - self.vert[others]) ** 2 +
+                       (self.horiz[idx] - self.horiz[others]) ** 2)
+
+    def distances(self, idx1, idx2):
+        """
+        Returns the distances between clusters idx1[i] and idx2[i]
+        """
+        return np.sqrt((self.vert[idx1] - self.vert[idx2]) ** 2 +
+                       (self.horiz[idx1] - self.horiz[idx2]) ** 2)
+
+    def regroup(self, labels, horiz, vert, population, risk):
+        """
+        Returns the ClusterSet whose cluster label is made of the counties
+        of the clusters idx with labels[idx] == label, with the given
+        centers, populations and risks
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        order, offsets = _grouped(labels, self.sizes(), len(horiz))
+        return ClusterSet(self.codes, self.members[order], offsets, horiz, vert, population, risk)
+
+    def merge(self, labels, num_clusters=None):
+        """
+        Returns the ClusterSet of the clusters obtained by merging together
+        the clusters with the same label (labels in 0..num_clusters - 1)
+
+        Centers and risks are population weighted averages, as in
+        Cluster.merge_clusters (up to rounding); clusters without counties
+        are ignored, and a label that gets no population has center (0, 0)
+        and risk 0.
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        if num_clusters is None:
+            num_clusters = int(labels.max(initial=-1)) + 1
+        weights = np.where(self.sizes() > 0, self.population, 0).astype(np.float64)
+        total = np.bincount(labels, weights=weights, minlength=num_clusters)
+        safe_total = np.where(total > 0, total, 1)
+        return self.regroup(labels,
+                            np.bincount(labels, weights=weights * self.horiz, minlength=num_clusters) / safe_total,
+                            np.bincount(labels, weights=weights * self.vert, minlength=num_clusters) / safe_total,
+                            np.round(total),
+                            np.bincount(labels, weights=weights * self.risk, minlength=num_clusters) / safe_total)
+
+    def merge_pair(self, idx1, idx2):
+        """
+        Returns the ClusterSet where cluster #idx2 is merged into cluster
+        #idx1 and removed, as hierarchical_clustering does with a list:
+        the other clusters are kept as they are, and the merged center,
+        population and risk follow Cluster.merge_clusters
+        """
+        labels = np.arange(len(self))
+        labels[idx2 + 1:] -= 1
+        labels[idx2] = labels[idx1]
+        keep = labels != labels[idx1]
+        keep[idx1] = True
+        horiz = self.horiz[keep]
+        vert = self.vert[keep]
+        population = self.population[keep]
+        risk = self.risk[keep]
+        if self.offsets[idx2 + 1] > self.offsets[idx2]:
+            target = labels[idx1]
+            population[target] = self.population[idx1] + self.population[idx2]
+            weight1 = float(self.population[idx1]) / population[target]
+            weight2 = float(self.population[idx2]) / population[target]
+            vert[target] = weight1 * self.vert[idx1] + weight2 * self.vert[idx2]
+            horiz[target] = weight1 * self.horiz[idx1] + weight2 * self.horiz[idx2]
+            risk[target] = weight1 * self.risk[idx1] + weight2 * self.risk[idx2]
+        return self.regroup(labels, horiz, vert, population, risk)
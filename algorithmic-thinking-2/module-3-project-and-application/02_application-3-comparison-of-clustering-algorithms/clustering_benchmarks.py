@@ -0,0 +1,105 @@
+"""
+Time and memory of the clustering engines on a cancer data table
+
+For every engine and every input representation (a list of singleton
+Cluster objects, or a ClusterSet) this prints, for one call:
+    seconds       best time over #repeat calls
+    peak_alloc    peak of traced Python / NumPy allocations, in bytes
+    result_alloc  bytes still allocated by the returned clusters
+
+    python clustering_benchmarks.py --table 896 --clusters 15
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+
+import clustering
+import fast_clustering
+from cluster import Cluster
+from cluster_set import ClusterSet
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_table(size):
+    """
+    Returns the rows [fips, horiz, vert, population, risk] of
+    unifiedCancerData_#size.csv
+    """
+    table = []
+    with open(os.path.join(HERE, 'unifiedCancerData_{}.csv'.format(size))) as data_file:
+        for line in data_file:
+            tokens = line.split(',')
+            if len(tokens) == 5:
+                table.append([tokens[0], float(tokens[1]), float(tokens[2]),
+                              int(tokens[3]), float(tokens[4])])
+    return table
+
+
+def singletons(table):
+    return [Cluster(set([line[0]]), line[1], line[2], line[3], line[4]) for line in table]
+
+
+def measure(func, make_input, repeat=3):
+    """
+    Returns (seconds, peak_alloc, result_alloc) of func(make_input())
+    """
+    best = float('inf')
+    for dummy_run in range(repeat):
+        data = make_input()
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+
+    data = make_input()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(data)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak - before, after - before
+
+
+def run(size, num_clusters, num_iterations=5, repeat=3, reference=True):
+    table = load_table(size)
+    cases = [
+        ('fast kmeans, Cluster list', lambda data: fast_clustering.kmeans_clustering(
+            data, num_clusters, num_iterations), lambda: singletons(table)),
+        ('fast kmeans, ClusterSet', lambda data: fast_clustering.kmeans_clustering(
+            data, num_clusters, num_iterations), lambda: ClusterSet.from_table(table)),
+        ('fast hierarchical, Cluster list', lambda data: fast_clustering.hierarchical_clustering(
+            data, num_clusters), lambda: singletons(table)),
+        ('fast hierarchical, ClusterSet', lambda data: fast_clustering.hierarchical_clustering(
+            data, num_clusters), lambda: ClusterSet.from_table(table)),
+    ]
+    if reference:
+        cases[:0] = [
+            ('kmeans, Cluster list', lambda data: clustering.kmeans_clustering(
+                data, num_clusters, num_iterations), lambda: singletons(table)),
+            ('hierarchical, Cluster list', lambda data: clustering.hierarchical_clustering(
+                data, num_clusters), lambda: singletons(table)),
+        ]
+    print('{} counties, {} clusters'.format(len(table), num_clusters))
+    print('{:34s} {:>10s} {:>12s} {:>12s}'.format('engine', 'seconds', 'peak_alloc', 'result_alloc'))
+    for name, func, make_input in cases:
+        seconds, peak, result = measure(func, make_input, repeat)
+        print('{:34s} {:10.4f} {:12d} {:12d}'.format(name, seconds, peak, result))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--table', type=int, default=896, choices=[111, 290, 896, 3108])
+    parser.add_argument('--clusters', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-reference', action='store_true',
+                        help='skip the clustering.py engines (slow on the 3108 table)')
+    args = parser.parse_args(argv)
+    run(args.table, args.clusters, repeat=args.repeat, reference=not args.no_reference)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Distortion of clusterings of a cancer data table
+
+Cluster.cluster_error indexes the whole data table on every call and
+builds one singleton Cluster per county. DistortionEngine indexes the
+table once, in arrays; a clustering becomes one label per county and
+the errors of all its clusters are one NumPy reduction:
+
+    error[c] = sum over the counties i of cluster c of
+               population[i] * ((horiz[i] - horiz[c]) ** 2 + (vert[i] - vert[c]) ** 2)
+
+The same engine serves any number of clusterings of its table, given as
+lists of clusters or as ClusterSets.
+"""
+import numpy as np
+
+from cluster_set import ClusterSet
+
+
+class DistortionEngine:
+    """
+    Weighted squared errors of clusterings of one data table
+    """
+
+    def __init__(self, data_table):
+        """
+        Index #data_table, a list of [fips, horiz, vert, population, risk]
+        """
+        self._rows = dict((line[0], idx) for idx, line in enumerate(data_table))
+        self.horiz = np.array([line[1] for line in data_table], dtype=np.float64)
+        self.vert = np.array([line[2] for line in data_table], dtype=np.float64)
+        self.population = np.array([line[3] for line in data_table], dtype=np.float64)
+        self._codes = None
+        self._code_rows = None
+
+    def __len__(self):
+        return len(self.horiz)
+
+    def _rows_of_codes(self, codes):
+        """
+        Returns the table rows of the FIPS code list #codes of a ClusterSet
+        (cached, as the clusterings of one ClusterSet share their codes)
+        """
+        if codes is not self._codes:
+            self._code_rows = np.array([self._rows[code] for code in codes], dtype=np.int64)
+            self._codes = codes
+        return self._code_rows
+
+    def labels(self, cluster_list):
+        """
+        Returns the int64 array of the cluster index of every county of the
+        table in #cluster_list (-1 for a county in no cluster)
+        """
+        labels = np.full(len(self), -1, dtype=np.int64)
+        if isinstance(cluster_list, ClusterSet):
+            rows = self._rows_of_codes(cluster_list.codes)[cluster_list.members]
+            labels[rows] = np.repeat(np.arange(len(cluster_list)), cluster_list.sizes())
+        else:
+            for idx, cluster in enumerate(cluster_list):
+                labels[[self._rows[code] for code in cluster.fips_codes()]] = idx
+        return labels
+
+    def cluster_errors(self, cluster_list):
+        """
+        Returns the array of the errors of every cluster of #cluster_list,
+        as Cluster.cluster_error computes them (up to rounding)
+        """
+        if isinstance(cluster_list, ClusterSet):
+            horiz, vert = cluster_list.horiz, cluster_list.vert
+        else:
+            horiz = np.array([cluster.horiz_center() for cluster in cluster_list], dtype=np.float64)
+            vert = np.array([cluster.vert_center() for cluster in cluster_list], dtype=np.float64)
+        labels = self.labels(cluster_list)
+        covered = np.flatnonzero(labels >= 0)
+        labels = labels[covered]
+        errors = self.population[covered] * ((self.horiz[covered] - horiz[labels]) ** 2 +
+                                             (self.vert[covered] - vert[labels]) ** 2)
+        return np.bincount(labels, weights=errors, minlength=len(horiz))
+
+    def distortion(self, cluster_list):
+        """
+        Returns the distortion of #cluster_list: the sum of the errors of
+        its clusters
+        """
+        return float(self.cluster_errors(cluster_list).sum())
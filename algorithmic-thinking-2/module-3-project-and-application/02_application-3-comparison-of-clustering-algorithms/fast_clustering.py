@@ -0,0 +1,556 @@
+"""
+Vectorized clustering engines
+
+The functions in clustering.py work one Cluster object at a time. The
+engines here keep the centers, populations and risks of all the clusters
+in NumPy arrays and only build Cluster objects for the result, which is
+the same Cluster list the clustering.py version returns.
+
+kmeans_clustering:
+    - assignment: one matrix of squared point-to-center distances per
+      iteration (by chunks of points, to bound memory), argmin per row
+    - update: new centers and risks merged point by point with the float
+      arithmetic of Cluster.merge_clusters, in the same order, so that they
+      are the same floats (an O(n) pass, next to the O(n k) assignment)
+
+closest_pair_arrays / fast_closest_pair:
+    - divide and conquer over the points sorted once by horizontal center,
+      the vertical order of every half merged on the way up, so the whole
+      search is O(n log n) and never touches a Cluster
+
+hierarchical_clustering:
+    - every cluster remembers the distance to its nearest neighbor; a heap
+      of (distance, cluster) entries gives the closest pair, entries of
+      merged or updated clusters are skipped when popped (lazy invalidation)
+    - a merge only recomputes the distances from the merged cluster and the
+      nearest neighbors of the clusters that pointed to one of the two
+      merged clusters
+    - the list order of clustering.hierarchical_clustering (sorted by
+      horizontal center before every merge) is kept on the side, so that
+      ties between equally close pairs and the output order are the same
+
+The closest pair, hierarchical and k-means engines take an optional
+#index argument, a spatial index class of spatial_index (GridIndex or
+KDTree): their nearest neighbor queries then go through the index
+instead of NumPy distance vectors or the divide and conquer.
+
+hierarchical_merge_tree runs the hierarchical engine once and returns
+the MergeTree of all its merges, which gives the clustering and the
+distortion at every number of clusters.
+
+kmeans_clustering and hierarchical_clustering also take a ClusterSet
+instead of a list of clusters, and then return a ClusterSet: no Cluster
+object or FIPS set is built at all.
+"""
+from bisect import bisect_left, bisect_right
+import heapq
+import math
+
+import numpy as np
+
+from cluster import Cluster
+from cluster_set import ClusterSet
+from merge_tree import MergeTree
+
+CHUNK_ITEMS = 1 << 20  # distance matrix entries per chunk
+TIE_TOLERANCE = 1e-12  # relative gap under which NumPy distances are checked exactly
+
+
+def _distance(horiz1, vert1, horiz2, vert2):
+    """
+    Euclidean distance between two centers given as Python floats, exactly
+    as Cluster.distance computes it (float ** 2 may differ from the NumPy
+    square in the last bit, which decides near ties)
+    """
+    return math.sqrt((vert1 - vert2) ** 2 + (horiz1 - horiz2) ** 2)
+
+
+def cluster_arrays(cluster_list):
+    """
+    Returns the (horiz, vert, population, risk) float64 arrays of #cluster_list
+    (a list of clusters or a ClusterSet)
+    """
+    if isinstance(cluster_list, ClusterSet):
+        return (cluster_list.horiz, cluster_list.vert,
+                cluster_list.population.astype(np.float64), cluster_list.risk)
+    horiz = np.fromiter((cluster.horiz_center() for cluster in cluster_list), dtype=np.float64,
+                        count=len(cluster_list))
+    vert = np.fromiter((cluster.vert_center() for cluster in cluster_list), dtype=np.float64,
+                       count=len(cluster_list))
+    population = np.fromiter((cluster.total_population() for cluster in cluster_list), dtype=np.float64,
+                             count=len(cluster_list))
+    risk = np.fromiter((cluster.averaged_risk() for cluster in cluster_list), dtype=np.float64,
+                       count=len(cluster_list))
+    return horiz, vert, population, risk
+
+
+def nearest_centers(horiz, vert, center_horiz, center_vert, chunk_items=CHUNK_ITEMS):
+    """
+    Returns, for every point (horiz[i], vert[i]), the index of the closest
+    center (lowest index on ties)
+
+    Points with several centers at nearly the same distance are decided
+    with Cluster.distance, as clustering.kmeans_clustering does.
+    """
+    labels = np.empty(len(horiz), dtype=np.int64)
+    chunk = max(1, chunk_items // max(1, len(center_horiz)))
+    center_horiz_list = center_horiz.tolist()
+    center_vert_list = center_vert.tolist()
+    for start in range(0, len(horiz), chunk):
+        stop = start + chunk
+        distances = (horiz[start:stop, None] - center_horiz[None, :]) ** 2
+        distances += (vert[start:stop, None] - center_vert[None, :]) ** 2
+        labels[start:stop] = np.argmin(distances, axis=1)
+
+        lowest = distances[np.arange(len(distances)), labels[start:stop]]
+        rows, cols = np.nonzero(distances <= lowest[:, None] * (1 + TIE_TOLERANCE))
+        counts = np.bincount(rows, minlength=len(distances))
+        offsets = np.concatenate(([0], np.cumsum(counts))).tolist()
+        for row in np.flatnonzero(counts > 1).tolist():
+            point_horiz, point_vert = float(horiz[start + row]), float(vert[start + row])
+            labels[start + row] = min((_distance(point_horiz, point_vert,
+                                                 center_horiz_list[col], center_vert_list[col]), col)
+                                      for col in cols[offsets[row]:offsets[row + 1]].tolist())[1]
+    return labels
+
+
+def weighted_centers(labels, num_clusters, horiz, vert, population, risk, order):
+    """
+    Returns the (horiz, vert, population, risk) arrays of the clusters
+    obtained by merging the points order[0], order[1], ... in turn into the
+    cluster of their label
+
+    Every merge does the float arithmetic of Cluster.merge_clusters, in the
+    order of clustering.kmeans_clustering, so the centers and risks are the
+    same floats and later nearest center ties are decided the same way.
+    A cluster that receives no population keeps center (0, 0) and risk 0,
+    as an empty Cluster does.
+    """
+    center_horiz = [0.0] * num_clusters
+    center_vert = [0.0] * num_clusters
+    center_population = [0.0] * num_clusters
+    center_risk = [0.0] * num_clusters
+    order = np.asarray(order, dtype=np.int64)
+    for label, other_population, other_horiz, other_vert, other_risk in zip(
+            labels[order].tolist(), population[order].tolist(), horiz[order].tolist(),
+            vert[order].tolist(), risk[order].tolist()):
+        self_population = center_population[label]
+        total = self_population + other_population
+        if total == 0:
+            continue
+        self_weight = self_population / total
+        other_weight = other_population / total
+        center_population[label] = total
+        center_vert[label] = self_weight * center_vert[label] + other_weight * other_vert
+        center_horiz[label] = self_weight * center_horiz[label] + other_weight * other_horiz
+        center_risk[label] = self_weight * center_risk[label] + other_weight * other_risk
+    return (np.array(center_horiz), np.array(center_vert),
+            np.array(center_population), np.array(center_risk))
+
+
+def _index_nearest_centers(index, horiz, vert, center_horiz, center_vert):
+    """
+    nearest_centers answered by a spatial index over the centers
+    """
+    centers = index(center_horiz.tolist(), center_vert.tolist())
+    return np.array([centers.nearest(point_horiz, point_vert)[1]
+                     for point_horiz, point_vert in zip(horiz.tolist(), vert.tolist())], dtype=np.int64)
+
+
+def kmeans_clustering(cluster_list, num_clusters, num_iterations, chunk_items=CHUNK_ITEMS, index=None):
+    """
+    Compute the k-means clustering of a set of clusters
+    Note: the function does not mutate cluster_list
+
+    Same result as clustering.kmeans_clustering: the initial centers are
+    the num_clusters most populated clusters and the output cluster idx
+    is made of the clusters closest to center idx in the last iteration.
+    Clusters without FIPS codes take no part in the new centers, as
+    Cluster.merge_clusters ignores them.
+
+    Input: List of clusters (or ClusterSet), integers number of clusters and
+    number of iterations, and optionally a spatial index class for the
+    nearest centers
+    Output: List of clusters (or ClusterSet) whose length is num_clusters
+    """
+    is_set = isinstance(cluster_list, ClusterSet)
+    if is_set:
+        order = np.argsort(-cluster_list.population, kind='stable').tolist()
+    else:
+        order = sorted(range(len(cluster_list)),
+                       key=lambda idx: cluster_list[idx].total_population(),
+                       reverse=True)
+    if num_iterations <= 0:
+        if is_set:
+            return cluster_list.take(order[:num_clusters])
+        return [cluster_list[idx] for idx in order[:num_clusters]]
+
+    horiz, vert, population, risk = cluster_arrays(cluster_list)
+    # clusters without FIPS codes are not merged, in decreasing population order
+    if is_set:
+        has_codes = (cluster_list.sizes() > 0).tolist()
+    else:
+        has_codes = [len(cluster.fips_codes()) > 0 for cluster in cluster_list]
+    merge_order = [idx for idx in order if has_codes[idx]]
+    main = np.array(order[:num_clusters], dtype=np.int64)
+    center_horiz, center_vert = horiz[main], vert[main]
+    num_centers = len(main)
+
+    for dummy_i in range(num_iterations):
+        if index is None:
+            labels = nearest_centers(horiz, vert, center_horiz, center_vert, chunk_items)
+        else:
+            labels = _index_nearest_centers(index, horiz, vert, center_horiz, center_vert)
+        center_horiz, center_vert, center_population, center_risk = weighted_centers(
+            labels, num_centers, horiz, vert, population, risk, merge_order)
+
+    if is_set:
+        return cluster_list.regroup(labels, center_horiz, center_vert, np.round(center_population), center_risk)
+    fips_codes = [set() for dummy_idx in range(num_centers)]
+    for cluster, label in zip(cluster_list, labels.tolist()):
+        fips_codes[label].update(cluster.fips_codes())
+    return [Cluster(fips_codes[idx], float(center_horiz[idx]), float(center_vert[idx]),
+                    int(round(center_population[idx])), float(center_risk[idx]))
+            for idx in range(num_centers)]
+
+
+def _closest_pair(horiz, vert, order, start, stop):
+    """
+    Closest pair among the points order[start:stop] (sorted by horizontal
+    center)
+
+    Returns ((dist, idx1, idx2), points of order[start:stop] sorted by
+    vertical center)
+    """
+    if stop - start <= 3:
+        output = (float('inf'), -1, -1)
+        points = order[start:stop]
+        for pos1 in range(len(points)):
+            for pos2 in range(pos1 + 1, len(points)):
+                idx1, idx2 = min(points[pos1], points[pos2]), max(points[pos1], points[pos2])
+                dist = math.sqrt((vert[idx1] - vert[idx2]) ** 2 + (horiz[idx1] - horiz[idx2]) ** 2)
+                output = min(output, (dist, idx1, idx2))
+        return output, sorted(points, key=vert.__getitem__)
+
+    middle = (start + stop) // 2
+    left_output, left_points = _closest_pair(horiz, vert, order, start, middle)
+    right_output, right_points = _closest_pair(horiz, vert, order, middle, stop)
+    output = min(left_output, right_output)
+    # two sorted runs: the sort is a linear merge
+    points = sorted(left_points + right_points, key=vert.__getitem__)
+
+    # pairs across the middle line at distance <= dist (ties included)
+    mid = 0.5 * (horiz[order[middle - 1]] + horiz[order[middle]])
+    half_width = output[0]
+    strip = [idx for idx in points if abs(horiz[idx] - mid) <= half_width]
+    for pos1 in range(len(strip)):
+        point1 = strip[pos1]
+        for pos2 in range(pos1 + 1, len(strip)):
+            point2 = strip[pos2]
+            if vert[point2] - vert[point1] > output[0]:
+                break
+            idx1, idx2 = min(point1, point2), max(point1, point2)
+            dist = math.sqrt((vert[idx1] - vert[idx2]) ** 2 + (horiz[idx1] - horiz[idx2]) ** 2)
+            output = min(output, (dist, idx1, idx2))
+    return output, points
+
+
+def _index_closest_pair(index, horiz, vert):
+    """
+    Closest pair as the smallest (nearest neighbor distance, idx1, idx2)
+    of every point, with the nearest neighbors from a spatial index
+    """
+    points = index(horiz, vert)
+    output = (float('inf'), -1, -1)
+    for idx in range(len(horiz)):
+        dist, other = points.nearest(horiz[idx], vert[idx], exclude=idx)
+        output = min(output, (dist, min(idx, other), max(idx, other)))
+    return output
+
+
+def closest_pair_arrays(horiz, vert, index=None):
+    """
+    Compute the closest pair of the points (horiz[i], vert[i])
+
+    Input: horiz and vert are sequences of coordinates of the same length,
+    index optionally a spatial index class to answer the search with
+
+    Output: tuple (dist, idx1, idx2) with idx1 < idx2, the smallest such
+    tuple over all the pairs of points, as slow_closest_pair computes it
+    """
+    horiz = [float(value) for value in horiz]
+    vert = [float(value) for value in vert]
+    if index is not None:
+        return _index_closest_pair(index, horiz, vert)
+    order = sorted(range(len(horiz)), key=lambda idx: horiz[idx])
+    return _closest_pair(horiz, vert, order, 0, len(order))[0]
+
+
+def fast_closest_pair(cluster_list, index=None):
+    """
+    Compute the distance between the closest pair of clusters in a list (fast)
+    Note: like clustering.fast_closest_pair, the function sorts cluster_list
+    by horizontal center
+
+    Input: cluster_list is list of clusters, index optionally a spatial index class
+
+    Output: tuple of the form (dist, idx1, idx2) where the main_clusters of the clusters
+    cluster_list[idx1] and cluster_list[idx2] have minimum distance dist.
+    """
+    cluster_list.sort(key=lambda cluster: cluster.horiz_center())
+    return closest_pair_arrays([cluster.horiz_center() for cluster in cluster_list],
+                               [cluster.vert_center() for cluster in cluster_list], index)
+
+
+def _distances(horiz, vert, idx):
+    """
+    Returns the distances from cluster #idx to all the clusters, computed
+    as Cluster.distance does
+    """
+    vert_dist = vert[idx] - vert
+    horiz_dist = horiz[idx] - horiz
+    return np.sqrt(vert_dist ** 2 + horiz_dist ** 2)
+
+
+def _nearest(horiz_list, vert_list, idx, distances):
+    """
+    Returns (dist, nearest) for cluster #idx, given its NumPy #distances to
+    all the clusters (inf for itself and the merged ones), with dist as
+    Cluster.distance computes it
+    """
+    candidates = np.flatnonzero(distances <= distances.min() * (1 + TIE_TOLERANCE)).tolist()
+    return min((_distance(horiz_list[idx], vert_list[idx], horiz_list[other], vert_list[other]), other)
+               for other in candidates)
+
+
+def _nearest_neighbors(horiz, vert, chunk_items=CHUNK_ITEMS):
+    """
+    Returns the (nearest, distance) arrays of the nearest neighbor of every
+    point (horiz[i], vert[i]) among the other points
+    """
+    num = len(horiz)
+    horiz_list = horiz.tolist()
+    vert_list = vert.tolist()
+    best = [(float('inf'), -1)] * num
+    chunk = max(1, chunk_items // max(1, num))
+    for start in range(0, num, chunk):
+        stop = min(num, start + chunk)
+        vert_dist = vert[start:stop, None] - vert[None, :]
+        horiz_dist = horiz[start:stop, None] - horiz[None, :]
+        squares = vert_dist ** 2 + horiz_dist ** 2
+        squares[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        lowest = squares.min(axis=1)
+        rows, cols = np.nonzero(squares <= lowest[:, None] * (1 + TIE_TOLERANCE))
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            idx = start + row
+            best[idx] = min(best[idx], (_distance(horiz_list[idx], vert_list[idx],
+                                                  horiz_list[col], vert_list[col]), col))
+    return (np.array([idx for dummy_dist, idx in best], dtype=np.int64),
+            np.array([dist for dist, dummy_idx in best]))
+
+
+def _position(order, order_horiz, idx, horiz):
+    """
+    Returns the position of cluster #idx, of horizontal center #horiz, in
+    the #order list sorted by horizontal center
+    """
+    position = bisect_left(order_horiz, horiz)
+    while order[position] != idx:
+        position += 1
+    return position
+
+
+def hierarchical_clustering(cluster_list, num_clusters, chunk_items=CHUNK_ITEMS, index=None, history=None):
+    """
+    Compute a hierarchical clustering of a set of clusters
+    Note: the function does not mutate cluster_list nor its clusters
+
+    Same merges as clustering.hierarchical_clustering: the closest pair is
+    merged first and, among pairs at the same distance, the pair (idx1,
+    idx2) with the smallest indices in the list sorted by horizontal center,
+    as slow_closest_pair picks it (on such exact ties fast_closest_pair may
+    miss a pair lying across its strip).
+
+    With a spatial index class #index, the nearest neighbors are found
+    through the index, which follows the merges; only the check of which
+    clusters got closer to the merged one stays a NumPy distance vector.
+
+    Every merge is appended to the list #history, when given, as the tuple
+    (idx1, idx2, horiz, vert, population, risk, error increase): cluster
+    idx2 of cluster_list (or the cluster it was merged into) is merged into
+    cluster idx1, which gets the given center, population and risk, and
+    the sum of the cluster errors grows by the Ward increase
+    w1 * w2 / (w1 + w2) * distance ** 2 (populations w1 and w2).
+
+    Input: List of clusters (or ClusterSet), integer number of clusters,
+    and optionally a spatial index class for the nearest neighbor queries
+    and a list to record the merges in
+    Output: List of clusters (or ClusterSet) whose length is num_clusters
+    """
+    num = len(cluster_list)
+    if num <= num_clusters:
+        return cluster_list
+
+    # per cluster state, indexed by position in cluster_list; a merged
+    # cluster lives on at the index of its first (leftmost) half
+    is_set = isinstance(cluster_list, ClusterSet)
+    if is_set:
+        horiz_list = cluster_list.horiz.tolist()
+        vert_list = cluster_list.vert.tolist()
+        population = cluster_list.population.tolist()
+        risk = cluster_list.risk.tolist()
+        has_fips = (cluster_list.sizes() > 0).tolist()
+    else:
+        horiz_list = [cluster.horiz_center() for cluster in cluster_list]
+        vert_list = [cluster.vert_center() for cluster in cluster_list]
+        population = [cluster.total_population() for cluster in cluster_list]
+        risk = [cluster.averaged_risk() for cluster in cluster_list]
+        has_fips = [len(cluster.fips_codes()) > 0 for cluster in cluster_list]
+    members = [[idx] for idx in range(num)]
+    horiz = np.array(horiz_list, dtype=np.float64)
+    vert = np.array(vert_list, dtype=np.float64)
+
+    order = sorted(range(num), key=lambda idx: horiz_list[idx])
+    order_horiz = [horiz_list[idx] for idx in order]
+
+    if index is None:
+        nearest, distance = _nearest_neighbors(horiz, vert, chunk_items)
+    else:
+        points = index(horiz_list, vert_list)
+        found = [points.nearest(horiz_list[idx], vert_list[idx], exclude=idx) for idx in range(num)]
+        distance = np.array([dist for dist, dummy_idx in found])
+        nearest = np.array([idx for dummy_dist, idx in found], dtype=np.int64)
+    alive = np.ones(num, dtype=np.bool_)
+    version = [0] * num
+    heap = [(dist, idx, 0) for idx, dist in enumerate(distance.tolist())]
+    heapq.heapify(heap)
+
+    moved = None  # position of the last merged cluster, not sorted yet
+    for dummy_merge in range(num - num_clusters):
+        if moved is not None:
+            # stable sort of the list: move the merged cluster among the
+            # clusters with the same horizontal center as its position says
+            idx = order.pop(moved)
+            del order_horiz[moved]
+            position = min(max(moved, bisect_left(order_horiz, horiz_list[idx])),
+                           bisect_right(order_horiz, horiz_list[idx]))
+            order.insert(position, idx)
+            order_horiz.insert(position, horiz_list[idx])
+
+        # all the clusters whose nearest neighbor is at the smallest distance
+        tied = []
+        while True:
+            dist, idx, stamp = heapq.heappop(heap)
+            if stamp == version[idx] and idx not in tied:
+                if tied and dist != best:
+                    heapq.heappush(heap, (dist, idx, stamp))
+                    break
+                best = dist
+                tied.append(idx)
+            if not heap:
+                break
+        for idx in tied:
+            heapq.heappush(heap, (best, idx, version[idx]))
+
+        positions = dict((idx, _position(order, order_horiz, idx, horiz_list[idx])) for idx in tied)
+        if len(tied) == 2:
+            first, second = sorted(positions.values())
+        else:
+            first, second = min((min(positions[idx1], positions[idx2]), max(positions[idx1], positions[idx2]))
+                                for idx1 in tied for idx2 in tied
+                                if idx1 != idx2 and _distance(horiz_list[idx1], vert_list[idx1],
+                                                              horiz_list[idx2], vert_list[idx2]) == best)
+        idx1, idx2 = order[first], order[second]
+
+        # merge idx2 into idx1 as Cluster.merge_clusters does
+        increase = 0.0
+        if has_fips[idx2]:
+            if history is not None and population[idx1] + population[idx2]:
+                increase = (float(population[idx1]) * population[idx2] / (population[idx1] + population[idx2]) *
+                            ((vert_list[idx1] - vert_list[idx2]) ** 2 + (horiz_list[idx1] - horiz_list[idx2]) ** 2))
+            weight1 = float(population[idx1])
+            weight2 = float(population[idx2])
+            population[idx1] = population[idx1] + population[idx2]
+            weight1 /= population[idx1]
+            weight2 /= population[idx1]
+            vert_list[idx1] = weight1 * vert_list[idx1] + weight2 * vert_list[idx2]
+            horiz_list[idx1] = weight1 * horiz_list[idx1] + weight2 * horiz_list[idx2]
+            risk[idx1] = weight1 * risk[idx1] + weight2 * risk[idx2]
+            has_fips[idx1] = True
+        if history is not None:
+            history.append((idx1, idx2, horiz_list[idx1], vert_list[idx1], population[idx1], risk[idx1], increase))
+        if len(members[idx1]) < len(members[idx2]):
+            members[idx1], members[idx2] = members[idx2], members[idx1]
+        members[idx1].extend(members[idx2])
+        members[idx2] = None
+        order_horiz[first] = horiz_list[idx1]
+        del order[second]
+        del order_horiz[second]
+        moved = first
+
+        horiz[idx1], vert[idx1] = horiz_list[idx1], vert_list[idx1]
+        horiz[idx2] = vert[idx2] = np.inf
+        alive[idx2] = False
+        if index is not None:
+            points.delete(idx2)
+            points.insert(idx1, horiz_list[idx1], vert_list[idx1])
+        version[idx1] += 1
+        version[idx2] += 1
+        if len(order) <= num_clusters:
+            break
+
+        # nearest neighbor of the merged cluster, and of the clusters that
+        # are now closer to it or whose nearest neighbor was merged
+        merged = _distances(horiz, vert, idx1)
+        merged[idx1] = merged[idx2] = np.inf
+        stale = alive & ((nearest == idx1) | (nearest == idx2))
+        stale[idx1] = False
+        if index is None:
+            distance[idx1], nearest[idx1] = _nearest(horiz_list, vert_list, idx1, merged)
+        else:
+            distance[idx1], nearest[idx1] = points.nearest(horiz_list[idx1], vert_list[idx1], exclude=idx1)
+        heapq.heappush(heap, (distance[idx1], idx1, version[idx1]))
+        closer = set()
+        for idx in np.flatnonzero(merged < distance * (1 + TIE_TOLERANCE)).tolist():
+            dist = _distance(horiz_list[idx], vert_list[idx], horiz_list[idx1], vert_list[idx1])
+            if dist < distance[idx]:
+                closer.add(idx)
+                nearest[idx] = idx1
+                distance[idx] = dist
+                version[idx] += 1
+                heapq.heappush(heap, (dist, idx, version[idx]))
+        for idx in np.flatnonzero(stale).tolist():
+            if idx in closer:
+                continue
+            if index is None:
+                distances = _distances(horiz, vert, idx)
+                distances[idx] = np.inf
+                distance[idx], nearest[idx] = _nearest(horiz_list, vert_list, idx, distances)
+            else:
+                distance[idx], nearest[idx] = points.nearest(horiz_list[idx], vert_list[idx], exclude=idx)
+            version[idx] += 1
+            heapq.heappush(heap, (distance[idx], idx, version[idx]))
+
+    if is_set:
+        labels = np.empty(num, dtype=np.int64)
+        for label, idx in enumerate(order):
+            labels[members[idx]] = label
+        return cluster_list.regroup(labels, [horiz_list[idx] for idx in order],
+                                    [vert_list[idx] for idx in order],
+                                    [population[idx] for idx in order], [risk[idx] for idx in order])
+    return [Cluster(set().union(*[cluster_list[member].fips_codes() for member in members[idx]]),
+                    horiz_list[idx], vert_list[idx], population[idx], risk[idx])
+            for idx in order]
+
+
+def hierarchical_merge_tree(cluster_list, num_clusters=1, chunk_items=CHUNK_ITEMS, index=None):
+    """
+    Run hierarchical_clustering down to #num_clusters clusters once
+
+    Returns the MergeTree of the merges: tree.cut(k) is the result of
+    hierarchical_clustering(cluster_list, k) for every k from
+    num_clusters to len(cluster_list)
+    """
+    history = []
+    hierarchical_clustering(cluster_list, num_clusters, chunk_items, index, history)
+    return MergeTree(cluster_list, history)
@@ -0,0 +1,130 @@
+"""
+Merge history (dendrogram) of a hierarchical clustering
+
+Hierarchical clusterings are nested: the clustering into k clusters is
+the one into k + 1 clusters plus one merge. A MergeTree records every
+merge of one run once, so the clustering and its distortion at any k are
+read from the tree instead of clustering again:
+
+    cut(k)         the k clusters, O(n) NumPy work
+    labels(k)      the cluster of every input cluster at k
+    distortion(k)  sum of the cluster errors at k, accumulated merge by
+                   merge with the Ward increase of every merge
+"""
+import numpy as np
+
+from cluster_set import ClusterSet
+
+
+class MergeTree:
+    """
+    The merges of a hierarchical clustering of a list of clusters
+    """
+
+    def __init__(self, cluster_list, history):
+        """
+        #history is the list of merges recorded by
+        fast_clustering.hierarchical_clustering on #cluster_list
+        """
+        self._as_set = isinstance(cluster_list, ClusterSet)
+        self.base = cluster_list if self._as_set else ClusterSet.from_clusters(cluster_list)
+        merges = list(zip(*history)) or [()] * 7
+        self.survivor = np.array(merges[0], dtype=np.int64)
+        self.absorbed = np.array(merges[1], dtype=np.int64)
+        self.horiz = np.array(merges[2], dtype=np.float64)
+        self.vert = np.array(merges[3], dtype=np.float64)
+        self.population = np.array(merges[4], dtype=np.int64)
+        self.risk = np.array(merges[5], dtype=np.float64)
+        # distortion_increase[m]: distortion added by the first m merges
+        self.distortion_increase = np.concatenate(([0.0], np.cumsum(np.array(merges[6], dtype=np.float64))))
+
+    def __len__(self):
+        """
+        Number of merges
+        """
+        return len(self.survivor)
+
+    @property
+    def num_leaves(self):
+        return len(self.base)
+
+    @property
+    def min_clusters(self):
+        """
+        Smallest number of clusters the tree can be cut at
+        """
+        return self.num_leaves - len(self)
+
+    def _num_merges(self, num_clusters):
+        if not self.min_clusters <= num_clusters <= self.num_leaves:
+            raise ValueError('num_clusters must be in [{}, {}]'.format(self.min_clusters, self.num_leaves))
+        return self.num_leaves - num_clusters
+
+    def _roots(self, num_merges):
+        """
+        Returns the index of the cluster every input cluster belongs to
+        after #num_merges merges (the cluster keeps the index of its
+        surviving input cluster)
+        """
+        parent = np.arange(self.num_leaves)
+        parent[self.absorbed[:num_merges]] = self.survivor[:num_merges]
+        while True:
+            grand_parent = parent[parent]
+            if np.array_equal(grand_parent, parent):
+                return parent
+            parent = grand_parent
+
+    def labels(self, num_clusters):
+        """
+        Returns the int64 array of the cluster (0..num_clusters - 1, in the
+        order of cut) of every input cluster at #num_clusters clusters
+        """
+        return self._cut(num_clusters)[0]
+
+    def _cut(self, num_clusters):
+        num_merges = self._num_merges(num_clusters)
+        roots = self._roots(num_merges)
+        survivors = np.flatnonzero(roots == np.arange(self.num_leaves))
+
+        # state of every survivor: its last merge, or its input values
+        last = np.full(self.num_leaves, -1, dtype=np.int64)
+        np.maximum.at(last, self.survivor[:num_merges], np.arange(num_merges))
+        last = last[survivors]
+        merged = last >= 0
+        horiz = self.base.horiz[survivors].copy()
+        vert = self.base.vert[survivors].copy()
+        population = self.base.population[survivors].copy()
+        risk = self.base.risk[survivors].copy()
+        horiz[merged] = self.horiz[last[merged]]
+        vert[merged] = self.vert[last[merged]]
+        population[merged] = self.population[last[merged]]
+        risk[merged] = self.risk[last[merged]]
+
+        # clusters by horizontal center, ties by surviving index
+        order = np.lexsort((survivors, horiz))
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        position = np.empty(self.num_leaves, dtype=np.int64)
+        position[survivors] = rank
+        return position[roots], horiz[order], vert[order], population[order], risk[order]
+
+    def cut(self, num_clusters):
+        """
+        Returns the clustering into #num_clusters clusters, as a list of
+        clusters (or a ClusterSet when the tree was built from one) sorted
+        by horizontal center
+
+        The clusters are those of hierarchical_clustering(cluster_list,
+        num_clusters), whose list order can differ for the last merged
+        cluster.
+        """
+        clusters = self.base.regroup(*self._cut(num_clusters))
+        return clusters if self._as_set else clusters.to_clusters()
+
+    def distortion(self, num_clusters, base_distortion=0.0):
+        """
+        Returns the distortion of the clustering into #num_clusters
+        clusters: #base_distortion, the distortion of the input clusters
+        (0 for singletons), plus the increase of the merges up to it
+        """
+        return base_distortion + float(self.distortion_increase[self._num_merges(num_clusters)])
@@ -0,0 +1,326 @@
+"""
+Spatial indexes over cluster centers
+
+Both indexes store points (horiz, vert) under integer ids and answer the
+same queries, with distances computed as Cluster.distance does:
+
+    insert(idx, horiz, vert)   add (or move) point idx
+    delete(idx)                remove point idx
+    nearest(horiz, vert, exclude=None)
+                               (dist, idx) of the closest point, lowest idx
+                               on ties, (inf, -1) when there is none
+    within(horiz, vert, radius)
+                               sorted ids of the points at distance <= radius
+
+GridIndex hashes the points into square cells and searches rings of cells
+around the query; it suits points spread evenly over the plane. KDTree
+splits the plane on the horizontal or vertical coordinate of largest spread;
+deleted points stay in the tree as dead nodes until more than half of the
+nodes are dead, when the tree is rebuilt balanced, and a too deep insertion
+rebuilds the unbalanced subtree it went through. Its searches use an
+explicit stack, so even a degenerate tree cannot hit the recursion limit.
+"""
+import math
+
+
+def _distance(horiz1, vert1, horiz2, vert2):
+    """
+    Euclidean distance, computed as Cluster.distance
+    """
+    return math.sqrt((vert1 - vert2) ** 2 + (horiz1 - horiz2) ** 2)
+
+
+class GridIndex:
+    """
+    Uniform grid of square cells, a dictionary from cell to the ids inside
+    """
+
+    def __init__(self, horiz=(), vert=(), cell_size=None):
+        """
+        Index the points (horiz[idx], vert[idx]) under ids 0, 1, ...
+        The default cell size gives about two points per cell.
+        """
+        horiz = list(horiz)
+        vert = list(vert)
+        if cell_size is None:
+            cell_size = 1.0
+            if len(horiz) > 1:
+                area = (max(horiz) - min(horiz)) * (max(vert) - min(vert))
+                cell_size = math.sqrt(2.0 * area / len(horiz)) or 1.0
+        self._build(cell_size, zip(range(len(horiz)), horiz, vert))
+
+    def _build(self, cell_size, points):
+        self._cell_size = float(cell_size)
+        self._cells = {}
+        self._points = {}
+        self._lowest = self._highest = None
+        for idx, horiz, vert in points:
+            self.insert(idx, horiz, vert)
+        self._built_size = max(1, len(self._points))
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, idx):
+        return idx in self._points
+
+    def _cell(self, horiz, vert):
+        return (int(math.floor(horiz / self._cell_size)),
+                int(math.floor(vert / self._cell_size)))
+
+    def position(self, idx):
+        """
+        Returns the (horiz, vert) position of point #idx
+        """
+        return self._points[idx]
+
+    def insert(self, idx, horiz, vert):
+        """
+        Add point #idx at (#horiz, #vert), moving it if already there
+        """
+        if idx in self._points:
+            self.delete(idx)
+        cell = self._cell(horiz, vert)
+        self._points[idx] = (horiz, vert)
+        self._cells.setdefault(cell, set()).add(idx)
+        if self._lowest is None:
+            self._lowest, self._highest = cell, cell
+        else:
+            self._lowest = (min(self._lowest[0], cell[0]), min(self._lowest[1], cell[1]))
+            self._highest = (max(self._highest[0], cell[0]), max(self._highest[1], cell[1]))
+
+    def delete(self, idx):
+        """
+        Remove point #idx
+        When the grid has emptied to a quarter of its points, the cells
+        are doubled in size
+        """
+        cell = self._cell(*self._points.pop(idx))
+        self._cells[cell].discard(idx)
+        if not self._cells[cell]:
+            del self._cells[cell]
+        if 4 * len(self._points) < self._built_size:
+            self._build(2 * self._cell_size,
+                        [(idx, horiz, vert) for idx, (horiz, vert) in self._points.items()])
+
+    def _ring(self, center, radius):
+        """
+        Yields the non-empty cells at Chebyshev distance #radius of cell #center
+        """
+        col, row = center
+        if radius == 0:
+            cells = [center]
+        else:
+            cells = [(col + offset, row - radius) for offset in range(-radius, radius + 1)]
+            cells += [(col + offset, row + radius) for offset in range(-radius, radius + 1)]
+            cells += [(col - radius, row + offset) for offset in range(-radius + 1, radius)]
+            cells += [(col + radius, row + offset) for offset in range(-radius + 1, radius)]
+        for cell in cells:
+            if cell in self._cells:
+                yield self._cells[cell]
+
+    def nearest(self, horiz, vert, exclude=None):
+        """
+        Returns (dist, idx) of the point closest to (#horiz, #vert) other
+        than #exclude
+        """
+        best = (float('inf'), -1)
+        if not self._points:
+            return best
+        center = self._cell(horiz, vert)
+        max_radius = max(abs(center[0] - self._lowest[0]), abs(center[0] - self._highest[0]),
+                         abs(center[1] - self._lowest[1]), abs(center[1] - self._highest[1]))
+        radius = 0
+        # points outside the rings 0..radius - 1 are farther than
+        # (radius - 1) * cell_size; one ring less covers rounding of the cells
+        while radius <= max_radius and not best[0] < (radius - 2) * self._cell_size:
+            for ids in self._ring(center, radius):
+                for idx in ids:
+                    if idx != exclude:
+                        point = self._points[idx]
+                        best = min(best, (_distance(horiz, vert, point[0], point[1]), idx))
+            radius += 1
+        return best
+
+    def within(self, horiz, vert, radius):
+        """
+        Returns the sorted ids of the points at distance <= #radius of (#horiz, #vert)
+        """
+        low = self._cell(horiz - radius, vert - radius)
+        high = self._cell(horiz + radius, vert + radius)
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) > len(self._cells):
+            candidates = self._points
+        else:
+            candidates = [idx for col in range(low[0] - 1, high[0] + 2)
+                          for row in range(low[1] - 1, high[1] + 2)
+                          for idx in self._cells.get((col, row), ())]
+        output = []
+        for idx in candidates:
+            point = self._points[idx]
+            if _distance(horiz, vert, point[0], point[1]) <= radius:
+                output.append(idx)
+        return sorted(output)
+
+
+class KDTree:
+    """
+    2-d tree of nodes [idx, horiz, vert, axis, left, right, size], where
+    size counts the nodes, live or dead, of the subtree
+
+    Insertions keep the tree of depth O(log n) as a scapegoat tree does:
+    an insertion deeper than log(size) / log(1 / ALPHA) rebuilds, balanced,
+    the subtree of its lowest ancestor with a child holding more than ALPHA
+    of its nodes.
+    """
+    ALPHA = 0.7
+
+    def __init__(self, horiz=(), vert=()):
+        """
+        Index the points (horiz[idx], vert[idx]) under ids 0, 1, ...
+        """
+        self._build(list(zip(range(len(horiz)), horiz, vert)))
+
+    def _build(self, points):
+        self._nodes = {}
+        self._num_dead = 0
+        self._root = self._balanced(points)
+
+    def _balanced(self, points):
+        """
+        Returns the root of a balanced tree over the (idx, horiz, vert) #points,
+        split at every level on the coordinate of largest spread (splits on
+        a constant coordinate, as for collinear points, prune nothing)
+        """
+        if not points:
+            return None
+        spreads = [max(point[1 + axis] for point in points) - min(point[1 + axis] for point in points)
+                   for axis in (0, 1)]
+        axis = 0 if spreads[0] >= spreads[1] else 1
+        points = sorted(points, key=lambda point: (point[1 + axis], point[0]))
+        middle = len(points) // 2
+        idx, horiz, vert = points[middle]
+        node = [idx, horiz, vert, axis,
+                self._balanced(points[:middle]),
+                self._balanced(points[middle + 1:]),
+                len(points)]
+        self._nodes[idx] = node
+        return node
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, idx):
+        return idx in self._nodes
+
+    def position(self, idx):
+        """
+        Returns the (horiz, vert) position of point #idx
+        """
+        node = self._nodes[idx]
+        return node[1], node[2]
+
+    def insert(self, idx, horiz, vert):
+        """
+        Add point #idx at (#horiz, #vert), moving it if already there
+        """
+        if idx in self._nodes:
+            self.delete(idx)
+        if self._root is None:
+            self._root = self._nodes[idx] = [idx, horiz, vert, 0, None, None, 1]
+            return
+        node = self._root
+        coords = (horiz, vert)
+        path = []
+        while True:
+            node[6] += 1
+            path.append(node)
+            side = 4 if coords[node[3]] < node[1 + node[3]] else 5
+            if node[side] is None:
+                node[side] = self._nodes[idx] = [idx, horiz, vert, 1 - node[3], None, None, 1]
+                break
+            node = node[side]
+        if len(path) > math.log(self._root[6]) / math.log(1 / self.ALPHA):
+            self._rebalance(path)
+
+    def _rebalance(self, path):
+        """
+        Rebuild the subtree of the scapegoat of the insertion that walked
+        down the nodes #path
+        """
+        size = 1
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if size > self.ALPHA * node[6]:
+                break
+            size = node[6]
+        points = []
+        stack = [node]
+        while stack:
+            child = stack.pop()
+            if self._alive(child):
+                points.append((child[0], child[1], child[2]))
+            stack.extend(grand_child for grand_child in child[4:6] if grand_child is not None)
+        subtree = self._balanced(points)
+        num_dropped = node[6] - len(points)
+        self._num_dead -= num_dropped
+        for ancestor in path[:depth]:
+            ancestor[6] -= num_dropped
+        if depth == 0:
+            self._root = subtree
+        else:
+            parent = path[depth - 1]
+            parent[4 if parent[4] is node else 5] = subtree
+
+    def delete(self, idx):
+        """
+        Remove point #idx
+        """
+        del self._nodes[idx]
+        self._num_dead += 1
+        if self._num_dead > len(self._nodes):
+            self._build([(node[0], node[1], node[2]) for node in self._nodes.values()])
+
+    def _alive(self, node):
+        return self._nodes.get(node[0]) is node
+
+    def nearest(self, horiz, vert, exclude=None):
+        """
+        Returns (dist, idx) of the point closest to (#horiz, #vert) other
+        than #exclude
+        """
+        best = (float('inf'), -1)
+        coords = (horiz, vert)
+        # (node, lower bound of the distance to any point of its subtree);
+        # the near side is pushed last, so it is searched first
+        stack = [(self._root, 0.0)] if self._root is not None else []
+        while stack:
+            node, bound = stack.pop()
+            if bound > best[0]:
+                continue
+            if node[0] != exclude and self._alive(node):
+                best = min(best, (_distance(horiz, vert, node[1], node[2]), node[0]))
+            diff = coords[node[3]] - node[1 + node[3]]
+            near, far = (node[4], node[5]) if diff < 0 else (node[5], node[4])
+            if far is not None:
+                stack.append((far, max(bound, abs(diff))))
+            if near is not None:
+                stack.append((near, bound))
+        return best
+
+    def within(self, horiz, vert, radius):
+        """
+        Returns the sorted ids of the points at distance <= #radius of (#horiz, #vert)
+        """
+        output = []
+        coords = (horiz, vert)
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if self._alive(node) and _distance(horiz, vert, node[1], node[2]) <= radius:
+                output.append(node[0])
+            diff = coords[node[3]] - node[1 + node[3]]
+            if node[4] is not None and diff <= radius:
+                stack.append(node[4])
+            if node[5] is not None and -diff <= radius:
+                stack.append(node[5])
+        return sorted(output)
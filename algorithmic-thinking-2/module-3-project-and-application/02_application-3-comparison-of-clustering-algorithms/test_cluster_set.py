@@ -0,0 +1,109 @@
+"""
+Tests of ClusterSet against lists of Cluster objects
+
+    python -m pytest -q test_cluster_set.py
+"""
+import random
+
+import numpy as np
+import pytest
+
+from cluster_set import ClusterSet
+import fast_clustering
+from test_fast_clustering import as_tuple, load_table, random_clusters, singletons
+
+
+def approx_tuple(cluster):
+    codes, horiz, vert, population, risk = as_tuple(cluster)
+    return codes, pytest.approx(horiz), pytest.approx(vert), population, pytest.approx(risk)
+
+
+def merged(clusters, labels, num_clusters):
+    """
+    Fold Cluster.merge_clusters over the clusters of every label
+    """
+    result = [None] * num_clusters
+    for cluster, label in zip(clusters, labels):
+        if result[label] is None:
+            result[label] = cluster.copy()
+        else:
+            result[label].merge_clusters(cluster)
+    return result
+
+
+def test_round_trip():
+    clusters = random_clusters(50, random.Random(50))
+    cluster_set = ClusterSet.from_clusters(clusters)
+    assert len(cluster_set) == 50
+    assert [as_tuple(cluster) for cluster in cluster_set.to_clusters()] == [as_tuple(cluster) for cluster in clusters]
+    assert cluster_set.sizes().tolist() == [len(cluster.fips_codes()) for cluster in clusters]
+    table = load_table(111)
+    assert ([as_tuple(cluster) for cluster in ClusterSet.from_table(table).to_clusters()] ==
+            [as_tuple(cluster) for cluster in singletons(table)])
+
+
+def test_take_and_copy():
+    rng = random.Random(51)
+    clusters = random_clusters(40, rng)
+    labels = list(range(15)) + [rng.randrange(15) for dummy in clusters[15:]]
+    cluster_set = ClusterSet.from_clusters(merged(clusters, labels, 15))
+    expected = cluster_set.to_clusters()
+    indices = [rng.randrange(15) for dummy_idx in range(20)]
+    assert ([as_tuple(cluster) for cluster in cluster_set.take(indices).to_clusters()] ==
+            [as_tuple(expected[idx]) for idx in indices])
+    copy = cluster_set.copy()
+    copy.horiz[:] = 0
+    copy.members[:] = 0
+    assert [as_tuple(cluster) for cluster in cluster_set.to_clusters()] == [as_tuple(cluster) for cluster in expected]
+
+
+def test_distances_match_clusters():
+    clusters = random_clusters(30, random.Random(52))
+    cluster_set = ClusterSet.from_clusters(clusters)
+    assert cluster_set.distance(3).tolist() == [clusters[3].distance(cluster) for cluster in clusters]
+    idx1, idx2 = np.arange(30), np.arange(30)[::-1]
+    assert cluster_set.distances(idx1, idx2).tolist() == [clusters[i].distance(clusters[j]) for i, j in zip(idx1, idx2)]
+
+
+def test_merge_matches_merge_clusters():
+    rng = random.Random(53)
+    for trial in range(10):
+        clusters = [cluster for cluster in random_clusters(rng.randint(2, 60), rng) if cluster.fips_codes()]
+        num_clusters = rng.randint(1, len(clusters))
+        labels = list(range(num_clusters)) + [rng.randrange(num_clusters) for dummy in clusters[num_clusters:]]
+        rng.shuffle(labels)
+        result = ClusterSet.from_clusters(clusters).merge(labels, num_clusters).to_clusters()
+        assert [approx_tuple(cluster) for cluster in result] == [
+            as_tuple(cluster) for cluster in merged(clusters, labels, num_clusters)]
+
+
+def test_merge_ignores_clusters_without_counties():
+    clusters = random_clusters(3, random.Random(55))
+    empty = clusters[0].copy()
+    empty.fips_codes().clear()
+    result = ClusterSet.from_clusters([empty, clusters[1], empty, clusters[2]]).merge([0, 0, 1, 2])
+    assert approx_tuple(result.cluster(0)) == as_tuple(clusters[1])
+    assert as_tuple(result.cluster(1)) == ([], 0.0, 0.0, 0, 0.0)
+    assert approx_tuple(result.cluster(2)) == as_tuple(clusters[2])
+
+
+@pytest.mark.parametrize('idx1, idx2', [(4, 11), (11, 4), (4, 7), (7, 4)])
+def test_merge_pair_matches_list_merge(idx1, idx2):
+    clusters = random_clusters(20, random.Random(54))
+    clusters[7].fips_codes().clear()
+    expected = [cluster.copy() for cluster in clusters]
+    expected[idx1].merge_clusters(expected[idx2])
+    del expected[idx2]
+    result = ClusterSet.from_clusters(clusters).merge_pair(idx1, idx2).to_clusters()
+    assert [as_tuple(cluster) for cluster in result] == [as_tuple(cluster) for cluster in expected]
+
+
+def test_fast_clustering_of_a_cluster_set():
+    table = load_table(290)
+    for num_clusters in (9, 20):
+        expected = fast_clustering.hierarchical_clustering(singletons(table), num_clusters)
+        result = fast_clustering.hierarchical_clustering(ClusterSet.from_table(table), num_clusters)
+        assert [as_tuple(cluster) for cluster in result.to_clusters()] == [as_tuple(cluster) for cluster in expected]
+        expected = fast_clustering.kmeans_clustering(singletons(table), num_clusters, 5)
+        result = fast_clustering.kmeans_clustering(ClusterSet.from_table(table), num_clusters, 5)
+        assert [as_tuple(cluster) for cluster in result.to_clusters()] == [as_tuple(cluster) for cluster in expected]
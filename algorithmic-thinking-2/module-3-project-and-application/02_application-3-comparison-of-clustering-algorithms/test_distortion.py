@@ -0,0 +1,48 @@
+"""
+Tests of DistortionEngine against Cluster.cluster_error
+
+    python -m pytest -q test_distortion.py
+"""
+import random
+
+import pytest
+
+from cluster_set import ClusterSet
+from distortion import DistortionEngine
+import fast_clustering
+from test_fast_clustering import load_table, singletons
+
+
+@pytest.mark.parametrize('size', [111, 290])
+def test_errors_match_cluster_error(size):
+    table = load_table(size)
+    engine = DistortionEngine(table)
+    for clusters in (fast_clustering.kmeans_clustering(singletons(table), 9, 5),
+                     fast_clustering.hierarchical_clustering(singletons(table), 16)):
+        expected = [cluster.cluster_error(table) for cluster in clusters]
+        assert engine.cluster_errors(clusters).tolist() == pytest.approx(expected, rel=1e-12)
+        assert engine.cluster_errors(ClusterSet.from_clusters(clusters)).tolist() == pytest.approx(expected, rel=1e-12)
+        assert engine.distortion(clusters) == pytest.approx(sum(expected), rel=1e-12)
+
+
+def test_clusterings_of_one_cluster_set():
+    table = load_table(290)
+    engine = DistortionEngine(table)
+    cluster_set = ClusterSet.from_table(table)
+    for num_clusters in (6, 20):
+        result = fast_clustering.hierarchical_clustering(cluster_set, num_clusters)
+        clusters = result.to_clusters()
+        assert engine.distortion(result) == pytest.approx(sum(cluster.cluster_error(table) for cluster in clusters),
+                                                          rel=1e-12)
+    assert engine.distortion(cluster_set) == 0
+
+
+def test_counties_in_no_cluster_are_ignored():
+    table = load_table(111)
+    engine = DistortionEngine(table)
+    rng = random.Random(60)
+    clusters = rng.sample(fast_clustering.kmeans_clustering(singletons(table), 12, 3), 5)
+    labels = engine.labels(clusters)
+    assert set(labels.tolist()) == set(range(-1, 5))
+    assert engine.cluster_errors(clusters).tolist() == pytest.approx(
+        [cluster.cluster_error(table) for cluster in clusters], rel=1e-12)
@@ -0,0 +1,119 @@
+"""
+Tests of fast_clustering against the Cluster based engines of clustering.py
+
+    python -m pytest -q test_fast_clustering.py
+"""
+import os
+import random
+
+import pytest
+
+from cluster import Cluster
+import clustering
+import fast_clustering
+from spatial_index import GridIndex, KDTree
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_table(size):
+    table = []
+    with open(os.path.join(HERE, 'unifiedCancerData_{}.csv'.format(size))) as data_file:
+        for line in data_file:
+            tokens = line.split(',')
+            if len(tokens) == 5:
+                table.append([tokens[0], float(tokens[1]), float(tokens[2]),
+                              int(tokens[3]), float(tokens[4])])
+    return table
+
+
+def singletons(table):
+    return [Cluster(set([line[0]]), line[1], line[2], line[3], line[4]) for line in table]
+
+
+def random_clusters(num_clusters, rng, grid=None):
+    """
+    Random clusters, on a coarse grid of centers when #grid is given so
+    that distance ties are frequent; a few have no FIPS codes
+    """
+    clusters = []
+    for idx in range(num_clusters):
+        if grid:
+            horiz, vert = float(rng.randint(0, grid)), float(rng.randint(0, grid))
+        else:
+            horiz, vert = rng.uniform(0, 1000), rng.uniform(0, 1000)
+        codes = set([str(idx)]) if rng.random() > 0.05 else set()
+        clusters.append(Cluster(codes, horiz, vert, rng.randint(1, 10 ** 6), rng.uniform(0, 1e-4)))
+    return clusters
+
+
+def as_tuple(cluster):
+    return (sorted(cluster.fips_codes()), cluster.horiz_center(), cluster.vert_center(),
+            cluster.total_population(), cluster.averaged_risk())
+
+
+@pytest.mark.parametrize('size', [111, 290, 896])
+def test_kmeans_is_exactly_the_reference(size):
+    table = load_table(size)
+    for num_clusters in (6, 9, 20):
+        expected = clustering.kmeans_clustering(singletons(table), num_clusters, 5)
+        result = fast_clustering.kmeans_clustering(singletons(table), num_clusters, 5)
+        assert [as_tuple(cluster) for cluster in result] == [as_tuple(cluster) for cluster in expected]
+
+
+@pytest.mark.parametrize('grid', [None, 6])
+def test_kmeans_of_random_clusters(grid):
+    rng = random.Random(grid)
+    for trial in range(5):
+        clusters = random_clusters(rng.randint(20, 150), rng, grid)
+        num_clusters = rng.randint(1, 15)
+        expected = clustering.kmeans_clustering([cluster.copy() for cluster in clusters], num_clusters, 4)
+        result = fast_clustering.kmeans_clustering(clusters, num_clusters, 4)
+        assert [as_tuple(cluster) for cluster in result] == [as_tuple(cluster) for cluster in expected]
+
+
+@pytest.mark.parametrize('index', [None, GridIndex, KDTree])
+@pytest.mark.parametrize('grid', [None, 5, 40])
+def test_closest_pair_is_exactly_the_slow_one(index, grid):
+    rng = random.Random(30 + (grid or 0))
+    for trial in range(20):
+        clusters = random_clusters(rng.randint(2, 60), rng, grid)
+        clusters.sort(key=lambda cluster: cluster.horiz_center())
+        expected = clustering.slow_closest_pair(clusters)
+        assert fast_clustering.fast_closest_pair(list(clusters), index) == expected
+
+
+def test_closest_pair_of_duplicate_points():
+    horiz = [3.0, 1.0, 3.0, 1.0]
+    vert = [2.0, 0.0, 2.0, 0.0]
+    for index in (None, GridIndex, KDTree):
+        assert fast_clustering.closest_pair_arrays(horiz, vert, index) == (0.0, 0, 2)
+    assert fast_clustering.closest_pair_arrays([1.0], [1.0]) == (float('inf'), -1, -1)
+
+
+def sorted_slow_closest_pair(cluster_list):
+    cluster_list.sort(key=lambda cluster: cluster.horiz_center())
+    return clustering.slow_closest_pair(cluster_list)
+
+
+@pytest.mark.parametrize('index', [None, GridIndex, KDTree])
+@pytest.mark.parametrize('grid', [None, 4, 30])
+def test_hierarchical_is_exactly_the_reference(index, grid):
+    rng = random.Random(40 + (grid or 0))
+    for trial in range(8):
+        clusters = random_clusters(rng.randint(2, 60), rng, grid)
+        num_clusters = rng.randint(1, len(clusters))
+        expected = clustering.hierarchical_clustering([cluster.copy() for cluster in clusters], num_clusters,
+                                                      sorted_slow_closest_pair)
+        result = fast_clustering.hierarchical_clustering(clusters, num_clusters, chunk_items=50, index=index)
+        assert [as_tuple(cluster) for cluster in result] == [as_tuple(cluster) for cluster in expected]
+
+
+def test_hierarchical_of_county_table():
+    table = load_table(111)
+    clusters = singletons(table)
+    expected = clustering.hierarchical_clustering(singletons(table), 9, fast_clustering.fast_closest_pair)
+    result = fast_clustering.hierarchical_clustering(clusters, 9)
+    assert [as_tuple(cluster) for cluster in result] == [as_tuple(cluster) for cluster in expected]
+    # the input clusters are left untouched
+    assert [as_tuple(cluster) for cluster in clusters] == [as_tuple(cluster) for cluster in singletons(table)]
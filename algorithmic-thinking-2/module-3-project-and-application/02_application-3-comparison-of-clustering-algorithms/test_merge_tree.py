@@ -0,0 +1,53 @@
+"""
+Tests of MergeTree cuts against running hierarchical_clustering again
+
+    python -m pytest -q test_merge_tree.py
+"""
+import random
+
+import pytest
+
+from cluster_set import ClusterSet
+from distortion import DistortionEngine
+import fast_clustering
+from test_fast_clustering import as_tuple, load_table, random_clusters, singletons
+
+
+@pytest.mark.parametrize('grid', [None, 5])
+def test_cuts_match_hierarchical_clustering(grid):
+    rng = random.Random(70 + (grid or 0))
+    for trial in range(5):
+        clusters = random_clusters(rng.randint(1, 50), rng, grid)
+        min_clusters = rng.randint(1, len(clusters))
+        tree = fast_clustering.hierarchical_merge_tree(clusters, min_clusters)
+        assert tree.min_clusters == min_clusters
+        for num_clusters in range(min_clusters, len(clusters) + 1):
+            expected = fast_clustering.hierarchical_clustering(clusters, num_clusters)
+            result = tree.cut(num_clusters)
+            assert sorted(map(as_tuple, result)) == sorted(map(as_tuple, expected))
+            labels = tree.labels(num_clusters).tolist()
+            for idx, cluster in enumerate(result):
+                assert cluster.fips_codes() == set().union(
+                    *[clusters[member].fips_codes() for member in range(len(clusters)) if labels[member] == idx])
+
+
+def test_distortion_matches_cut():
+    table = load_table(290)
+    tree = fast_clustering.hierarchical_merge_tree(ClusterSet.from_table(table), 6)
+    engine = DistortionEngine(table)
+    for num_clusters in (6, 7, 10, 20, 100, 290):
+        cut = tree.cut(num_clusters)
+        assert isinstance(cut, ClusterSet)
+        assert tree.distortion(num_clusters) == pytest.approx(engine.distortion(cut), rel=1e-9, abs=1e-6)
+        expected = fast_clustering.hierarchical_clustering(singletons(table), num_clusters)
+        assert sorted(map(as_tuple, cut.to_clusters())) == sorted(map(as_tuple, expected))
+
+
+def test_cut_out_of_range():
+    clusters = singletons(load_table(111))
+    tree = fast_clustering.hierarchical_merge_tree(clusters, 10)
+    assert len(tree) == 101
+    for num_clusters in (9, 112):
+        with pytest.raises(ValueError):
+            tree.cut(num_clusters)
+    assert sorted(map(as_tuple, tree.cut(111))) == sorted(map(as_tuple, clusters))
@@ -0,0 +1,82 @@
+"""
+Tests of the spatial indexes against brute-force searches
+
+    python -m pytest -q test_spatial_index.py
+"""
+import math
+import random
+
+import pytest
+
+from cluster import Cluster
+import fast_clustering
+from spatial_index import GridIndex, KDTree, _distance
+
+INDEXES = [GridIndex, KDTree]
+
+
+def brute_nearest(points, horiz, vert, exclude=None):
+    return min([(_distance(horiz, vert, point[0], point[1]), idx)
+                for idx, point in points.items() if idx != exclude],
+               default=(float('inf'), -1))
+
+
+def brute_within(points, horiz, vert, radius):
+    return sorted(idx for idx, point in points.items()
+                  if _distance(horiz, vert, point[0], point[1]) <= radius)
+
+
+def tree_depth(tree):
+    depth = 0
+    stack = [(tree._root, 1)] if tree._root is not None else []
+    while stack:
+        node, node_depth = stack.pop()
+        depth = max(depth, node_depth)
+        stack.extend((child, node_depth + 1) for child in node[4:6] if child is not None)
+    return depth
+
+
+@pytest.mark.parametrize('index', INDEXES)
+def test_queries_match_brute_force(index):
+    rng = random.Random(3)
+    # a coarse grid of coordinates gives many exact ties
+    horiz = [float(rng.randint(0, 20)) for dummy_idx in range(200)]
+    vert = [float(rng.randint(0, 20)) for dummy_idx in range(200)]
+    points = dict(enumerate(zip(horiz, vert)))
+    spatial = index(horiz, vert)
+    for step in range(600):
+        action = rng.random()
+        if action < 0.3 and points:
+            idx = rng.choice(sorted(points))
+            spatial.delete(idx)
+            del points[idx]
+        elif action < 0.6:
+            idx = rng.randint(0, 300)
+            points[idx] = (rng.uniform(-5, 25), rng.uniform(-5, 25))
+            spatial.insert(idx, *points[idx])
+        horiz_q, vert_q = rng.uniform(-5, 25), rng.uniform(-5, 25)
+        exclude = rng.choice(sorted(points)) if points and rng.random() < 0.5 else None
+        assert len(spatial) == len(points)
+        assert spatial.nearest(horiz_q, vert_q, exclude) == brute_nearest(points, horiz_q, vert_q, exclude)
+        radius = rng.uniform(0, 6)
+        assert spatial.within(horiz_q, vert_q, radius) == brute_within(points, horiz_q, vert_q, radius)
+
+
+@pytest.mark.parametrize('position', [math.sqrt, math.log1p, lambda idx: float(idx * idx)])
+def test_kd_tree_stays_shallow_on_collinear_inserts(position):
+    tree = KDTree()
+    points = {}
+    for idx in range(5000):
+        points[idx] = (position(idx), 0.0)
+        tree.insert(idx, *points[idx])
+    assert tree_depth(tree) <= 2 * math.log(len(tree)) / math.log(1 / KDTree.ALPHA)
+    for horiz in [-1.0, position(17) + 0.25, position(4999) + 1.0]:
+        assert tree.nearest(horiz, 0.0) == brute_nearest(points, horiz, 0.0)
+
+
+@pytest.mark.parametrize('index', INDEXES)
+def test_hierarchical_clustering_of_collinear_points(index):
+    clusters = [Cluster(set([str(idx)]), math.sqrt(idx), 0.0, 1, 0.0) for idx in range(3000)]
+    expected = fast_clustering.hierarchical_clustering(list(clusters), 10)
+    result = fast_clustering.hierarchical_clustering(list(clusters), 10, index=index)
+    assert [cluster.fips_codes() for cluster in result] == [cluster.fips_codes() for cluster in expected]